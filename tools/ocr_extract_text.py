@@ -1,11 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import threading
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
 from PIL import Image, ImageEnhance
-import pytesseract
+
+try:
+    # 可选：libtesseract 进程内调用（不再每次起 tesseract 子进程 + 写临时文件）
+    from tesserocr import PSM, PyTessBaseAPI
+except ImportError:
+    PyTessBaseAPI = None
+
+if PyTessBaseAPI is None:
+    import pytesseract
 
 
 def _autodetect_tesseract() -> str:
@@ -24,6 +33,34 @@ def _autodetect_tesseract() -> str:
     )
 
 
+# (lang, numeric_only) -> (API, lock)；API 句柄常驻复用，单个句柄不是线程安全的，所以各配一把锁
+_APIS: Dict[Tuple[str, bool], Tuple["PyTessBaseAPI", threading.Lock]] = {}
+_APIS_LOCK = threading.Lock()
+
+
+def _get_api(lang: str, numeric_only: bool):
+    key = (lang, numeric_only)
+    with _APIS_LOCK:
+        hit = _APIS.get(key)
+        if hit is None:
+            # 与 pytesseract 版保持一致：数字模式 --psm 6 + 白名单；文字模式用默认 psm
+            api = PyTessBaseAPI(lang=lang, psm=PSM.SINGLE_BLOCK if numeric_only else PSM.AUTO)
+            if numeric_only:
+                api.SetVariable("tessedit_char_whitelist", "0123456789.")
+            hit = (api, threading.Lock())
+            _APIS[key] = hit
+        return hit
+
+
+def warm_up(langs: Iterable[str] = ("eng",)) -> None:
+    """进程启动时调用一次，提前加载 tessdata，避免第一次识别的冷启动"""
+    if PyTessBaseAPI is None:
+        return
+    _get_api("eng", True)
+    for lang in langs:
+        _get_api(lang, False)
+
+
 def ocr_image(
     image_path: str,
     lang: str = "eng",
@@ -35,7 +72,8 @@ def ocr_image(
     - numeric_only=True：只识别数字和小数点，减少噪声
     - crop_box：只对指定区域 OCR（解决“整页噪声数字”问题）
     """
-    pytesseract.pytesseract.tesseract_cmd = _autodetect_tesseract()
+    if PyTessBaseAPI is None:
+        pytesseract.pytesseract.tesseract_cmd = _autodetect_tesseract()
 
     img = Image.open(image_path).convert("L")
 
@@ -50,7 +88,12 @@ def ocr_image(
     w, h = img.size
     img = img.resize((int(w * 2.0), int(h * 2.0)))
 
-    if numeric_only:
+    if PyTessBaseAPI is not None:
+        api, lock = _get_api("eng" if numeric_only else lang, numeric_only)
+        with lock:
+            api.SetImage(img)
+            text = api.GetUTF8Text()
+    elif numeric_only:
         config = "--psm 6 -c tessedit_char_whitelist=0123456789."
         text = pytesseract.image_to_string(img, lang="eng", config=config)
     else:
@@ -25,7 +25,9 @@ tv_buy_1_0/agent/dialogue_3p2.py
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, asdict
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
 # ✅ 直接复用你已经验证正确的 CLI tv_rank（newest-first）
@@ -35,7 +37,7 @@ from tv_buy_1_0.tools_cli import tv_rank as tv_rank_mod
 # =========================================================
 # State
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class DialogState:
     size: Optional[int] = None
     budget_max: Optional[int] = None
@@ -46,10 +48,14 @@ class DialogState:
     brand_asked: bool = False
 
     def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        if d["brand_list"] is None:
-            d["brand_list"] = []
-        return d
+        return {
+            "size": self.size,
+            "budget_max": self.budget_max,
+            "scene": self.scene,
+            "brand_mode": self.brand_mode,
+            "brand_list": list(self.brand_list or []),
+            "brand_asked": self.brand_asked,
+        }
 
 
 # =========================================================
@@ -82,6 +88,11 @@ def _brand_to_db(brand: str) -> str:
     return b
 
 
+# 预算快路径：整串就是 "数字 + 可选单位"（6000 / 1.2万 / 8k / 2w / 3千）
+_BUDGET_FAST_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(万|w|k|千)?\s*$", re.I)
+_BUDGET_UNIT_MULT = {"万": 10000, "w": 10000, "k": 1000, "千": 1000, None: 1}
+
+
 def _safe_int_from_text(x: str) -> Optional[int]:
     """
     支持：6000 / 1.2万 / 8k / 13k / 2w / 20000
@@ -90,6 +101,11 @@ def _safe_int_from_text(x: str) -> Optional[int]:
     if not s:
         return None
 
+    # 快路径：一次正则匹配直接返回；不匹配再走下面的宽松解析
+    m = _BUDGET_FAST_RE.match(s)
+    if m:
+        return int(float(m.group(1)) * _BUDGET_UNIT_MULT[m.group(2)])
+
     m = re.search(r"(\d+(?:\.\d+)?)\s*万", s)
     if m:
         try:
@@ -220,9 +236,31 @@ def _model_of(tv: Dict[str, Any]) -> str:
 # =========================================================
 # Dialogue Engine
 # =========================================================
+_RANK_CACHE_MAX = 32
+_POOL_TOP = 30            # 常规候选池：Top3 + 低/中价备选足够
+_POOL_TOP_FALLBACK = 300  # 过滤后不足 5 个时再取大池
+
+
 class Dialogue3p2:
     def __init__(self):
-        pass
+        # 同一会话内 tv_rank 结果缓存（LRU，key = tool_call 参数元组）
+        self._rank_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+
+    def _rank_cached(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        tv_rank_mod.tool_call 的会话级缓存：相同 (size, scene, brand, budget, year, top) 直接复用。
+        返回值只读；_run_3p2 入池时会 dict() 拷贝后再加派生字段。
+        """
+        key = (args["size"], args["scene"], args["brand"], args["budget_max"], args["prefer_year"], args["top"])
+        hit = self._rank_cache.get(key)
+        if hit is not None:
+            self._rank_cache.move_to_end(key)
+            return hit
+        ranked = tv_rank_mod.tool_call(args)
+        self._rank_cache[key] = ranked
+        if len(self._rank_cache) > _RANK_CACHE_MAX:
+            self._rank_cache.popitem(last=False)
+        return ranked
 
     def reset_state(self) -> DialogState:
         return DialogState(
@@ -318,30 +356,30 @@ class Dialogue3p2:
             return _brand_to_db(st.brand_list[0])
         return None
 
+    def _annotate_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        入池时一次性预计算派生字段（下划线开头，不参与输出）：
+        - _brand_db：规范化后的品牌（sys.intern，后续过滤直接比较）
+        - _model：型号字符串（去重/比较时直接读）
+        - _price：_get_price 结果，缺价记 0（过滤/排序时直接读）
+        """
+        for t in items:
+            t["_brand_db"] = sys.intern(_brand_to_db(str(t.get("brand") or "")))
+            t["_model"] = _model_of(t) or ""
+            t["_price"] = _get_price(t) or 0
+        return items
+
     def _apply_brand_exclude(self, items: List[Dict[str, Any]], st: DialogState) -> List[Dict[str, Any]]:
         if st.brand_mode != "exclude":
             return items
-        ex = set([_brand_to_db(x) for x in (st.brand_list or []) if x])
+        ex = {sys.intern(_brand_to_db(x)) for x in (st.brand_list or []) if x}
         if not ex:
             return items
-        out = []
-        for t in items:
-            b = _brand_to_db(str(t.get("brand") or ""))
-            if b and b in ex:
-                continue
-            out.append(t)
-        return out
+        return [t for t in items if not t["_brand_db"] or t["_brand_db"] not in ex]
 
     def _apply_budget_and_price_filter(self, items: List[Dict[str, Any]], budget_max: int) -> List[Dict[str, Any]]:
-        out = []
-        for t in items:
-            p = _get_price(t)
-            if p is None or p <= 0:
-                continue
-            if p > budget_max:
-                continue
-            out.append(t)
-        return out
+        # _price 缺价为 0，一个区间比较同时完成“缺价过滤 + 严格预算内”
+        return [t for t in items if 0 < t["_price"] <= budget_max]
 
     def _sort_recent_then_price(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -351,7 +389,7 @@ class Dialogue3p2:
             items,
             key=lambda t: (
                 _launch_key(t.get("launch_date")),
-                _get_price(t) or 0,
+                t["_price"],
             ),
             reverse=True,
         )
@@ -377,11 +415,10 @@ class Dialogue3p2:
         """
         cand = []
         for t in pool:
-            m = _model_of(t)
+            m = t["_model"]
             if not m or m in used_models:
                 continue
-            p = _get_price(t)
-            if p is None or p <= 0 or p > budget_max:
+            if not 0 < t["_price"] <= budget_max:
                 continue
             cand.append(t)
 
@@ -389,7 +426,7 @@ class Dialogue3p2:
             return None, None
 
         # 低价：按价格升序；同价选更新的
-        low_sorted = sorted(cand, key=lambda t: (_get_price(t) or 10**18, -_launch_key(t.get("launch_date"))))
+        low_sorted = sorted(cand, key=lambda t: (t["_price"], -_launch_key(t.get("launch_date"))))
         low_best = low_sorted[0] if low_sorted else None
 
         # 中价：按 |price - budget*0.7|；同等偏向更新/更高价
@@ -397,50 +434,57 @@ class Dialogue3p2:
         mid_sorted = sorted(
             cand,
             key=lambda t: (
-                abs((_get_price(t) or 0) - target),
+                abs(t["_price"] - target),
                 -_launch_key(t.get("launch_date")),
-                -(_get_price(t) or 0),
+                -t["_price"],
             ),
         )
         mid_best = mid_sorted[0] if mid_sorted else None
 
-        if low_best and mid_best and _model_of(low_best) == _model_of(mid_best):
+        if low_best and mid_best and low_best["_model"] == mid_best["_model"]:
             for t in mid_sorted[1:]:
-                if _model_of(t) != _model_of(low_best):
+                if t["_model"] != low_best["_model"]:
                     mid_best = t
                     break
 
         return low_best, mid_best
 
-    def _run_3p2(self, st: DialogState) -> str:
-        brand_for_tool = self._brand_for_tool(st)
-
+    def _ranked_pool(self, st: DialogState, top: int) -> List[Dict[str, Any]]:
+        """
+        取 tv_rank 候选池并做入池标注 + 预算/缺价/排除品牌过滤
+        """
         # ✅ 直接调用本地 tv_rank（与你 CLI tv_rank.py 一致）
-        ranked = tv_rank_mod.tool_call(
+        ranked = self._rank_cached(
             {
                 "size": int(st.size),
                 "scene": str(st.scene),
-                "brand": brand_for_tool,                 # only 才传
+                "brand": self._brand_for_tool(st),       # only 才传
                 "budget_max": int(st.budget_max),
                 "prefer_year": 2026,
-                "top": 300,                              # 需要足够大的池，+2 才稳定
+                "top": int(top),
             }
         )
 
         items = (ranked or {}).get("top", []) if isinstance(ranked, dict) else []
-        items = list(items)
+        items = self._annotate_items([dict(t) for t in items])
+
+        # 严格预算内 + 缺价过滤（先跑：判断便宜且筛掉的最多）
+        items = self._apply_budget_and_price_filter(items, int(st.budget_max))
 
         # exclude 过滤（any/only 已由 tool_brand/不传 brand 处理）
-        items = self._apply_brand_exclude(items, st)
+        return self._apply_brand_exclude(items, st)
 
-        # 严格预算内 + 缺价过滤
-        items = self._apply_budget_and_price_filter(items, int(st.budget_max))
+    def _run_3p2(self, st: DialogState) -> str:
+        # 先取小池（最终只展示 3+2）；过滤后不足 5 个再退回大池
+        items = self._ranked_pool(st, _POOL_TOP)
+        if len(items) < 5:
+            items = self._ranked_pool(st, _POOL_TOP_FALLBACK)
 
         # 再按“新机型优先；同月价格高->低”排序（佣金友好）
         items = self._sort_recent_then_price(items)
 
         top3 = items[:3]
-        used_models = set([_model_of(t) for t in top3 if _model_of(t)])
+        used_models = {t["_model"] for t in top3 if t["_model"]}
 
         low_best, mid_best = self._pick_low_and_mid(
             pool=items,
@@ -1,10 +1,34 @@
 # -*- coding: utf-8 -*-
+import functools
+import os
 import yaml
 from typing import Dict, Any, List, Tuple
 
+try:
+    # 优先用 libyaml 的 C 实现，没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# 可选：numba 可用时把打分内层循环 JIT 成本地代码；不可用则走纯 Python score_one
+try:
+    import numpy as np
+    from numba import njit
+except Exception:
+    np = None
+    njit = None
+
+_NEG_KEYS = ("reflection_specular", "uniformity_gray50_max_dev", "input_lag_ms_60hz")
+_BOOL_KEYS = ("vrr", "allm")
+
 def load_profiles(path="tv_buy_1_0/config/profiles.yaml") -> Dict[str, Any]:
+    # 按 mtime 缓存：文件没改就不重复解析；返回值只读共享
+    return _load_profiles_cached(path, os.path.getmtime(path))
+
+@functools.lru_cache(maxsize=4)
+def _load_profiles_cached(path: str, mtime: float) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)["profiles"]
+        return yaml.load(f, Loader=_Loader)["profiles"]
 
 def norm_pos(x, lo, hi):
     if x is None: return 0.0
@@ -40,10 +64,10 @@ def score_one(tv: Dict[str, Any], weights: Dict[str, float], stats: Dict[str, Tu
         if k == "price_value":
             lo, hi = stats["street_rmb"]
             s = norm_neg(tv.get("street_rmb"), lo, hi)
-        elif k in ("reflection_specular", "uniformity_gray50_max_dev", "input_lag_ms_60hz"):
+        elif k in _NEG_KEYS:
             lo, hi = stats.get(k, (0.0, 1.0))
             s = norm_neg(tv.get(k), lo, hi)
-        elif k in ("vrr", "allm"):
+        elif k in _BOOL_KEYS:
             s = 1.0 if tv.get(k) == 1 else 0.0
         else:
             lo, hi = stats.get(k, (0.0, 1.0))
@@ -54,14 +78,95 @@ def score_one(tv: Dict[str, Any], weights: Dict[str, float], stats: Dict[str, Tu
 
     return total, parts
 
+if njit is not None:
+    # 不开 fastmath（同 run_reco 的内核）：(x - lo) / (hi - lo) 不能被改写成乘倒数，要与 score_one 逐位一致
+    @njit(cache=True)
+    def _score_kernel(values, present, weights, los, his, is_neg, is_bool, out):
+        """
+        values: (N, K)；present: (N, K) 是否有值（缺失不靠 NaN 判断）
+        out: (N, K) 写入每项加权分（与 score_one 的 parts 一致）
+        """
+        n, k = values.shape
+        for i in range(n):
+            for j in range(k):
+                x = values[i, j]
+                if is_bool[j]:
+                    s = 1.0 if x == 1.0 else 0.0
+                else:
+                    lo = los[j]
+                    hi = his[j]
+                    if not present[i, j] or hi == lo:
+                        s = 0.0
+                    else:
+                        if x < lo:
+                            x = lo
+                        elif x > hi:
+                            x = hi
+                        s = (x - lo) / (hi - lo)
+                    if is_neg[j]:
+                        s = 1.0 - s
+                out[i, j] = s * weights[j]
+else:
+    _score_kernel = None
+
+
+def _score_all_jit(cands: List[Dict[str, Any]], weights: Dict[str, float], stats: Dict[str, Tuple[float, float]]):
+    """
+    把候选打包成 (N, K) 数组，一次调用 _score_kernel；返回 [(total, parts), ...]
+    """
+    keys = list(weights.keys())
+    n, k = len(cands), len(keys)
+    values = np.zeros((n, k), dtype=np.float64)
+    present = np.zeros((n, k), dtype=np.bool_)
+    w = np.empty(k, dtype=np.float64)
+    los = np.zeros(k, dtype=np.float64)
+    his = np.ones(k, dtype=np.float64)
+    is_neg = np.zeros(k, dtype=np.bool_)
+    is_bool = np.zeros(k, dtype=np.bool_)
+
+    for j, key in enumerate(keys):
+        w[j] = float(weights[key])
+        field = "street_rmb" if key == "price_value" else key
+        if key in _BOOL_KEYS:
+            is_bool[j] = True
+            for i, tv in enumerate(cands):
+                values[i, j] = 1.0 if tv.get(key) == 1 else 0.0
+            continue
+        lo, hi = stats["street_rmb"] if key == "price_value" else stats.get(key, (0.0, 1.0))
+        los[j], his[j] = lo, hi
+        is_neg[j] = key == "price_value" or key in _NEG_KEYS
+        for i, tv in enumerate(cands):
+            v = tv.get(field)
+            if v is not None:
+                values[i, j] = float(v)
+                present[i, j] = True
+
+    out = np.empty((n, k), dtype=np.float64)
+    _score_kernel(values, present, w, los, his, is_neg, is_bool, out)
+
+    res = []
+    for i in range(n):
+        row = out[i].tolist()
+        parts = dict(zip(keys, row))
+        total = 0.0
+        for v in row:
+            total += v
+        res.append((total, parts))
+    return res
+
+
 def rank(cands: List[Dict[str, Any]], profile_name: str) -> List[Dict[str, Any]]:
     profiles = load_profiles()
     weights = profiles[profile_name]["weights"]
     stats = compute_stats(cands)
 
+    if _score_kernel is not None and cands:
+        scored = _score_all_jit(cands, weights, stats)
+    else:
+        scored = [score_one(tv, weights, stats) for tv in cands]
+
     out = []
-    for tv in cands:
-        total, parts = score_one(tv, weights, stats)
+    for tv, (total, parts) in zip(cands, scored):
         t2 = dict(tv)
         t2["_score_total"] = total
         t2["_score_parts"] = parts
@@ -1,15 +1,29 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
+import importlib
+import inspect
 import json
 import os
 import re
 import sys
 import subprocess
+import threading
 from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Dict, Optional, List, Tuple
 
+try:
+    import orjson  # 可选：C 实现 JSON，直接吃 bytes
+except ImportError:
+    orjson = None
+
+from tv_buy_1_0.tools_cli._framing import FRAMED_ENV, RESULT_MARKER
+
 
 # =========================================================
 # Paths
@@ -28,6 +42,19 @@ SCRIPT_MAP = {
     # intent_parse 我这里内置实现（更快更稳，也避免再起子进程）
 }
 
+# 进程内调用：tools_cli/*.py 暴露 run(**arguments) -> dict（与 CLI stdout 同结构）
+TOOL_MODULES = {
+    "tv_search": "tv_buy_1_0.tools_cli.tv_search",
+    "tv_rank": "tv_buy_1_0.tools_cli.tv_rank",
+    "tv_compare": "tv_buy_1_0.tools_cli.tv_compare",
+    "tv_pick": "tv_buy_1_0.tools_cli.tv_pick",
+}
+
+# 需要隔离（沙箱/不同 venv）时强制走子进程：TVBUY_TOOLS_SUBPROCESS=1
+# 子进程模式默认复用常驻 worker 池（TVBUY_TOOL_WORKERS 个），不再每次起新 python
+FORCE_SUBPROCESS = os.getenv("TVBUY_TOOLS_SUBPROCESS", "0") == "1"
+TOOL_WORKERS = int(os.getenv("TVBUY_TOOL_WORKERS", "2"))
+
 VERSION = "tv-agent-tools/1.0"
 
 
@@ -131,6 +158,7 @@ TOOL_SCHEMA: List[Dict[str, Any]] = [
 ]
 
 
+@functools.lru_cache(maxsize=1)
 def get_schema() -> Dict[str, Any]:
     return {"ok": True, "version": VERSION, "tools": TOOL_SCHEMA}
 
@@ -179,6 +207,29 @@ def _intent_parse(text: str) -> Dict[str, Any]:
 # =========================================================
 # Subprocess runner (reuse tools_cli results)
 # =========================================================
+_RESULT_MARKER_B = RESULT_MARKER.encode("ascii")
+
+# 子进程环境只在 import 时算一次（不再每次调用 copy 整个 os.environ）；只读，避免被误改
+# - PYTHONPATH 前置 PROJECT_ROOT：保证 `import tv_buy_1_0` 可用
+# - FRAMED_ENV：结果按 RESULT_MARKER 分帧输出
+_TOOL_ENV = MappingProxyType({
+    **os.environ,
+    "PYTHONPATH": str(PROJECT_ROOT) + (os.pathsep + os.environ["PYTHONPATH"] if os.environ.get("PYTHONPATH") else ""),
+    FRAMED_ENV: "1",
+})
+
+
+def _json_loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _tail(raw: bytes, n: int = 2000) -> str:
+    """Decode only the trailing n bytes (for error messages)."""
+    return raw[-n:].decode("utf-8", "replace")
+
+
 def _run_cli(script: Path, args: List[str], timeout: int = 30) -> Dict[str, Any]:
     """
     Run tools_cli/*.py and parse JSON from stdout.
@@ -187,43 +238,72 @@ def _run_cli(script: Path, args: List[str], timeout: int = 30) -> Dict[str, Any]
     if not script.exists():
         raise FileNotFoundError(f"tool script not found: {script}")
 
-    env = os.environ.copy()
-    # ensure `import tv_buy_1_0` works
-    env["PYTHONPATH"] = str(PROJECT_ROOT) + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
-
     cmd = [sys.executable, str(script)] + args
 
     p = subprocess.run(
         cmd,
         cwd=str(PROJECT_ROOT),
-        env=env,
+        env=_TOOL_ENV,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         timeout=timeout,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
     )
+    return _parse_cli_output(script, p.returncode, p.stdout, p.stderr)
+
+
+async def _run_cli_async(script: Path, args: List[str], timeout: int = 30) -> Dict[str, Any]:
+    """
+    Async twin of _run_cli (asyncio.create_subprocess_exec), so several tools can run concurrently.
+    """
+    if not script.exists():
+        raise FileNotFoundError(f"tool script not found: {script}")
+
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        str(script),
+        *args,
+        cwd=str(PROJECT_ROOT),
+        env=_TOOL_ENV,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return _parse_cli_output(script, proc.returncode, out, err)
 
-    out = (p.stdout or "").strip()
-    err = (p.stderr or "").strip()
 
-    if p.returncode != 0:
-        raise RuntimeError(f"tool failed: {script.name} (code={p.returncode})\nSTDERR:\n{err}\nSTDOUT:\n{out}")
+def _parse_cli_output(script: Path, returncode: int, stdout: Optional[bytes], stderr: Optional[bytes]) -> Dict[str, Any]:
+    # keep raw bytes: JSON is parsed straight from bytes, text is decoded only for errors
+    out = (stdout or b"").strip()
+    err = (stderr or b"").strip()
 
-    # some scripts might print logs; find the last JSON object
-    # strategy: locate first '{' from the end
+    if returncode != 0:
+        raise RuntimeError(f"tool failed: {script.name} (code={returncode})\nSTDERR:\n{_tail(err)}\nSTDOUT:\n{_tail(out)}")
+
+    # framed output: everything after the last RESULT_MARKER is the JSON payload,
+    # so logs / nested JSON printed before it can't confuse the parser
     j = None
-    if out:
-        idx = out.rfind("{")
+    idx = out.rfind(_RESULT_MARKER_B)
+    if idx >= 0:
+        try:
+            j = _json_loads(out[idx + len(_RESULT_MARKER_B):])
+        except Exception:
+            j = None
+    elif out:
+        # legacy (unframed) script: locate first '{' from the end
+        idx = out.rfind(b"{")
         if idx >= 0:
             try:
-                j = json.loads(out[idx:])
+                j = _json_loads(out[idx:])
             except Exception:
                 j = None
 
     if j is None:
-        raise RuntimeError(f"tool output is not valid JSON.\nSTDOUT:\n{out}\nSTDERR:\n{err}")
+        raise RuntimeError(f"tool output is not valid JSON.\nSTDOUT:\n{_tail(out)}\nSTDERR:\n{_tail(err)}")
 
     return j
 
@@ -308,6 +388,87 @@ def _args_tv_pick(arguments: Dict[str, Any]) -> List[str]:
     return args
 
 
+# =========================================================
+# In-process dispatch
+# =========================================================
+TOOL_FN_MAP: Dict[str, Any] = {}
+
+
+def _tool_fn(name: str):
+    """
+    Lazily import tools_cli.<name> and return its run(); None if the module has no run().
+    """
+    if name not in TOOL_FN_MAP:
+        mod = importlib.import_module(TOOL_MODULES[name])
+        TOOL_FN_MAP[name] = getattr(mod, "run", None)
+    return TOOL_FN_MAP[name]
+
+
+@functools.lru_cache(maxsize=None)
+def _run_params(fn) -> Optional[frozenset]:
+    """
+    Parameter names accepted by run(); None if it takes **kwargs (then every key is passed through).
+    """
+    params = inspect.signature(fn).parameters.values()
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params):
+        return None
+    return frozenset(p.name for p in params)
+
+
+def call_run(fn, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Call run() with only the keys its signature accepts: the model may send extra
+    fields, which the CLI path ignores (argv builders) and run() must ignore too.
+    """
+    names = _run_params(fn)
+    if names is not None:
+        arguments = {k: v for k, v in arguments.items() if k in names}
+    return fn(**arguments)
+
+
+_ARGS_BUILDERS = {
+    "tv_search": _args_tv_search,
+    "tv_rank": _args_tv_rank,
+    "tv_compare": _args_tv_compare,
+    "tv_pick": _args_tv_pick,
+}
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool():
+    """
+    Lazily start the persistent worker pool (subprocess mode only).
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            from tv_buy_1_0.agent.tool_worker_pool import WorkerPool
+
+            _POOL = WorkerPool(size=TOOL_WORKERS, env=_TOOL_ENV)
+            atexit.register(_POOL.close)
+        return _POOL
+
+
+def _dispatch(name: str, arguments: Dict[str, Any], timeout: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Prefer the in-process run(); in subprocess mode use the warm worker pool;
+    fall back to spawning tools_cli/<name>.py only when the module has no run().
+
+    Timeout: an in-process call cannot be interrupted, so it runs WITHOUT a timeout
+    (the tools are local SQLite queries). Passing timeout=... routes the call to the
+    worker pool, which enforces it; the script fallback always uses timeout (default 30s).
+    """
+    if FORCE_SUBPROCESS or timeout is not None:
+        return _get_pool().call(name, arguments, timeout=timeout or 30)
+    fn = _tool_fn(name)
+    if fn is not None:
+        return call_run(fn, arguments)
+    return _run_cli(SCRIPT_MAP[name], _ARGS_BUILDERS[name](arguments), timeout=30)
+
+
 # =========================================================
 # Public entry: call_tool
 # =========================================================
@@ -325,30 +486,46 @@ def call_tool(
             data = _intent_parse(arguments.get("text", ""))
             return {"ok": True, "version": VERSION, "request_id": request_id, "name": name, "data": data}
 
-        if name == "tv_search":
-            script = SCRIPT_MAP["tv_search"]
-            cli_args = _args_tv_search(arguments)
-            data = _run_cli(script, cli_args)
-            # tools_cli/tv_search.py 通常直接输出 {"ok":true,"data":...} 或 {"filters":...}
+        if name in TOOL_MODULES:
+            data = _dispatch(name, arguments)
+            # tools_cli/*.py 通常输出 {"ok":true,"data":...} 或 {"filters":...}
             # 这里统一把核心放到 data
             return {"ok": True, "version": VERSION, "request_id": request_id, "name": name, "data": data.get("data", data)}
 
-        if name == "tv_rank":
-            script = SCRIPT_MAP["tv_rank"]
-            cli_args = _args_tv_rank(arguments)
-            data = _run_cli(script, cli_args)
-            return {"ok": True, "version": VERSION, "request_id": request_id, "name": name, "data": data.get("data", data)}
+        return {"ok": False, "version": VERSION, "request_id": request_id, "name": name, "error": f"unknown tool: {name}"}
 
-        if name == "tv_compare":
-            script = SCRIPT_MAP["tv_compare"]
-            cli_args = _args_tv_compare(arguments)
-            data = _run_cli(script, cli_args)
-            return {"ok": True, "version": VERSION, "request_id": request_id, "name": name, "data": data.get("data", data)}
+    except Exception as e:
+        return {"ok": False, "version": VERSION, "request_id": request_id, "name": name, "error": str(e)}
 
-        if name == "tv_pick":
-            script = SCRIPT_MAP["tv_pick"]
-            cli_args = _args_tv_pick(arguments)
-            data = _run_cli(script, cli_args)
+
+async def _dispatch_async(name: str, arguments: Dict[str, Any], timeout: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Async twin of _dispatch (same timeout rules): blocking in-process / pool calls run
+    in a worker thread, the legacy script path uses asyncio subprocesses.
+    """
+    if FORCE_SUBPROCESS or timeout is not None:
+        return await asyncio.to_thread(_get_pool().call, name, arguments, timeout or 30)
+    fn = _tool_fn(name)
+    if fn is not None:
+        return await asyncio.to_thread(call_run, fn, arguments)
+    return await _run_cli_async(SCRIPT_MAP[name], _ARGS_BUILDERS[name](arguments), timeout=30)
+
+
+async def call_tool_async(
+    name: str,
+    arguments: Dict[str, Any],
+    request_id: str = "dev",
+) -> Dict[str, Any]:
+    """
+    Async variant of call_tool (same response shape); lets independent tools overlap.
+    """
+    try:
+        if name == "intent_parse":
+            data = _intent_parse(arguments.get("text", ""))
+            return {"ok": True, "version": VERSION, "request_id": request_id, "name": name, "data": data}
+
+        if name in TOOL_MODULES:
+            data = await _dispatch_async(name, arguments)
             return {"ok": True, "version": VERSION, "request_id": request_id, "name": name, "data": data.get("data", data)}
 
         return {"ok": False, "version": VERSION, "request_id": request_id, "name": name, "error": f"unknown tool: {name}"}
@@ -357,6 +534,15 @@ def call_tool(
         return {"ok": False, "version": VERSION, "request_id": request_id, "name": name, "error": str(e)}
 
 
+async def call_tools_many(specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run several tool calls concurrently.
+      specs: [{"name": ..., "arguments": {...}, "request_id": ...}, ...]
+    Results keep the order of specs.
+    """
+    return list(await asyncio.gather(*[call_tool_async(**s) for s in specs]))
+
+
 # =========================================================
 # Local quick test
 # =========================================================
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+tv_buy_1_0/agent/tool_worker_pool.py
+
+常驻子进程池：子进程模式（TVBUY_TOOLS_SUBPROCESS=1）下不再每次调用都起一个新 python。
+- 每个 worker = python -m tv_buy_1_0.tools_cli.worker，启动时 import 一次，之后复用
+- 协议：每行一个 JSON（见 tools_cli/worker.py）
+- 空闲 worker 放在 queue.Queue 里，call() 取一个、用完放回
+- 超时看门狗：超时就 kill 该 worker 并重启，一个卡死的调用不会拖垮整个池
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson  # 可选：C 实现 JSON，直接吃 bytes
+except ImportError:
+    orjson = None
+
+TVBUY_ROOT = Path(__file__).resolve().parents[1]          # .../tv_buy_1_0
+PROJECT_ROOT = TVBUY_ROOT.parent                          # .../TV_Grab (repo root)
+
+WORKER_MODULE = "tv_buy_1_0.tools_cli.worker"
+
+
+class WorkerPool:
+    def __init__(self, size: int = 2, env: Optional[Dict[str, str]] = None):
+        self.size = max(1, int(size))
+        self.env = env
+        self._idle: "queue.Queue[subprocess.Popen]" = queue.Queue()
+        self._all: List[subprocess.Popen] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> subprocess.Popen:
+        p = subprocess.Popen(
+            [sys.executable, "-m", WORKER_MODULE],
+            cwd=str(PROJECT_ROOT),
+            env=self.env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        with self._lock:
+            self._all.append(p)
+        return p
+
+    def _discard(self, p: subprocess.Popen) -> None:
+        try:
+            p.kill()
+            p.wait(timeout=5)
+        except Exception:
+            pass
+        with self._lock:
+            if p in self._all:
+                self._all.remove(p)
+
+    def call(self, name: str, args: Dict[str, Any], timeout: float = 30) -> Dict[str, Any]:
+        if self._closed:
+            raise RuntimeError("worker pool is closed")
+
+        p = self._idle.get()
+        if p.poll() is not None:
+            # worker 已退出（崩溃/被杀）：换一个新的
+            self._discard(p)
+            p = self._spawn()
+
+        # 看门狗：超时直接 kill，readline 随即返回 EOF
+        timed_out = threading.Event()
+
+        def _on_timeout() -> None:
+            timed_out.set()
+            try:
+                p.kill()
+            except Exception:
+                pass
+
+        watchdog = threading.Timer(timeout, _on_timeout)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            # bytes 管道：响应直接按 bytes 解析，不再先解码成 str
+            p.stdin.write(json.dumps({"name": name, "args": args}).encode("ascii") + b"\n")
+            p.stdin.flush()
+            line = p.stdout.readline()
+        except (BrokenPipeError, OSError):
+            line = b""
+        finally:
+            watchdog.cancel()
+
+        if not line:
+            self._discard(p)
+            self._idle.put(self._spawn())
+            if timed_out.is_set():
+                raise TimeoutError(f"tool timed out after {timeout}s: {name}")
+            raise RuntimeError(f"tool worker exited unexpectedly: {name}")
+
+        self._idle.put(p)
+
+        resp = orjson.loads(line) if orjson is not None else json.loads(line)
+        if not resp.get("ok"):
+            raise RuntimeError(f"tool failed: {name}\n{resp.get('error')}")
+        return resp["result"]
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            procs = list(self._all)
+        for p in procs:
+            try:
+                p.stdin.close()
+            except Exception:
+                pass
+            self._discard(p)
@@ -1,14 +1,25 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import os
-from contextlib import contextmanager
-from pathlib import Path
-from typing import Any, Dict, Optional
+import asyncio
+import copy
+import functools
+from typing import Any, Dict, List, Optional
 
 import yaml
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+try:
+    import msgspec  # 可选：请求体解码+校验比 pydantic 快一个数量级
+except ImportError:
+    msgspec = None
+
+try:
+    # 优先用 libyaml 的 C 实现，没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
 from tv_buy_1_0.g2_lab.report.contrast_report import generate_contrast_report
 from tv_buy_1_0.g2_lab.report.postprocess import split_output
@@ -16,24 +27,6 @@ from tv_buy_1_0.g2_lab.report.postprocess import split_output
 router = APIRouter(prefix="/api/report", tags=["g2_report"])
 
 
-# =========================================================
-# 路径修复：确保 report 层使用相对路径时能找到 prompts
-# - __file__ = tv_buy_1_0/g2_lab/api/router_report_contrast.py
-# - parents[2] = tv_buy_1_0/
-# =========================================================
-TVBUY_ROOT = Path(__file__).resolve().parents[2]
-
-
-@contextmanager
-def _chdir(temp_dir: Path):
-    old = os.getcwd()
-    os.chdir(str(temp_dir))
-    try:
-        yield
-    finally:
-        os.chdir(old)
-
-
 # =========================================================
 # Request schema
 # =========================================================
@@ -54,7 +47,7 @@ def normalize_input(req: ContrastReportRequest) -> Dict[str, Any]:
         return req.contrast_test_record
 
     if req.yaml_text is not None and isinstance(req.yaml_text, str):
-        data = yaml.safe_load(req.yaml_text)
+        data = _parse_yaml_text(req.yaml_text)
         if isinstance(data, dict) and "contrast_test_record" in data:
             return data["contrast_test_record"]
         if isinstance(data, dict):
@@ -63,42 +56,136 @@ def normalize_input(req: ContrastReportRequest) -> Dict[str, Any]:
     raise ValueError("必须提供 contrast_test_record(dict) 或 yaml_text(str)")
 
 
-@router.post("/contrast")
-def report_contrast(req: ContrastReportRequest):
+def _parse_yaml_text(yaml_text: str) -> Any:
+    # 每个请求拿一份深拷贝：下游（generate_contrast_report / canonize）就算原地修改，也不会改到缓存和别的请求
+    return copy.deepcopy(_parse_yaml_text_cached(yaml_text))
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_yaml_text_cached(yaml_text: str) -> Any:
+    # 同一段 yaml_text 重试/重复提交时不重复解析（深拷贝比 YAML 解析便宜得多）
+    return yaml.load(yaml_text, Loader=_Loader)
+
+
+class BatchContrastReportRequest(BaseModel):
+    # 每一项与 /contrast 的请求体相同
+    records: List[ContrastReportRequest]
+
+
+# =========================================================
+# Body parsing：装了 msgspec 就用 msgspec 解码校验，再 model_construct（跳过 pydantic 二次校验）
+# 没装则退回 pydantic 的 model_validate_json；两条路径校验失败都返回 422
+# =========================================================
+if msgspec is not None:
+    class _ContrastReportBody(msgspec.Struct):
+        contrast_test_record: Optional[Dict[str, Any]] = None
+        yaml_text: Optional[str] = None
+
+    class _BatchContrastReportBody(msgspec.Struct):
+        records: List[_ContrastReportBody]
+
+
+def _to_request(b: Any) -> ContrastReportRequest:
+    return ContrastReportRequest.model_construct(contrast_test_record=b.contrast_test_record, yaml_text=b.yaml_text)
+
+
+async def parse_contrast_request(request: Request) -> ContrastReportRequest:
+    body = await request.body()
+    try:
+        if msgspec is not None:
+            return _to_request(msgspec.json.decode(body, type=_ContrastReportBody))
+        return ContrastReportRequest.model_validate_json(body)
+    except (ValidationError, ValueError) as e:
+        # msgspec.ValidationError / DecodeError 都是 ValueError 子类
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+async def parse_batch_contrast_request(request: Request) -> BatchContrastReportRequest:
+    body = await request.body()
+    try:
+        if msgspec is not None:
+            b = msgspec.json.decode(body, type=_BatchContrastReportBody)
+            return BatchContrastReportRequest.model_construct(records=[_to_request(r) for r in b.records])
+        return BatchContrastReportRequest.model_validate_json(body)
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _body_schema(model: type) -> Dict[str, Any]:
+    # 请求体改由 dependency 解析后，用 openapi_extra 把 schema 补回 /docs
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": model.model_json_schema()}}}}
+
+
+# 批量接口：单次最多多少条、同时最多几个 LLM 请求在飞（避免打爆上游限流）
+BATCH_MAX_RECORDS = 20
+BATCH_CONCURRENCY = 4
+
+
+def build_contrast_report(req: ContrastReportRequest) -> Dict[str, Any]:
+    contrast_record = normalize_input(req)
+
+    # report 层 prompt 路径都是基于 __file__ 的绝对路径，不需要切 cwd（os.chdir 是进程级的，并发请求会互相踩）
+    meta, raw_output = generate_contrast_report(contrast_record)
+
+    analysis_text, editorial_yaml = split_output(raw_output)
+
+    editorial_obj = None
+    if editorial_yaml:
+        try:
+            editorial_obj = yaml.load(editorial_yaml, Loader=_Loader)
+        except Exception:
+            editorial_obj = None
+
+    return {
+        "kind": "contrast",
+        "model": meta.get("model"),
+        "prompt": {
+            "id": meta.get("prompt_id"),
+            "version": meta.get("prompt_version"),
+        },
+        "analysis_text": analysis_text,
+        "editorial_verdict_yaml": editorial_yaml,
+        "editorial_verdict": editorial_obj,
+        "raw_output": raw_output,
+    }
+
+
+@router.post("/contrast", openapi_extra=_body_schema(ContrastReportRequest))
+async def report_contrast(req: ContrastReportRequest = Depends(parse_contrast_request)):
     """
     输入：contrast_test_record / yaml_text
     输出：analysis_text + editorial_verdict_yaml + raw_output
+    - 阻塞的 LLM 调用丢到线程里，事件循环不被占住（与 /contrast/batch 同一套执行方式）
     """
     try:
-        contrast_record = normalize_input(req)
+        return await asyncio.to_thread(build_contrast_report, req)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"report generation failed: {e}")
+
 
-        # ✅ 关键：临时切到 tv_buy_1_0 根目录，保证 report 层相对路径可用
-        with _chdir(TVBUY_ROOT):
-            meta, raw_output = generate_contrast_report(contrast_record)
+@router.post("/contrast/batch", openapi_extra=_body_schema(BatchContrastReportRequest))
+async def report_contrast_batch(req: BatchContrastReportRequest = Depends(parse_batch_contrast_request)):
+    """
+    输入：records = [ContrastReportRequest, ...]
+    输出：与 records 同序的结果列表；每项 ok=true 时字段同 /contrast，失败则 ok=false + error
+    - 每条跑在线程池里并发调用 LLM（最多 BATCH_CONCURRENCY 个同时在飞），总耗时≈最慢的一批而不是 N 倍
+    """
+    if not req.records:
+        raise HTTPException(status_code=400, detail="records 不能为空")
+    if len(req.records) > BATCH_MAX_RECORDS:
+        raise HTTPException(status_code=400, detail=f"records 最多 {BATCH_MAX_RECORDS} 条")
 
-        analysis_text, editorial_yaml = split_output(raw_output)
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
 
-        editorial_obj = None
-        if editorial_yaml:
+    async def _one(r: ContrastReportRequest) -> Dict[str, Any]:
+        async with sem:
             try:
-                editorial_obj = yaml.safe_load(editorial_yaml)
-            except Exception:
-                editorial_obj = None
-
-        return {
-            "kind": "contrast",
-            "model": meta.get("model"),
-            "prompt": {
-                "id": meta.get("prompt_id"),
-                "version": meta.get("prompt_version"),
-            },
-            "analysis_text": analysis_text,
-            "editorial_verdict_yaml": editorial_yaml,
-            "editorial_verdict": editorial_obj,
-            "raw_output": raw_output,
-        }
+                return {"ok": True, **(await asyncio.to_thread(build_contrast_report, r))}
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+            except Exception as e:
+                return {"ok": False, "error": f"report generation failed: {e}"}
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"report generation failed: {e}")
+    return await asyncio.gather(*[_one(r) for r in req.records])
@@ -3,6 +3,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 import yaml
+try:
+    # 优先用 libyaml 的 C 实现，没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
 
 
 def _ensure_list(v) -> List[float]:
@@ -16,6 +21,8 @@ def _ensure_list(v) -> List[float]:
 def _to_float_or_none(v):
     if v is None:
         return None
+    if type(v) is float:
+        return v
     try:
         return float(v)
     except Exception:
@@ -56,76 +63,79 @@ def canonize_contrast_record(obj: Dict[str, Any]) -> Dict[str, Any]:
     """
     root = obj.get("contrast_test_record", obj)
 
-    meta = root.get("meta", {}) or {}
-    env = (meta.get("test_environment", {}) or {})
-    inst = (meta.get("instrument", {}) or {})
+    # 热路径：helper 绑成局部变量（少一次全局查找）；子 dict 一次 .get + or {}
+    _s, _f, _L = _to_str_or_none, _to_float_or_none, _ensure_list
+
+    meta = root.get("meta") or {}
+    env = meta.get("test_environment") or {}
+    inst = meta.get("instrument") or {}
 
-    meas = root.get("measurements", {}) or {}
-    native = meas.get("native_contrast", {}) or {}
-    eff = meas.get("effective_contrast", {}) or {}
+    meas = root.get("measurements") or {}
+    native = meas.get("native_contrast") or {}
+    eff = meas.get("effective_contrast") or {}
 
-    cm = root.get("computed_metrics", {}) or {}
-    ncr = cm.get("native_contrast_ratio", {}) or {}
-    ecr = cm.get("effective_contrast_ratio", {}) or {}
-    gain = cm.get("dimming_gain", {}) or {}
+    cm = root.get("computed_metrics") or {}
+    ncr = cm.get("native_contrast_ratio") or {}
+    ecr = cm.get("effective_contrast_ratio") or {}
+    gain = cm.get("dimming_gain") or {}
 
-    notes = root.get("extraction_notes", {}) or {}
+    notes = root.get("extraction_notes") or {}
 
     out: Dict[str, Any] = {
         "contrast_test_record": {
             "meta": {
-                "test_date": _to_str_or_none(meta.get("test_date")),
-                "device_id": _to_str_or_none(meta.get("device_id")),
-                "inspector": _to_str_or_none(meta.get("inspector")),
-                "standard_version": _to_str_or_none(meta.get("standard_version")),
+                "test_date": _s(meta.get("test_date")),
+                "device_id": _s(meta.get("device_id")),
+                "inspector": _s(meta.get("inspector")),
+                "standard_version": _s(meta.get("standard_version")),
                 "test_environment": {
-                    "ambient_light_lux": _to_str_or_none(env.get("ambient_light_lux")) or "<1 lux",
+                    "ambient_light_lux": _s(env.get("ambient_light_lux")) or "<1 lux",
                     "room_temperature_c": int(env.get("room_temperature_c", 23)),
                 },
                 "instrument": {
-                    "meter_model": _to_str_or_none(inst.get("meter_model")) or "CA-410",
+                    "meter_model": _s(inst.get("meter_model")) or "CA-410",
                     "meter_distance_mm": int(inst.get("meter_distance_mm", 30)),
                 },
             },
             "measurements": {
                 "native_contrast": {
-                    "mode": _to_str_or_none(native.get("mode")) or "Local Dimming OFF",
-                    "calibration_target_nits": _to_str_or_none(native.get("calibration_target_nits")) or "100 nits",
-                    "black_luminance_cd_m2": _ensure_list(native.get("black_luminance_cd_m2")),
-                    "white_luminance_cd_m2": _ensure_list(native.get("white_luminance_cd_m2")),
-                    "white_avg_nits": _to_float_or_none(native.get("white_avg_nits")),
-                    "black_avg_nits": _to_float_or_none(native.get("black_avg_nits")),
+                    "mode": _s(native.get("mode")) or "Local Dimming OFF",
+                    "calibration_target_nits": _s(native.get("calibration_target_nits")) or "100 nits",
+                    "black_luminance_cd_m2": _L(native.get("black_luminance_cd_m2")),
+                    "white_luminance_cd_m2": _L(native.get("white_luminance_cd_m2")),
+                    "white_avg_nits": _f(native.get("white_avg_nits")),
+                    "black_avg_nits": _f(native.get("black_avg_nits")),
                 },
                 "effective_contrast": {
-                    "mode": _to_str_or_none(eff.get("mode")) or "Local Dimming High / Auto",
-                    "calibration_target_nits": _to_str_or_none(eff.get("calibration_target_nits")) or "100 nits",
-                    "black_luminance_cd_m2": _ensure_list(eff.get("black_luminance_cd_m2")),
-                    "white_luminance_cd_m2": _ensure_list(eff.get("white_luminance_cd_m2")),
-                    "white_avg_nits": _to_float_or_none(eff.get("white_avg_nits")),
-                    "black_avg_nits": _to_float_or_none(eff.get("black_avg_nits")),
-                    "brightness_note": _to_str_or_none(eff.get("brightness_note")),
+                    "mode": _s(eff.get("mode")) or "Local Dimming High / Auto",
+                    "calibration_target_nits": _s(eff.get("calibration_target_nits")) or "100 nits",
+                    "black_luminance_cd_m2": _L(eff.get("black_luminance_cd_m2")),
+                    "white_luminance_cd_m2": _L(eff.get("white_luminance_cd_m2")),
+                    "white_avg_nits": _f(eff.get("white_avg_nits")),
+                    "black_avg_nits": _f(eff.get("black_avg_nits")),
+                    "brightness_note": _s(eff.get("brightness_note")),
                 },
             },
             "computed_metrics": {
                 "native_contrast_ratio": {
-                    "value": _to_float_or_none(ncr.get("value")),
-                    "formula": _to_str_or_none(ncr.get("formula")) or "white_avg_nits / black_avg_nits",
+                    "value": _f(ncr.get("value")),
+                    "formula": _s(ncr.get("formula")) or "white_avg_nits / black_avg_nits",
                     "source_fields": ncr.get("source_fields") or [
                         "measurements.native_contrast.white_avg_nits",
                         "measurements.native_contrast.black_avg_nits",
                     ],
                 },
                 "effective_contrast_ratio": {
-                    "value": _to_float_or_none(ecr.get("value")),
-                    "formula": _to_str_or_none(ecr.get("formula")) or "white_avg_nits / black_avg_nits",
+                    "value": _f(ecr.get("value")),
+                    "formula": _s(ecr.get("formula")) or "white_avg_nits / black_avg_nits",
                     "source_fields": ecr.get("source_fields") or [
                         "measurements.effective_contrast.white_avg_nits",
                         "measurements.effective_contrast.black_avg_nits",
                     ],
                 },
                 "dimming_gain": {
-                    "value": _to_float_or_none(gain.get("value")),
-                    "formula": _to_str_or_none(gain.get("formula")) or "effective_contrast_ratio / native_contrast_ratio",
+                    "value": _f(gain.get("value")),
+                    "formula": _s(gain.get("formula")) or "effective_contrast_ratio / native_contrast_ratio",
                 },
             },
             "extraction_notes": {
@@ -176,7 +186,7 @@ def canonize_and_validate_yaml_text(yaml_text: str) -> str:
     输入可能是 LLM 输出的 yaml（可能带 ``` 围栏），输出“宪法化后的最终 YAML 文本”
     """
     cleaned = _strip_code_fence(yaml_text)
-    obj = yaml.safe_load(cleaned) or {}
+    obj = yaml.load(cleaned, Loader=_Loader) or {}
     canon = canonize_contrast_record(obj)
     validate_contrast_record(canon)
-    return yaml.safe_dump(canon, allow_unicode=True, sort_keys=False)
+    return yaml.dump(canon, Dumper=_Dumper, allow_unicode=True, sort_keys=False)
@@ -3,24 +3,51 @@ from __future__ import annotations
 
 print("🔥 USING contrast_report FROM:", __file__)
 
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Tuple, List
+from typing import Any, Dict, Tuple, List, Optional
 
 import yaml
 
-from .llm_client import OpenAICompatClient
+try:
+    # 优先用 libyaml 的 C 实现，没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+from .llm_client import LlmResult, OpenAICompatClient
 
 # 当前文件：tv_buy_1_0/g2_lab/report/contrast_report.py
 # parents[1] => tv_buy_1_0/g2_lab
 PROMPT_FILE = Path(__file__).resolve().parents[1] / "prompts" / "contrast_analysis.yaml"
 
+# LLM 结果缓存：同一份 record + 同一个 prompt + 同一个模型 => 直接复用上次输出
+# - 进程内 LRU（_LLM_CACHE_MAX 条）挡在前面，磁盘 JSON（tv_buy_1_0/.cache/llm/）兜底跨进程/重启
+# - TVBUY_LLM_CACHE=0 关闭（比如调 prompt 时想每次都重新生成）
+LLM_CACHE_ENABLED = os.getenv("TVBUY_LLM_CACHE", "1") != "0"
+LLM_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "llm"
+_LLM_CACHE_MAX = 256
+_llm_cache: "OrderedDict[str, Tuple[Dict[str, Any], str]]" = OrderedDict()
+_llm_cache_lock = threading.Lock()
+
 
 def load_prompt_cfg() -> Dict[str, Any]:
     if not PROMPT_FILE.exists():
         raise FileNotFoundError(f"找不到提示词文件: {PROMPT_FILE}")
 
+    # 按 mtime 缓存：文件没改就不重复解析 YAML；改了自动重新加载
+    return _load_prompt_cfg_cached(PROMPT_FILE.stat().st_mtime)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_prompt_cfg_cached(mtime: float) -> Dict[str, Any]:
     with open(PROMPT_FILE, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f) or {}
+        cfg = yaml.load(f, Loader=_Loader) or {}
 
     if not isinstance(cfg, dict):
         raise ValueError(f"提示词文件格式不正确（应为 YAML dict）: {PROMPT_FILE}")
@@ -47,12 +74,16 @@ def _as_text(x: Any) -> str:
     - LlmResult(content/text/response/message...)
     - dict
     """
-    if x is None:
-        return ""
+    # 快路径：当前 client 固定返回 LlmResult（content 已是 str），一次 isinstance 就返回
+    if isinstance(x, LlmResult) and isinstance(x.content, str):
+        return x.content
 
     if isinstance(x, str):
         return x
 
+    if x is None:
+        return ""
+
     # 常见字段：content / text
     for attr in ["content", "text", "output", "result"]:
         if hasattr(x, attr):
@@ -78,29 +109,108 @@ def _as_text(x: Any) -> str:
             v = x.get(k)
             if isinstance(v, str):
                 return v
-        return yaml.safe_dump(x, allow_unicode=True, sort_keys=False)
+        return yaml.dump(x, Dumper=_Dumper, allow_unicode=True, sort_keys=False)
 
     # 最后兜底
     return str(x)
 
 
-def build_messages(system_prompt: str, contrast_record: Dict[str, Any]) -> List[Dict[str, str]]:
-    user_yaml = yaml.safe_dump(
+def _dump_record(contrast_record: Dict[str, Any]) -> str:
+    # 同一份 record（重试 / LLM 缓存未命中）不重复 YAML dump：先转 JSON 串当 key（保留字段顺序）
+    try:
+        record_json = json.dumps(contrast_record, ensure_ascii=False)
+    except (TypeError, ValueError):
+        # 有 JSON 表示不了的值（如 YAML 解析出的 date）：不走缓存
+        return _dump_record_yaml(contrast_record)
+    return _dump_record_cached(record_json)
+
+
+@functools.lru_cache(maxsize=64)
+def _dump_record_cached(record_json: str) -> str:
+    return _dump_record_yaml(json.loads(record_json))
+
+
+def _dump_record_yaml(contrast_record: Dict[str, Any]) -> str:
+    return yaml.dump(
         {"contrast_test_record": contrast_record},
+        Dumper=_Dumper,
         allow_unicode=True,
         sort_keys=False,
     )
+
+
+def build_messages(system_prompt: str, contrast_record: Dict[str, Any]) -> List[Dict[str, str]]:
+    user_yaml = _dump_record(contrast_record)
     return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": f"以下是测试工程师提供的 contrast_test_record 数据：\n\n{user_yaml}"},
     ]
 
 
+@functools.lru_cache(maxsize=1)
+def _get_client() -> OpenAICompatClient:
+    # 进程内复用同一个 client（底层 OpenAI/httpx 连接池随之复用，不再每次报告都新建）
+    return OpenAICompatClient()
+
+
+def _llm_cache_key(system_prompt: str, contrast_record: Dict[str, Any], model: Any) -> str:
+    # sort_keys=True：字段顺序不同但内容相同的 record 命中同一个 key（JSON 比 YAML dump 便宜得多）
+    record_json = json.dumps(contrast_record, ensure_ascii=False, sort_keys=True, default=str)
+    h = hashlib.blake2b(digest_size=16)
+    for part in (record_json, system_prompt, str(model)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _llm_cache_get(key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+    with _llm_cache_lock:
+        hit = _llm_cache.get(key)
+        if hit is not None:
+            _llm_cache.move_to_end(key)
+            return hit
+
+    try:
+        obj = json.loads((LLM_CACHE_DIR / f"{key}.json").read_text(encoding="utf-8"))
+        hit = (obj["meta"], obj["raw_output"])
+    except Exception:
+        return None
+
+    _llm_cache_put(key, hit, persist=False)
+    return hit
+
+
+def _llm_cache_put(key: str, value: Tuple[Dict[str, Any], str], persist: bool = True) -> None:
+    with _llm_cache_lock:
+        _llm_cache[key] = value
+        _llm_cache.move_to_end(key)
+        while len(_llm_cache) > _LLM_CACHE_MAX:
+            _llm_cache.popitem(last=False)
+
+    if not persist:
+        return
+    try:
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = LLM_CACHE_DIR / f"{key}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps({"meta": value[0], "raw_output": value[1]}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, LLM_CACHE_DIR / f"{key}.json")
+    except Exception:
+        pass  # 磁盘缓存只是加速，写失败不影响主流程
+
+
 def generate_contrast_report(contrast_record: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
     cfg = load_prompt_cfg()
     system_prompt = _get_system_prompt(cfg)
 
-    client = OpenAICompatClient()
+    client = _get_client()
+
+    key = None
+    if LLM_CACHE_ENABLED:
+        key = _llm_cache_key(system_prompt, contrast_record, getattr(client, "model", None))
+        hit = _llm_cache_get(key)
+        if hit is not None:
+            return dict(hit[0]), hit[1]
+
     messages = build_messages(system_prompt, contrast_record)
 
     raw = client.chat(messages=messages, temperature=0.2)
@@ -111,4 +221,6 @@ def generate_contrast_report(contrast_record: Dict[str, Any]) -> Tuple[Dict[str,
         "prompt_version": cfg.get("version", "unknown"),
         "model": getattr(client, "model", "unknown"),
     }
+    if key is not None and out_text.strip():
+        _llm_cache_put(key, (dict(meta), out_text))
     return meta, out_text
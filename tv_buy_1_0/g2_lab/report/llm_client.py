@@ -35,6 +35,15 @@ class LlmClient:
         - system: 合并所有 system 角色内容
         - user_prompt: 合并 user/assistant 的对话为一段文本（保证上下文）
         """
+        # 快路径：build_messages 固定传 [system, user] 两条，直接取，结果与下面通用循环一致
+        if messages and len(messages) == 2:
+            m0, m1 = messages
+            if m0.get("role") == "system" and m1.get("role") == "user":
+                sp = (m0.get("content") or "").strip()
+                up = (m1.get("content") or "").strip()
+                if up:
+                    return sp, f"用户：{up}"
+
         sys_parts: List[str] = []
         convo_parts: List[str] = []
 
@@ -1,17 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import re
 from typing import Optional, Tuple
 
-_EDITORIAL_RE = re.compile(r"(editorial_verdict:\s*\n(?:[ \t].*\n?)*)", re.M)
+try:
+    # 可选：RE2 线性时间匹配，LLM 输出再怪也不会回溯爆炸；没装就用标准库 re
+    import re2 as _re
+except ImportError:
+    import re as _re
+
+# flags 写成内联 (?si)/(?m)：re 和 re2 都认，不依赖两边 flags 常量是否一致
+_FENCE_RE = _re.compile(r"(?si)```(?:yaml|yml)\s*(.*?)```")
+_EDITORIAL_RE = _re.compile(r"(?m)(editorial_verdict:\s*\n(?:[ \t].*\n?)*)")
 
 def split_output(raw: str) -> Tuple[str, Optional[str]]:
     # 1) 优先抓 YAML 代码块
-    m = re.search(r"```(?:yaml|yml)\s*(.*?)```", raw, flags=re.S | re.I)
+    m = _FENCE_RE.search(raw)
     if m and "editorial_verdict" in m.group(1):
         yaml_block = m.group(1).strip()
-        analysis_text = re.sub(r"```(?:yaml|yml)\s*.*?```", "", raw, flags=re.S | re.I).strip()
+        # 直接切片去掉命中的围栏；后面极少还有别的 yaml 围栏，有才再 sub 一次
+        tail = raw[m.end():]
+        if "```" in tail:
+            tail = _FENCE_RE.sub("", tail)
+        analysis_text = (raw[: m.start()] + tail).strip()
         return analysis_text, yaml_block
 
     # 2) 抓 editorial_verdict: 段落
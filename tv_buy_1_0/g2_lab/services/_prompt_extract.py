@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
+import functools
 from pathlib import Path
 import yaml
 from typing import Dict, Any
 
+try:
+    # 优先用 libyaml 的 C 实现，没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
 # 当前文件：tv_buy_1_0/g2_lab/services/_prompt_extract.py
 # parents[1] => tv_buy_1_0/g2_lab
 PROMPT_FILE = Path(__file__).resolve().parents[1] / "prompts" / "contrast_extract_system.yaml"
@@ -11,7 +18,13 @@ def load_extract_prompt() -> Dict[str, Any]:
     if not PROMPT_FILE.exists():
         raise FileNotFoundError(f"[EXTRACT] 找不到 prompt 文件: {PROMPT_FILE}")
 
-    cfg = yaml.safe_load(PROMPT_FILE.read_text(encoding="utf-8"))
+    # 按 mtime 缓存：文件没改就不重复解析 YAML
+    return _load_extract_prompt_cached(PROMPT_FILE.stat().st_mtime)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_extract_prompt_cached(mtime: float) -> Dict[str, Any]:
+    cfg = yaml.load(PROMPT_FILE.read_text(encoding="utf-8"), Loader=_Loader)
     if not isinstance(cfg, dict):
         raise ValueError("[EXTRACT] prompt YAML 不是 dict")
 
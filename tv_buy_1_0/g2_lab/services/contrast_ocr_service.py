@@ -1,40 +1,79 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import json
+import os
 import re
-import tempfile
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 
 
 import yaml
 from PIL import Image
 
+try:
+    # 优先用 libyaml 的 C 实现，没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeDumper as _Dumper
+
 # ✅ 关键：Web 从 TV_Grab 根目录启动（python -m uvicorn tv_buy_1_0.web.app:app）
 # 所以不能 from llm.xxx，要从 tv_buy_1_0.llm.xxx 导入
 try:
     # ✅ 豆包 Vision（火山方舟 Ark）
-    from tv_buy_1_0.llm.doubao_vision import chat_with_images
+    from tv_buy_1_0.llm.doubao_vision import chat_with_images_async, new_async_ark_client
 except ModuleNotFoundError:
     # 兜底：如果你从 tv_buy_1_0 目录里直接跑脚本（非 package 模式）
-    from llm.doubao_vision import chat_with_images
+    from llm.doubao_vision import chat_with_images_async, new_async_ark_client
+
+try:
+    import numpy as np  # 可选：数字提取/筛选走向量化
+except ImportError:
+    np = None
+
+try:
+    from aiolimiter import AsyncLimiter  # 可选：按 RPS 限流
+except ImportError:
+    AsyncLimiter = None
+
+# 并发识别：同时在飞的 Vision 请求上限；TVBUY_OCR_RPS>0 且装了 aiolimiter 时再按每秒请求数限流
+OCR_CONCURRENCY = 4
+OCR_RPS = float(os.getenv("TVBUY_OCR_RPS", "0") or 0)
+
+# 快路径：有效对比度的白场已达到 100nits 目标时，不会有「目标亮度不可满足」说明，跳过全图说明识别
+# TVBUY_OCR_FAST_PATH=0 关闭（总是识别说明文字）
+OCR_FAST_PATH = os.getenv("TVBUY_OCR_FAST_PATH", "1") != "0"
+BRIGHTNESS_TARGET_NITS = 100.0
+
+# OCR 结果缓存：同一张图（按文件内容哈希）+ 同一段指令 + 同一个视觉模型 => 直接复用上次识别结果
+# - 和 report/contrast_report.py 的 LLM 缓存同一套：进程内 LRU + 磁盘 JSON（tv_buy_1_0/.cache/ocr/）
+# - TVBUY_OCR_CACHE=0 关闭（比如调 OCR 指令时）
+OCR_CACHE_ENABLED = os.getenv("TVBUY_OCR_CACHE", "1") != "0"
+OCR_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "ocr"
+_OCR_CACHE_MAX = 512
+_ocr_cache: "OrderedDict[str, str]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
 
 
 # =========================
 # 正则：抓数字（float/int）
 # =========================
-_NUM_RE = re.compile(r"(?<!\d)(\d+\.\d+|\d+)(?!\d)")
+# 不用前后断言：\d+ 贪婪匹配本来就不会从数字中间开始/结束，去掉后 SRE 走更快的字面扫描
+_NUM_RE = re.compile(r"\d+(?:\.\d+)?")
 
 
-def _extract_numbers(text: str) -> List[float]:
-    nums: List[float] = []
-    for m in _NUM_RE.finditer(text or ""):
-        s = m.group(1)
-        try:
-            nums.append(float(s))
-        except Exception:
-            pass
+def _extract_numbers(text: str):
+    """有 numpy 时返回 float64 ndarray（给 _pick_* 直接做向量筛选），否则返回 List[float]"""
+    # findall 无分组直接给出整段匹配；\d 命中的字符（含全角数字）float() 都能解析
+    nums = list(map(float, _NUM_RE.findall(text or "")))
+    if np is not None:
+        return np.array(nums, dtype=np.float64)
     return nums
 
 
@@ -58,15 +97,29 @@ def _round_keep(x: Optional[float], nd: int) -> Optional[float]:
     return round(x, nd)
 
 
-def _pick_black(nums: List[float], n: int = 8) -> List[float]:
+def _pick_black(nums, n: int = 8) -> List[float]:
     # 黑场：0 < x < 1，取最小的 n 个更像黑
+    if np is not None:
+        arr = np.asarray(nums, dtype=np.float64)
+        cand = arr[(arr > 0) & (arr < 1.0)]
+        if cand.size > n:
+            cand = np.partition(cand, n - 1)[:n]  # top-k：O(n) 选出最小的 n 个，再只排这 n 个
+        return np.sort(cand).tolist()
+
     cand = [x for x in nums if 0 < x < 1.0]
     cand.sort()
     return cand[:n]
 
 
-def _pick_white(nums: List[float], n: int = 8) -> List[float]:
+def _pick_white(nums, n: int = 8) -> List[float]:
     # 白场：优先 80~150（你示例都是 103~114）
+    if np is not None:
+        arr = np.asarray(nums, dtype=np.float64)
+        cand_all = arr[arr > 50.0]
+        cand_mid = cand_all[(cand_all >= 80.0) & (cand_all <= 150.0)]
+        use = cand_mid if cand_mid.size >= n else cand_all
+        return _nearest_n(use, 110.0, n)
+
     cand_all = [x for x in nums if x > 50.0]
     cand_mid = [x for x in cand_all if 80.0 <= x <= 150.0]
 
@@ -77,11 +130,50 @@ def _pick_white(nums: List[float], n: int = 8) -> List[float]:
     return use[:n]
 
 
+def _nearest_n(use, target: float, n: int) -> List[float]:
+    dist = np.abs(use - target)
+    if dist.size > n:
+        # top-k：argpartition 找出第 n 近的距离，只保留不超过它的候选（并列的全留下）再排序
+        kth = dist[np.argpartition(dist, n - 1)[n - 1]]
+        keep = np.flatnonzero(dist <= kth)
+        use, dist = use[keep], dist[keep]
+    # stable：距离相同时保持 OCR 原顺序（与 list.sort 一致）
+    idx = np.argsort(dist, kind="stable")[:n]
+    return use[idx].tolist()
+
+
+def _classify_nums(nums, n: int = 8) -> Tuple[List[float], List[float]]:
+    """
+    一次排序同时切出黑场/白场（等价于 _pick_black + _pick_white，但只扫一遍数据）
+    排好序后各个区间的边界用 searchsorted 二分得到
+    """
+    if np is None:
+        return _pick_black(nums, n), _pick_white(nums, n)
+
+    arr = np.asarray(nums, dtype=np.float64)
+    order = np.argsort(arr, kind="stable")
+    srt = arr[order]
+    # 0 < x < 1；x > 50；80 <= x <= 150
+    i0, i50, i150 = np.searchsorted(srt, (0.0, 50.0, 150.0), side="right")
+    i1, i80 = np.searchsorted(srt, (1.0, 80.0), side="left")
+
+    black = srt[i0:i1][:n].tolist()
+
+    mid = order[i80:i150]
+    use_idx = mid if mid.size >= n else order[i50:]
+    # 下标排回 OCR 原顺序：距离并列时的取舍与 _pick_white 一致
+    white = _nearest_n(arr[np.sort(use_idx)], 110.0, n)
+    return black, white
+
+
+# 中文：100nits目标亮度不可满足
+_BRIGHTNESS_RE = re.compile(r"(100\s*nits?.{0,18}?(?:不可满足|无法|达不到|失败))", re.IGNORECASE)
+
+
 def _find_brightness_note(text: str) -> Optional[str]:
     t = (text or "").replace("\n", " ")
 
-    # 中文：100nits目标亮度不可满足
-    m = re.search(r"(100\s*nits?.{0,18}?(不可满足|无法|达不到|失败))", t, re.IGNORECASE)
+    m = _BRIGHTNESS_RE.search(t)
     if m:
         return m.group(1).strip()
 
@@ -92,14 +184,40 @@ def _find_brightness_note(text: str) -> Optional[str]:
     return None
 
 
+# 只留最近几张：一次 _ocr_two_images 只用两张截图，整张 RGB 像素很占内存，不在进程里长期攒
+@functools.lru_cache(maxsize=4)
+def _load_image_cached(image_path: str, mtime: float) -> Image.Image:
+    # mtime 进 key：同名文件被覆盖后自动失效；返回的图只读共享，调用方用 .crop() 拿新图
+    with Image.open(image_path) as img:
+        return img.convert("RGB")
+
+
+def _load_image(image_path: str) -> Image.Image:
+    """同一张截图只解码一次（算裁剪框 / 裁剪 ROI 共用一份像素）"""
+    return _load_image_cached(image_path, os.path.getmtime(image_path))
+
+
 def _crop_table_box(image_path: str) -> Tuple[int, int, int, int]:
     """
     ✅ 裁剪到表格区域（避免标题/日期被混入）
     通用比例：后续你发现不同截图布局，可微调比例。
     """
-    img = Image.open(image_path)
-    w, h = img.size
+    return _table_box_for_size(*_image_size(image_path))
+
+
+@functools.lru_cache(maxsize=64)
+def _image_size_cached(image_path: str, mtime: float) -> Tuple[int, int]:
+    # Image.open 是惰性的：只解析文件头拿尺寸，不解码像素（OCR 缓存命中时就完全不用解码）
+    with Image.open(image_path) as img:
+        return img.size
 
+
+def _image_size(image_path: str) -> Tuple[int, int]:
+    return _image_size_cached(image_path, os.path.getmtime(image_path))
+
+
+@functools.lru_cache(maxsize=32)
+def _table_box_for_size(w: int, h: int) -> Tuple[int, int, int, int]:
     left = int(w * 0.05)
     right = int(w * 0.95)
     top = int(h * 0.20)
@@ -108,7 +226,98 @@ def _crop_table_box(image_path: str) -> Tuple[int, int, int, int]:
     return (left, top, right, bottom)
 
 
-def _ocr_image_via_doubao(
+def _note_box(image_path: str) -> Tuple[int, int, int, int]:
+    # 表格下方的说明/备注区域：表格框底边到图片底部（标题/日期在顶部，不会进来）
+    w, h = _image_size(image_path)
+    return (0, _table_box_for_size(w, h)[3], w, h)
+
+
+_OCR_SYSTEM_PROMPT = "你是一个严谨的图像文字识别助手，只按要求输出结果，不要解释。"
+
+
+@functools.lru_cache(maxsize=64)
+def _file_digest_cached(image_path: str, mtime: float, size: int) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_digest(image_path: str) -> str:
+    st = os.stat(image_path)
+    return _file_digest_cached(image_path, st.st_mtime, st.st_size)
+
+
+def _ocr_cache_key(*parts: Any) -> str:
+    # 视觉模型也进 key：换 Endpoint 后不复用旧模型的识别结果
+    h = hashlib.blake2b(digest_size=16)
+    for part in (*parts, _OCR_SYSTEM_PROMPT, os.getenv("ARK_VISION_MODEL", "")):
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _ocr_cache_get(key: str) -> Optional[str]:
+    with _ocr_cache_lock:
+        hit = _ocr_cache.get(key)
+        if hit is not None:
+            _ocr_cache.move_to_end(key)
+            return hit
+
+    try:
+        hit = json.loads((OCR_CACHE_DIR / f"{key}.json").read_text(encoding="utf-8"))["text"]
+    except Exception:
+        return None
+
+    _ocr_cache_put(key, hit, persist=False)
+    return hit
+
+
+def _ocr_cache_put(key: str, text: str, persist: bool = True) -> None:
+    with _ocr_cache_lock:
+        _ocr_cache[key] = text
+        _ocr_cache.move_to_end(key)
+        while len(_ocr_cache) > _OCR_CACHE_MAX:
+            _ocr_cache.popitem(last=False)
+
+    if not persist:
+        return
+    try:
+        OCR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = OCR_CACHE_DIR / f"{key}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps({"text": text}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, OCR_CACHE_DIR / f"{key}.json")
+    except Exception:
+        pass  # 磁盘缓存只是加速，写失败不影响主流程
+
+
+class _OcrGate:
+    """Semaphore + 可选 RPS 限流；asyncio 原语绑定事件循环，所以每次识别流程现建一个"""
+
+    def __init__(self) -> None:
+        self._sem = asyncio.Semaphore(OCR_CONCURRENCY)
+        self._limiter = AsyncLimiter(OCR_RPS, 1) if (AsyncLimiter is not None and OCR_RPS > 0) else None
+        # 一次识别流程（同一个事件循环）里的所有 Vision 请求共用一个 AsyncOpenAI：连接池复用，只握手一次
+        self._client = new_async_ark_client()
+
+    async def __aenter__(self) -> "_OcrGate":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self._client.close()
+
+    async def call(self, system_prompt: str, user_text: str, images: List[Any], **kwargs: Any) -> str:
+        kwargs["client"] = self._client
+        async with self._sem:
+            if self._limiter is not None:
+                async with self._limiter:
+                    return await chat_with_images_async(system_prompt, user_text, images, **kwargs)
+            return await chat_with_images_async(system_prompt, user_text, images, **kwargs)
+
+
+async def _ocr_image_via_doubao(
+    gate: _OcrGate,
     image_path: str,
     *,
     numeric_only: bool,
@@ -119,19 +328,6 @@ def _ocr_image_via_doubao(
     - numeric_only=True: 只输出数字（空格分隔）
     - crop_box: 先裁剪再发给模型（提高稳定性）
     """
-    send_path = image_path
-
-    # 先裁剪 ROI
-    if crop_box is not None:
-        img = Image.open(image_path).convert("RGB")
-        img = img.crop(crop_box)
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-        tmp.close()
-        img.save(tmp.name)
-        send_path = tmp.name
-
-    system_prompt = "你是一个严谨的图像文字识别助手，只按要求输出结果，不要解释。"
-
     if numeric_only:
         user_text = (
             "请读取图片中的表格数据，只输出所有数字（包含小数），"
@@ -144,40 +340,174 @@ def _ocr_image_via_doubao(
             "只输出识别到的中文说明文本，不要输出数字列表，不要解释。"
         )
 
+    key = None
+    if OCR_CACHE_ENABLED:
+        key = _ocr_cache_key(_file_digest(image_path), numeric_only, crop_box, user_text)
+        hit = _ocr_cache_get(key)
+        if hit is not None:
+            return hit
+
+    # 先裁剪 ROI（内存里的 PIL 图直接编码上传，不落临时文件）
+    send = _load_image(image_path).crop(crop_box) if crop_box is not None else image_path
+
+    # 说明文字只是粗看（抓 brightness_note），用 detail=low 省图片 token
+    out = await gate.call(_OCR_SYSTEM_PROMPT, user_text, [send], detail=None if numeric_only else "low")
+    out = (out or "").strip()
+    if key is not None and out:
+        _ocr_cache_put(key, out)
+    return out
+
+
+# =========================
+# 合并请求：两张截图一次 Vision 调用拿全「数字 + 说明」（4 次往返 -> 1 次，system prompt 也只发一次）
+# 发的是裁剪好的区域（和逐张识别一样，标题/日期里的数字进不来）：图1/2=两张的表格区，图3/4=两张的说明区
+# 输出严格 JSON：{"native": {"nums": [...], "note": "..."}, "effective": {...}}，数字直接用，不再正则抽取
+# =========================
+_BATCH_USER_TEXT = (
+    "共 4 张图，来自两张对比度测试截图：图1=原生对比度的表格区域，图2=有效对比度的表格区域，"
+    "图3=原生对比度表格下方的说明区域，图4=有效对比度表格下方的说明区域。\n"
+    "请只输出一个 JSON 对象，不要输出任何其它文字，格式：\n"
+    '{"native": {"nums": [...], "note": "..."}, "effective": {"nums": [...], "note": "..."}}\n'
+    "- nums：native 取图1、effective 取图2 表格里的所有数字（包含小数），按从上到下、从左到右顺序，输出为 JSON 数字\n"
+    "- note：native 取图3、effective 取图4 中的文字说明，只要中文说明文本；没有就输出空字符串"
+)
+
+# 合并请求连续 _BATCH_MAX_FAILS 次不是合法 JSON（Endpoint 不按格式输出）：之后 _BATCH_RETRY_AFTER 秒内直接走逐张识别，
+# 到时间再试一次。JSON 合法但 nums 为空（截图本身读不出表格）是输入问题，不计入
+_BATCH_MAX_FAILS = 3
+_BATCH_RETRY_AFTER = 600.0
+_batch_fails = 0
+_batch_off_until = 0.0
+
+# 模型支持 response_format=json_object 时打开（TVBUY_OCR_JSON_FORMAT=1）；不支持的 Endpoint 会直接报 400，所以默认不带
+OCR_JSON_FORMAT = os.getenv("TVBUY_OCR_JSON_FORMAT", "0") == "1"
+
+
+def _as_nums(values: Any):
+    # JSON 里的数字（偶尔是字符串形式）=> 与 _extract_numbers 相同的返回类型
+    nums: List[float] = []
+    for v in values if isinstance(values, list) else []:
+        try:
+            nums.append(float(v))
+        except (TypeError, ValueError):
+            pass
+    return np.array(nums, dtype=np.float64) if np is not None else nums
+
+
+def _batch_json_obj(text: str) -> Optional[Dict[str, Any]]:
+    # 兼容模型包了 ```json 围栏或前后多了说明：取第一个 { 到最后一个 }；不是 JSON 对象返回 None
+    t = text or ""
+    i, j = t.find("{"), t.rfind("}")
+    if i < 0 or j <= i:
+        return None
     try:
-        out = chat_with_images(system_prompt, user_text, [send_path])
-        return (out or "").strip()
-    finally:
-        # 清理临时文件
-        if crop_box is not None and send_path != image_path:
-            try:
-                Path(send_path).unlink(missing_ok=True)
-            except Exception:
-                pass
+        obj = json.loads(t[i : j + 1])
+    except ValueError:
+        return None
+    return obj if isinstance(obj, dict) else None
 
 
-def contrast_yaml_from_two_images(native_path: str, effective_path: str) -> str:
-    # 1) 数值 OCR（裁剪 + numeric_only）
-    native_num_ocr = _ocr_image_via_doubao(
-        native_path, numeric_only=True, crop_box=_crop_table_box(native_path)
-    )
-    eff_num_ocr = _ocr_image_via_doubao(
-        effective_path, numeric_only=True, crop_box=_crop_table_box(effective_path)
+def _parse_batch_json(obj: Dict[str, Any]) -> Optional[Tuple[Any, Any, str, str]]:
+    # 任一张图 nums 为空返回 None
+    native = obj.get("native") if isinstance(obj.get("native"), dict) else {}
+    eff = obj.get("effective") if isinstance(obj.get("effective"), dict) else {}
+    native_nums, eff_nums = _as_nums(native.get("nums")), _as_nums(eff.get("nums"))
+    if not len(native_nums) or not len(eff_nums):
+        return None
+    return native_nums, eff_nums, str(native.get("note") or ""), str(eff.get("note") or "")
+
+
+async def _ocr_two_images_batched(gate: _OcrGate, native_path: str, effective_path: str) -> Optional[Tuple[Any, Any, str, str]]:
+    """
+    一次请求拿到两张图的数字 + 说明（发表格区 + 说明区的裁剪图）。
+    模型没按 JSON 格式输出（或 nums 为空）时返回 None，由调用方退回逐张识别；连续格式错误时暂停合并请求。
+    """
+    global _batch_fails, _batch_off_until
+    boxes = [_crop_table_box(native_path), _crop_table_box(effective_path), _note_box(native_path), _note_box(effective_path)]
+    key = None
+    out = None
+    if OCR_CACHE_ENABLED:
+        key = _ocr_cache_key(_file_digest(native_path), _file_digest(effective_path), boxes, _BATCH_USER_TEXT)
+        out = _ocr_cache_get(key)
+
+    if out is None:
+        if time.monotonic() < _batch_off_until:
+            return None
+        kwargs = {"response_format": {"type": "json_object"}} if OCR_JSON_FORMAT else {}
+        paths = [native_path, effective_path, native_path, effective_path]
+        rois = [_load_image(p).crop(b) for p, b in zip(paths, boxes)]
+        out = await gate.call(_OCR_SYSTEM_PROMPT, _BATCH_USER_TEXT, rois, **kwargs)
+
+    obj = _batch_json_obj(out)
+    if obj is None:
+        _batch_fails += 1
+        if _batch_fails >= _BATCH_MAX_FAILS:
+            _batch_fails = 0
+            _batch_off_until = time.monotonic() + _BATCH_RETRY_AFTER
+        return None
+    _batch_fails = 0
+
+    parsed = _parse_batch_json(obj)
+    if parsed is None:
+        return None
+    # 只缓存数字齐全的输出（格式不对 / 没读出数字的下次还要重试合并请求）
+    if key is not None:
+        _ocr_cache_put(key, out)
+    return parsed
+
+
+async def _ocr_two_images(native_path: str, effective_path: str) -> Tuple[Any, Any, str, str]:
+    """
+    返回 (native_nums, eff_nums, native_note_text, eff_note_text)
+    """
+    async with _OcrGate() as gate:
+        return await _ocr_two_images_with(gate, native_path, effective_path)
+
+
+async def _ocr_two_images_with(gate: _OcrGate, native_path: str, effective_path: str) -> Tuple[Any, Any, str, str]:
+    # 1)+2) 优先一次请求拿全：两张图的表格数字 + 说明
+    batched = await _ocr_two_images_batched(gate, native_path, effective_path)
+    if batched is not None:
+        return batched
+
+    # 退回逐张识别
+    # 1) 数值 OCR（裁剪 + numeric_only）：两张互不依赖，并发发出
+    native_num_ocr, eff_num_ocr = await asyncio.gather(
+        _ocr_image_via_doubao(gate, native_path, numeric_only=True, crop_box=_crop_table_box(native_path)),
+        _ocr_image_via_doubao(gate, effective_path, numeric_only=True, crop_box=_crop_table_box(effective_path)),
     )
+    native_nums, eff_nums = _extract_numbers(native_num_ocr), _extract_numbers(eff_num_ocr)
+
+    # 2) 全文 OCR 只为抓 brightness_note：白场达标就不用识别；说明只会出现在有效对比度那张，先看它，没有再看原生那张
+    if OCR_FAST_PATH and _white_target_met(eff_nums):
+        return native_nums, eff_nums, "", ""
+
+    eff_full_ocr = await _ocr_image_via_doubao(gate, effective_path, numeric_only=False, crop_box=None)
+    native_full_ocr = ""
+    if not _find_brightness_note(eff_full_ocr):
+        native_full_ocr = await _ocr_image_via_doubao(gate, native_path, numeric_only=False, crop_box=None)
+    return native_nums, eff_nums, native_full_ocr, eff_full_ocr
+
+
+def _white_target_met(nums, n: int = 8) -> bool:
+    # 白场点位凑齐且均值达到目标亮度 => 不会有「100nits 目标亮度不可满足」
+    _, white = _classify_nums(nums, n=n)
+    return len(white) >= n and _avg(white) >= BRIGHTNESS_TARGET_NITS
+
+
+def contrast_yaml_from_two_images(native_path: str, effective_path: str) -> str:
+    # 同步入口（脚本/同步路由用）；已经在事件循环里的调用方用 contrast_yaml_from_two_images_async
+    return _contrast_yaml_from_ocr(*asyncio.run(_ocr_two_images(native_path, effective_path)))
 
-    # 2) 全文 OCR（用来抓 brightness_note）
-    native_full_ocr = _ocr_image_via_doubao(native_path, numeric_only=False, crop_box=None)
-    eff_full_ocr = _ocr_image_via_doubao(effective_path, numeric_only=False, crop_box=None)
 
-    # 3) 数值提取 + 规则筛选
-    native_nums = _extract_numbers(native_num_ocr)
-    eff_nums = _extract_numbers(eff_num_ocr)
+async def contrast_yaml_from_two_images_async(native_path: str, effective_path: str) -> str:
+    return _contrast_yaml_from_ocr(*(await _ocr_two_images(native_path, effective_path)))
 
-    native_black = _pick_black(native_nums, n=8)
-    native_white = _pick_white(native_nums, n=8)
 
-    eff_black = _pick_black(eff_nums, n=8)
-    eff_white = _pick_white(eff_nums, n=8)
+def _contrast_yaml_from_ocr(native_nums, eff_nums, native_full_ocr: str, eff_full_ocr: str) -> str:
+    # 3) 规则筛选（数字已由 _ocr_two_images 给出：JSON 直接解析或 _extract_numbers 抽取）
+    native_black, native_white = _classify_nums(native_nums, n=8)
+    eff_black, eff_white = _classify_nums(eff_nums, n=8)
 
     # 4) 计算
     native_white_avg = _avg(native_white)
@@ -267,7 +597,49 @@ def contrast_yaml_from_two_images(native_path: str, effective_path: str) -> str:
         "平均值由逐点数据计算得出"
     )
 
-    return yaml.safe_dump(record, allow_unicode=True, sort_keys=False)
+    return yaml.dump(record, Dumper=_Dumper, allow_unicode=True, sort_keys=False, default_flow_style=False)
+
+
+# writev 一次最多传的块数（POSIX IOV_MAX 常见下限）
+_WRITEV_MAX_CHUNKS = 1024
+
+
+def _write_bytes(fd: int, chunks: List[bytes]) -> None:
+    """原始 fd 写文件：先编码成 bytes，能 writev 就一次系统调用写完所有块"""
+    try:
+        n = 0
+        if hasattr(os, "writev") and len(chunks) <= _WRITEV_MAX_CHUNKS:
+            n = os.writev(fd, chunks)
+        rest = memoryview(b"".join(chunks))[n:]  # 没有 writev（Windows）或罕见的短写：剩下的用 write 补
+        while rest:
+            rest = rest[os.write(fd, rest):]
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=16)
+def _ensure_dir(out_dir: str) -> Path:
+    # 同一个目录只 mkdir 一次（批量保存时不再每条都 stat/mkdir）
+    outp = Path(out_dir)
+    outp.mkdir(parents=True, exist_ok=True)
+    return outp
+
+
+def _create_record(out_dir: str, prefix: str) -> Tuple[int, Path]:
+    """
+    新建一个记录文件，返回 (fd, path)
+    O_EXCL：文件名已存在就换一个随机后缀重试，绝不覆盖已有记录（并发 / 同一秒内连续保存）
+    O_BINARY：Windows 上不做换行转换（与其它平台写出的内容一致）
+    """
+    outp = _ensure_dir(out_dir)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        ts = time.strftime("%Y%m%d_%H%M%S") + f"_{os.urandom(4).hex()}"
+        path = outp / f"{prefix}_{ts}.yaml"
+        try:
+            return os.open(path, flags, 0o644), path
+        except FileExistsError:
+            continue
 
 
 def save_contrast_yaml_text(
@@ -275,11 +647,23 @@ def save_contrast_yaml_text(
     out_dir: str = "summaries/contrast_records",
     prefix: str = "contrast",
 ) -> str:
-    outp = Path(out_dir)
-    outp.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = outp / f"{prefix}_{ts}.yaml"
-    path.write_text(yaml_text, encoding="utf-8")
+    fd, path = _create_record(out_dir, prefix)
+    _write_bytes(fd, [yaml_text.encode("utf-8")])
+    return str(path)
+
+
+def save_contrast_yaml_texts(
+    yaml_texts: List[str],
+    out_dir: str = "summaries/contrast_records",
+    prefix: str = "contrast_batch",
+) -> str:
+    """批量：多条记录写成一个多文档 YAML（每条前面一个 ---），一次 writev 落盘"""
+    chunks: List[bytes] = []
+    for t in yaml_texts:
+        chunks.append(b"---\n")
+        chunks.append(t.encode("utf-8"))
+    fd, path = _create_record(out_dir, prefix)
+    _write_bytes(fd, chunks)
     return str(path)
 
 
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+tv_buy_1_0/llm/_ark_client.py
+
+豆包/火山方舟(Ark) 的共享 OpenAI 同步客户端：doubao_vision（图片识别）和 deepseek_client（文本）用同一个实例，
+底层 httpx 连接池常驻复用，多次请求不再重复 TCP/TLS 握手；装了 h2 时走 HTTP/2（多个请求复用一条连接）。
+
+环境变量：
+- ARK_API_KEY（或 OPENAI_API_KEY）  必填
+- ARK_BASE_URL         可选，默认 https://ark.cn-beijing.volces.com/api/v3
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib.util
+import os
+
+ARK_DEFAULT_BASE_URL = "https://ark.cn-beijing.volces.com/api/v3"
+
+HTTP_MAX_CONNECTIONS = 16
+HTTP_MAX_KEEPALIVE = 8
+HTTP_TIMEOUT = 60.0
+HTTP_CONNECT_TIMEOUT = 10.0
+
+
+@functools.lru_cache(maxsize=1)
+def get_ark_client():
+    # 懒加载：只有真正调用时才要求 ARK_* 环境变量 / openai SDK
+    import httpx
+    from openai import OpenAI
+
+    api_key = (os.getenv("ARK_API_KEY") or os.getenv("OPENAI_API_KEY") or "").strip()
+    if not api_key:
+        raise RuntimeError("缺少 ARK_API_KEY（或 OPENAI_API_KEY），请先 export 再运行。")
+
+    http_client = httpx.Client(
+        # httpx 的 http2=True 需要 h2 包，没装就留在 HTTP/1.1 keep-alive
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    )
+    base_url = (os.getenv("ARK_BASE_URL") or ARK_DEFAULT_BASE_URL).strip()
+    # 重试统一交给 llm/retry.py 的 @with_retry（调用方都套了它）：SDK 自带的 2 次重试关掉，
+    # 否则一次 429 会被两层叠加重试成 3×3 次
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
@@ -14,7 +14,9 @@ llm/deepseek_client.py
 from __future__ import annotations
 
 import os
-from openai import OpenAI
+
+from ._ark_client import get_ark_client
+from .retry import with_retry
 
 ARK_BASE_URL = os.getenv("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
 ARK_API_KEY = os.getenv("ARK_API_KEY") or os.getenv("OPENAI_API_KEY")
@@ -27,9 +29,11 @@ if not ARK_API_KEY:
 if not ARK_TEXT_MODEL:
     raise RuntimeError("缺少 ARK_TEXT_MODEL（或 ARK_VISION_MODEL），请先 export 再运行。")
 
-_CLIENT = OpenAI(api_key=ARK_API_KEY, base_url=ARK_BASE_URL)
+# 与 doubao_vision 共用同一个 client / 连接池
+_CLIENT = get_ark_client()
 
 
+@with_retry
 def chat(system_prompt: str, user_prompt: str) -> str:
     resp = _CLIENT.chat.completions.create(
         model=ARK_TEXT_MODEL,
@@ -12,15 +12,33 @@ tv_buy_1_0/llm/doubao_vision.py  （改为智谱通用调用｜完整版｜可
 - ZHIPU_BASE_URL       可选，默认 https://open.bigmodel.cn/api/paas/v4
 - ZHIPU_MODEL          可选，默认 glm-4-plus
 - TVBUY_ZHIPU_TIMEOUT  可选，默认 6 秒
+
+图片识别（chat_with_images，给 g2_lab/services/contrast_ocr_service.py 用）走豆包/火山方舟(Ark) Vision Endpoint：
+- ARK_API_KEY（或 OPENAI_API_KEY）  必填
+- ARK_BASE_URL         可选，默认 https://ark.cn-beijing.volces.com/api/v3
+- ARK_VISION_MODEL     必填，视觉 EndpointID（例如 ep-xxxx）
 """
 
 from __future__ import annotations
 
+import base64
+import io
 import json
 import os
 import urllib.request
 import urllib.error
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from ._ark_client import get_ark_client
+from .retry import with_retry
+
+try:
+    from PIL import Image, ImageOps  # 可选：上传前缩图 + 重新编码
+except ImportError:
+    Image = None
+
+# 图片入参：文件路径，或内存里的 PIL.Image
+ImageInput = Union[str, "Image.Image"]
 
 
 def _env(key: str, default: str = "") -> str:
@@ -82,6 +100,7 @@ def _extract(resp: Dict[str, Any]) -> str:
     return ""
 
 
+@with_retry
 def chat_text(messages: List[Dict[str, str]], model: Optional[str] = None, temperature: float = 0.4, max_tokens: int = 800) -> str:
     """
     messages: [{"role":"system/user/assistant","content":"..."}]
@@ -107,4 +126,156 @@ def call_llm(prompt: str, system: str = "你是专业的中文助手。") -> str
             {"role": "system", "content": system},
             {"role": "user", "content": prompt},
         ]
-    )
\ No newline at end of file
+    )
+
+
+# =========================================================
+# Vision：豆包/火山方舟(Ark) 多图识别
+# =========================================================
+def _ark_vision_model() -> str:
+    m = _env("ARK_VISION_MODEL")
+    if not m:
+        raise RuntimeError("缺少 ARK_VISION_MODEL（你的视觉 EndpointID），请先 export 再运行。")
+    return m
+
+
+# 上传前把长边缩到这个尺寸以内：图片 token 数按面积算，表格数字在 1024px 下仍清晰
+VISION_MAX_SIDE = int(_env("TVBUY_VISION_MAX_SIDE", "1024") or 1024)
+
+
+def _img_to_data_url(image: ImageInput) -> str:
+    if Image is not None and isinstance(image, Image.Image):
+        return _pil_to_upload_url(image)  # 内存里的图（如裁剪好的 ROI）：不落临时文件
+    image_path = str(image)
+
+    if Image is not None:
+        try:
+            with Image.open(image_path) as img:
+                return _pil_to_upload_url(ImageOps.exif_transpose(img))
+        except Exception:
+            pass  # 图片解不开就按原文件上传
+
+    ext = os.path.splitext(image_path)[1].lower()
+    mime = "image/png"
+    if ext in [".jpg", ".jpeg"]:
+        mime = "image/jpeg"
+    elif ext == ".webp":
+        mime = "image/webp"
+
+    with open(image_path, "rb") as f:
+        b64 = base64.b64encode(f.read()).decode("utf-8")
+    return f"data:{mime};base64,{b64}"
+
+
+def _vision_messages(
+    system_prompt: str, user_text: str, image_paths: Sequence[ImageInput], detail: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    content: List[Dict[str, Any]] = [{"type": "text", "text": user_text}]
+    for p in image_paths:
+        image_url: Dict[str, Any] = {"url": _img_to_data_url(p)}
+        if detail:
+            image_url["detail"] = detail  # "low"：粗看（如只找说明文字）时少花图片 token
+        content.append({"type": "image_url", "image_url": image_url})
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": content},
+    ]
+
+
+def _pil_to_data_url(img: "Image.Image", fmt: str = "JPEG", quality: int = 85) -> str:
+    buf = io.BytesIO()
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.save(buf, format=fmt, quality=quality, optimize=True)
+    return f"data:image/{fmt.lower()};base64,{base64.b64encode(buf.getvalue()).decode('ascii')}"
+
+
+def _pil_to_upload_url(img: "Image.Image") -> str:
+    if max(img.size) > VISION_MAX_SIDE:
+        img = img.copy()  # thumbnail 是原地修改，别动调用方（可能是缓存共享）的图
+        img.thumbnail((VISION_MAX_SIDE, VISION_MAX_SIDE), Image.LANCZOS)
+
+    # 颜色少（<=256，典型的表格截图）用 PNG 保住文字边缘；否则 JPEG 体积小得多
+    if img.getcolors(maxcolors=256) is not None:
+        return _pil_to_data_url(img, fmt="PNG")
+    return _pil_to_data_url(img)
+
+
+@with_retry
+def chat_with_images(
+    system_prompt: str,
+    user_text: str,
+    image_paths: Sequence[ImageInput],
+    temperature: float = 0,
+    detail: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    一次请求发多张图：user content = [text, image_url, image_url, ...]（图片顺序即 image_paths 顺序）
+    image_paths 里每项可以是文件路径，也可以是 PIL.Image（内存里直接编码成 data URL）。
+    多张图 + 分段输出指令放在同一个请求里，可以把多次往返合成一次。
+    response_format：如 {"type": "json_object"}，只在模型支持时传（不传就不带这个字段）
+    """
+    # 与 deepseek_client 共用一个带连接池的 client（见 _ark_client.py）
+    resp = get_ark_client().chat.completions.create(
+        model=_ark_vision_model(),
+        messages=_vision_messages(system_prompt, user_text, image_paths, detail),
+        temperature=temperature,
+        **({"response_format": response_format} if response_format else {}),
+    )
+    return (resp.choices[0].message.content or "").strip()
+
+
+@with_retry
+async def chat_with_images_async(
+    system_prompt: str,
+    user_text: str,
+    image_paths: Sequence[ImageInput],
+    temperature: float = 0,
+    detail: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+    client: Optional[Any] = None,
+) -> str:
+    """
+    chat_with_images 的异步版（AsyncOpenAI），给 asyncio.gather 并发多个识别请求用。
+    AsyncOpenAI 的连接池绑定在创建它的事件循环上，不做全局缓存：
+    - 传 client（new_async_ark_client() 建的）：同一个事件循环里的多次识别共用连接池，只握手一次
+    - 不传：本次调用现建现关
+    """
+    args = (system_prompt, user_text, image_paths, temperature, detail, response_format)
+    if client is None:
+        async with new_async_ark_client() as own:
+            return await _chat_with_images_on(own, *args)
+    return await _chat_with_images_on(client, *args)
+
+
+async def _chat_with_images_on(
+    client: Any,
+    system_prompt: str,
+    user_text: str,
+    image_paths: Sequence[ImageInput],
+    temperature: float,
+    detail: Optional[str],
+    response_format: Optional[Dict[str, Any]],
+) -> str:
+    resp = await client.chat.completions.create(
+        model=_ark_vision_model(),
+        messages=_vision_messages(system_prompt, user_text, image_paths, detail),
+        temperature=temperature,
+        **({"response_format": response_format} if response_format else {}),
+    )
+    return (resp.choices[0].message.content or "").strip()
+
+
+def new_async_ark_client():
+    """新建一个 AsyncOpenAI（调用方负责 async with / await client.close()）；只能在同一个事件循环里复用"""
+    from openai import AsyncOpenAI
+
+    api_key = _env("ARK_API_KEY") or _env("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("缺少 ARK_API_KEY（或 OPENAI_API_KEY），请先 export 再运行。")
+
+    # max_retries=0：重试只由外层 @with_retry 做，不和 SDK 自带重试叠加
+    return AsyncOpenAI(
+        api_key=api_key, base_url=_env("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3"), max_retries=0
+    )
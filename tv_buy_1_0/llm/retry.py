@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+tv_buy_1_0/llm/retry.py
+
+LLM 调用的重试：指数退避 + 抖动，只对“暂时性”错误重试（429 限流 / 超时 / 连接失败 / 5xx）。
+- 用法：@with_retry 装饰同步或 async 函数
+- 参数缺省：最多 3 次，等待 ≈ 1s, 2s（+0~1s 抖动），单次最多 30s
+- 被装饰的 openai SDK 调用要用 max_retries=0 的客户端（见 _ark_client.py），不然两层重试叠加
+
+环境变量：
+- TVBUY_LLM_RETRY_ATTEMPTS  可选，默认 3（设 1 即关闭重试）
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import os
+import random
+import time
+from typing import Any, Callable
+
+RETRY_ATTEMPTS = max(1, int(os.getenv("TVBUY_LLM_RETRY_ATTEMPTS", "3") or 3))
+RETRY_INITIAL = 1.0
+RETRY_MAX_WAIT = 30.0
+
+# openai SDK 的暂时性异常（按类名判断，避免这里硬依赖 openai）
+_TRANSIENT_TYPES = {"RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError"}
+# urllib / 包装成 RuntimeError 的错误只能看文案
+_TRANSIENT_HINTS = ("rate limit", "ratelimit", "too many requests", "quota", "429", "timed out", "timeout")
+
+
+def is_transient(e: BaseException) -> bool:
+    if type(e).__name__ in _TRANSIENT_TYPES:
+        return True
+    code = getattr(e, "status_code", None) or getattr(e, "code", None)
+    if isinstance(code, int) and (code == 429 or 500 <= code < 600):
+        return True
+    msg = str(e).lower()
+    return any(h in msg for h in _TRANSIENT_HINTS)
+
+
+def _wait(attempt: int) -> float:
+    # attempt 从 0 开始：1s, 2s, 4s ... 加 0~1s 抖动，封顶 RETRY_MAX_WAIT
+    return min(RETRY_MAX_WAIT, RETRY_INITIAL * (2 ** attempt) + random.uniform(0, 1))
+
+
+def with_retry(fn: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def _async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(RETRY_ATTEMPTS):
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as e:
+                    if attempt + 1 >= RETRY_ATTEMPTS or not is_transient(e):
+                        raise
+                    await asyncio.sleep(_wait(attempt))
+
+        return _async_wrapper
+
+    @functools.wraps(fn)
+    def _wrapper(*args: Any, **kwargs: Any) -> Any:
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt + 1 >= RETRY_ATTEMPTS or not is_transient(e):
+                    raise
+                time.sleep(_wait(attempt))
+
+    return _wrapper
@@ -15,6 +15,7 @@ reasons_v2.py  （完整版｜可一键复制粘贴替换）
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple, Optional
 
 
@@ -39,7 +40,13 @@ def _to_bool(x: Any) -> Optional[bool]:
             return bool(int(x))
         except Exception:
             return None
-    s = str(x).strip().lower()
+    return _to_bool_str(x if isinstance(x, str) else str(x))
+
+
+@lru_cache(maxsize=256)
+def _to_bool_str(x: str) -> Optional[bool]:
+    # 取值种类很少，按原串缓存
+    s = x.strip().lower()
     if s in ("1", "true", "yes", "y", "有", "支持", "是", "ok"):
         return True
     if s in ("0", "false", "no", "n", "无", "不支持", "否"):
@@ -47,15 +54,34 @@ def _to_bool(x: Any) -> Optional[bool]:
     return None
 
 
+_FIRST_NUM_RE = re.compile(r"([0-9]+(\.[0-9]+)?)")
+
+
 def _to_float(x: Any) -> Optional[float]:
     if x is None:
         return None
+    if isinstance(x, str):
+        return _to_float_str(x)
     try:
         return float(x)
     except Exception:
         # 兼容 "8500 nits" / "＜0.99" 这种，尽量抽数字
         s = str(x)
-        m = re.search(r"([0-9]+(\.[0-9]+)?)", s)
+        m = _FIRST_NUM_RE.search(s)
+        if not m:
+            return None
+        try:
+            return float(m.group(1))
+        except Exception:
+            return None
+
+
+@lru_cache(maxsize=1024)
+def _to_float_str(s: str) -> Optional[float]:
+    try:
+        return float(s)
+    except Exception:
+        m = _FIRST_NUM_RE.search(s)
         if not m:
             return None
         try:
@@ -85,16 +111,99 @@ def _yn_cn(x: Optional[bool]) -> str:
     return "支持" if x else "【参数偏弱】不支持"
 
 
+# =========================
+# 分档话术表：(阈值, 文案)，按顺序取第一个命中的；阈值 None = 兜底
+# 文案里的 {v} 是参数值（部分档位不带数值）
+# =========================
+def _tier_ge(v: Any, tiers: Tuple[Tuple[Optional[float], str], ...]) -> str:
+    for thr, msg in tiers:
+        if thr is None or v >= thr:
+            return msg
+    return ""
+
+
+def _tier_le(v: Any, tiers: Tuple[Tuple[Optional[float], str], ...]) -> str:
+    for thr, msg in tiers:
+        if thr is None or v <= thr:
+            return msg
+    return ""
+
+
+# PS5
+_PS5_LAG_TIERS = (
+    (6, "输入延迟：约 {v:g}ms（很快），动作/射击更跟手。"),
+    (12, "输入延迟：约 {v:g}ms（够用偏上），画质与响应更均衡。"),
+    (None, "输入延迟：约 {v:g}ms（【参数偏弱】偏慢），更适合剧情/休闲。"),
+)
+_PS5_HDMI21_TIERS = (
+    (2, "接口：HDMI 2.1 ×{v}，多主机/回音壁接线更从容。"),
+    (1, "接口：HDMI 2.1 ×1（够单主机），多设备需要取舍。"),
+    (None, "接口：HDMI 2.1 口数【参数缺失/偏少】（多设备玩家注意）。"),
+)
+_PS5_BRIGHT_TIERS = (
+    (3000, "HDR 亮度：{v} nits（高光很猛）{tip}"),
+    (1500, "HDR 亮度：{v} nits（中上，稳定耐看）"),
+    (None, "HDR 亮度：{v} nits（【参数偏弱】偏保守）"),
+)
+_PS5_BRIGHT_TIP = "（⚠️口径可能偏激进，建议看实测）"
+_PS5_ZONES_TIERS = (
+    (2000, "控光分区：{v}（暗场高光压得住，更稳）"),
+    (800, "控光分区：{v}（中等偏上，不是控光怪兽）"),
+    (None, "控光分区：{v}（【参数偏弱】偏少，暗场可能一般）"),
+)
+
+# Movie
+_MOVIE_ZONES_TIERS = (
+    (2000, "暗场控光：分区很强，压光晕更有把握（电影党最在意）。"),
+    (800, "暗场控光：分区中上，暗场对比有提升，但不算控光怪兽。"),
+    (None, "暗场控光：分区偏少（【参数偏弱】），暗场高光压制可能一般。"),
+)
+_MOVIE_BRIGHT_TIERS = (
+    (2500, "HDR 亮度：很充足，大片高光更有冲击力。"),
+    (1200, "HDR 亮度：够用偏上，观感稳、不刺眼，适合长时间追剧。"),
+    (None, "HDR 亮度：偏保守（【参数偏弱】），不走“炸裂高光”路线。"),
+)
+_MOVIE_UNIFORM_TIERS = (
+    (0.06, "均匀性：预计较好，纯色/暗场更干净。"),
+    (0.12, "均匀性：中等水平，极端灰底/球赛可能略看得出来。"),
+    (None, "均匀性：偏弱（【参数偏弱】），暗场纯色敏感建议先线下确认。"),
+)
+_MOVIE_REFL_TIERS = (
+    (1.5, "反射：控制较好，夜晚开灯干扰更小。"),
+    (3.0, "反射：中等，强光下可能有倒影，注意灯位/窗帘。"),
+    (None, "反射：偏弱（【参数偏弱】），强环境光更影响沉浸。"),
+)
+
+# Bright
+_BRIGHT_BRIGHT_TIERS = (
+    (2000, "白天抗光：很强，采光强/大窗客厅更稳。"),
+    (900, "白天抗光：够用，强日照直射建议配合窗帘。"),
+    (None, "白天抗光：偏保守（【参数偏弱】），强光下可能显得发灰。"),
+)
+_BRIGHT_REFL_TIERS = (
+    (1.5, "反射控制：较好，开灯/白天倒影更少。"),
+    (3.0, "反射控制：中等，强光下可能有倒影，注意摆位/灯位。"),
+    (None, "反射控制：偏弱（【参数偏弱】），倒影干扰会更明显。"),
+)
+_BRIGHT_ZONES_TIERS = (
+    (1000, "对比层次：分区不错，白天也更有立体感。"),
+    (400, "对比层次：分区中等，提升有限但有加分。"),
+    (None, "对比层次：分区偏少（【参数偏弱】），整体可能更“平”。"),
+)
+
+
 # =========================
 # 品牌性格（先只做 TCL）
 # =========================
+_BRAND_PERSONALITY: Dict[str, str] = {
+    "tcl": "TCL 一贯偏参数取向，新款规格给得激进；首发期更建议结合一轮实测/口碑再拍板。",
+}
+
+
 def brand_personality(brand: str) -> str:
     if not brand:
         return ""
-    b = str(brand).strip().lower()
-    if b == "tcl":
-        return "TCL 一贯偏参数取向，新款规格给得激进；首发期更建议结合一轮实测/口碑再拍板。"
-    return ""
+    return _BRAND_PERSONALITY.get(str(brand).strip().lower(), "")
 
 
 # =========================
@@ -108,12 +217,7 @@ def reasons_ps5_v2(tv: Dict[str, Any]) -> Tuple[List[str], str]:
     if lagv is None:
         r.append("输入延迟：【参数缺失】暂未公开（不是差），但硬核竞技玩家建议等实测再下单。")
     else:
-        if lagv <= 6:
-            r.append(f"输入延迟：约 {lagv:g}ms（很快），动作/射击更跟手。")
-        elif lagv <= 12:
-            r.append(f"输入延迟：约 {lagv:g}ms（够用偏上），画质与响应更均衡。")
-        else:
-            r.append(f"输入延迟：约 {lagv:g}ms（【参数偏弱】偏慢），更适合剧情/休闲。")
+        r.append(_tier_le(lagv, _PS5_LAG_TIERS).format(v=lagv))
 
     # 2) HDMI2.1 / ALLM / VRR（缺失就写缺失；明确不支持写偏弱）
     hdmi21 = tv.get("hdmi_2_1_ports")
@@ -125,12 +229,7 @@ def reasons_ps5_v2(tv: Dict[str, Any]) -> Tuple[List[str], str]:
     allm = _to_bool(tv.get("allm"))
     vrr = _to_bool(tv.get("vrr"))
 
-    if hdmi21i >= 2:
-        r.append(f"接口：HDMI 2.1 ×{hdmi21i}，多主机/回音壁接线更从容。")
-    elif hdmi21i == 1:
-        r.append("接口：HDMI 2.1 ×1（够单主机），多设备需要取舍。")
-    else:
-        r.append("接口：HDMI 2.1 口数【参数缺失/偏少】（多设备玩家注意）。")
+    r.append(_tier_ge(hdmi21i, _PS5_HDMI21_TIERS).format(v=hdmi21i))
 
     r.append(f"游戏功能：ALLM {_yn_cn(allm)}；VRR {_yn_cn(vrr)}。")
 
@@ -141,23 +240,13 @@ def reasons_ps5_v2(tv: Dict[str, Any]) -> Tuple[List[str], str]:
     if brightness is None:
         r.append("HDR 亮度：【参数缺失】未公开，冲击力要等实测/后续口径。")
     else:
-        if brightness >= 3000:
-            tip = "（⚠️口径可能偏激进，建议看实测）" if brightness >= 6000 else ""
-            r.append(f"HDR 亮度：{brightness} nits（高光很猛）{tip}")
-        elif brightness >= 1500:
-            r.append(f"HDR 亮度：{brightness} nits（中上，稳定耐看）")
-        else:
-            r.append(f"HDR 亮度：{brightness} nits（【参数偏弱】偏保守）")
+        tip = _PS5_BRIGHT_TIP if brightness >= 6000 else ""
+        r.append(_tier_ge(brightness, _PS5_BRIGHT_TIERS).format(v=brightness, tip=tip))
 
     if zones is None:
         r.append("控光分区：【参数缺失】未公开，暗场压光晕要等实测。")
     else:
-        if zones >= 2000:
-            r.append(f"控光分区：{zones}（暗场高光压得住，更稳）")
-        elif zones >= 800:
-            r.append(f"控光分区：{zones}（中等偏上，不是控光怪兽）")
-        else:
-            r.append(f"控光分区：{zones}（【参数偏弱】偏少，暗场可能一般）")
+        r.append(_tier_ge(zones, _PS5_ZONES_TIERS).format(v=zones))
 
     # 品牌性格（可选补一句）
     bp = brand_personality(_norm_brand(tv.get("brand", "")))
@@ -200,44 +289,24 @@ def reasons_movie_v2(tv: Dict[str, Any]) -> Tuple[List[str], str]:
     if zones is None:
         r.append("暗场控光：分区【参数缺失】未公开，字幕泛白/光晕能力要等实测。")
     else:
-        if zones >= 2000:
-            r.append("暗场控光：分区很强，压光晕更有把握（电影党最在意）。")
-        elif zones >= 800:
-            r.append("暗场控光：分区中上，暗场对比有提升，但不算控光怪兽。")
-        else:
-            r.append("暗场控光：分区偏少（【参数偏弱】），暗场高光压制可能一般。")
+        r.append(_tier_ge(zones, _MOVIE_ZONES_TIERS))
 
     # 2) HDR 亮度（第二优先）
     if brightness is None:
         r.append("HDR 亮度：【参数缺失】未公开，冲击力要等实测/后续口径。")
     else:
-        if brightness >= 2500:
-            r.append("HDR 亮度：很充足，大片高光更有冲击力。")
-        elif brightness >= 1200:
-            r.append("HDR 亮度：够用偏上，观感稳、不刺眼，适合长时间追剧。")
-        else:
-            r.append("HDR 亮度：偏保守（【参数偏弱】），不走“炸裂高光”路线。")
+        r.append(_tier_ge(brightness, _MOVIE_BRIGHT_TIERS))
 
     # 3) 均匀性/反射（第三优先）
     if uniform is None:
         r.append("均匀性：【参数缺失】建议线下看灰底/暗场（脏屏/漏光敏感必看）。")
     else:
-        if uniform <= 0.06:
-            r.append("均匀性：预计较好，纯色/暗场更干净。")
-        elif uniform <= 0.12:
-            r.append("均匀性：中等水平，极端灰底/球赛可能略看得出来。")
-        else:
-            r.append("均匀性：偏弱（【参数偏弱】），暗场纯色敏感建议先线下确认。")
+        r.append(_tier_le(uniform, _MOVIE_UNIFORM_TIERS))
 
     if refl is None:
         r.append("反射：【参数缺失】客厅灯多/大窗建议线下看倒影控制。")
     else:
-        if refl <= 1.5:
-            r.append("反射：控制较好，夜晚开灯干扰更小。")
-        elif refl <= 3.0:
-            r.append("反射：中等，强光下可能有倒影，注意灯位/窗帘。")
-        else:
-            r.append("反射：偏弱（【参数偏弱】），强环境光更影响沉浸。")
+        r.append(_tier_le(refl, _MOVIE_REFL_TIERS))
 
     bp = brand_personality(_norm_brand(tv.get("brand", "")))
     if bp:
@@ -273,34 +342,19 @@ def reasons_bright_v2(tv: Dict[str, Any]) -> Tuple[List[str], str]:
     if brightness is None:
         r.append("白天抗光：亮度【参数缺失】未公开，建议看实测/线下真机。")
     else:
-        if brightness >= 2000:
-            r.append("白天抗光：很强，采光强/大窗客厅更稳。")
-        elif brightness >= 900:
-            r.append("白天抗光：够用，强日照直射建议配合窗帘。")
-        else:
-            r.append("白天抗光：偏保守（【参数偏弱】），强光下可能显得发灰。")
+        r.append(_tier_ge(brightness, _BRIGHT_BRIGHT_TIERS))
 
     # 2) 反射控制（第二优先）
     if refl is None:
         r.append("反射控制：【参数缺失】灯多/窗大建议线下重点看倒影。")
     else:
-        if refl <= 1.5:
-            r.append("反射控制：较好，开灯/白天倒影更少。")
-        elif refl <= 3.0:
-            r.append("反射控制：中等，强光下可能有倒影，注意摆位/灯位。")
-        else:
-            r.append("反射控制：偏弱（【参数偏弱】），倒影干扰会更明显。")
+        r.append(_tier_le(refl, _BRIGHT_REFL_TIERS))
 
     # 3) 分区是加分项
     if zones is None:
         r.append("对比层次：分区【参数缺失】未公开，层次感要等实测。")
     else:
-        if zones >= 1000:
-            r.append("对比层次：分区不错，白天也更有立体感。")
-        elif zones >= 400:
-            r.append("对比层次：分区中等，提升有限但有加分。")
-        else:
-            r.append("对比层次：分区偏少（【参数偏弱】），整体可能更“平”。")
+        r.append(_tier_ge(zones, _BRIGHT_ZONES_TIERS))
 
     bp = brand_personality(_norm_brand(tv.get("brand", "")))
     if bp:
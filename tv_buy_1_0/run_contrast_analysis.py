@@ -24,11 +24,18 @@ run_contrast_analysis.py
 
 from __future__ import annotations
 
+import functools
 import os
 from pathlib import Path
 import yaml
 from openai import OpenAI
 
+try:
+    # 优先用 libyaml 的 C 实现，没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
 
 def _load_latest_contrast_yaml() -> tuple[Path, str]:
     folder = Path("summaries/contrast_records")
@@ -45,7 +52,14 @@ def _load_analysis_prompt() -> str:
     if not prompt_path.exists():
         raise FileNotFoundError(f"找不到提示词文件：{prompt_path}")
 
-    cfg = yaml.safe_load(prompt_path.read_text(encoding="utf-8"))
+    # 按 mtime 缓存：文件没改就不重复解析 YAML
+    return _load_analysis_prompt_cached(str(prompt_path), prompt_path.stat().st_mtime)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_analysis_prompt_cached(path: str, mtime: float) -> str:
+    prompt_path = Path(path)
+    cfg = yaml.load(prompt_path.read_text(encoding="utf-8"), Loader=_Loader)
 
     # 兼容不同写法：有的文件是 {"prompt": "..."}，也可能是 {"system_prompt": "..."} 或 {"system": "..."}
     for key in ("prompt", "system_prompt", "system", "analysis_prompt"):
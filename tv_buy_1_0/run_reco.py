@@ -36,16 +36,30 @@ tv_buy_1_0/run_reco.py  （完整版｜可一键复制粘贴替换）
 """
 
 import argparse
+import functools
+import heapq
+import io
 import sqlite3
 import os
 import re
 import sys
-import io
+import threading
 from datetime import datetime
 from typing import Any, Dict, List, Tuple, Optional
 
 import yaml
 
+try:
+    # 优先用 libyaml 的 C 实现，没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+try:
+    import numpy as np  # 可选：get_top3 打分走列式向量化；没装就用逐台循环
+except ImportError:
+    np = None
+
 from tv_buy_1_0.reasons_v2 import (
     reasons_ps5_v2,
     reasons_movie_v2,
@@ -60,13 +74,16 @@ from tv_buy_1_0.config.settings import ENABLE_LLM  # noqa: E402
 ZHIPU_API_KEY = (os.getenv("ZHIPU_API_KEY", "") or "").strip()
 HAS_LLM = bool(ZHIPU_API_KEY)
 
-try:
-    from tv_buy_1_0.llm.enhance import enhance_with_llm  # noqa: E402
-except Exception:
-    enhance_with_llm = None  # type: ignore
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+@functools.lru_cache(maxsize=1)
+def _get_enhance_fn():
+    # 懒加载：llm.enhance 会带进 openai 等重依赖，只有 ENABLE_LLM 时才 import
+    try:
+        from tv_buy_1_0.llm.enhance import enhance_with_llm
+    except Exception:
+        return None
+    return enhance_with_llm
+
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB = os.path.join(BASE_DIR, "db", "tv.sqlite")
@@ -402,11 +419,18 @@ def to_bool01(x: Any) -> Optional[float]:
     if isinstance(x, bool):
         return 1.0 if x else 0.0
     if isinstance(x, str):
-        s = x.strip().lower()
-        if s in ("true", "yes", "y", "1", "支持", "有", "是"):
-            return 1.0
-        if s in ("false", "no", "n", "0", "不支持", "无", "否"):
-            return 0.0
+        return _bool01_str(x)
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _bool01_str(x: str) -> Optional[float]:
+    # DB 里布尔字段的写法就那么几十种，按原串缓存，省掉逐行 strip().lower()
+    s = x.strip().lower()
+    if s in ("true", "yes", "y", "1", "支持", "有", "是"):
+        return 1.0
+    if s in ("false", "no", "n", "0", "不支持", "无", "否"):
+        return 0.0
     return None
 
 
@@ -424,32 +448,33 @@ def norm_neg(x, lo, hi) -> float:
     return 1.0 - norm_pos(x, lo, hi)
 
 
+# 品牌归一：key -> 所有写法（小写）。norm_brand 与 SQL 品牌过滤共用这一份
+_BRAND_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "tcl": ("tcl", "t.c.l"),
+    "mi": ("mi", "小米", "xiaomi", "redmi", "红米"),
+    "hisense": ("hisense", "海信"),
+    "sony": ("sony", "索尼"),
+    "vidda": ("vidda", "vidda发现", "发现"),
+    "ffalcon": ("雷鸟", "ffalcon", "f-falcon", "falcon", "f falcon"),
+    "skyworth": ("创维", "skyworth"),
+    "samsung": ("三星", "samsung"),
+    "lg": ("lg",),
+    "toshiba": ("东芝", "toshiba"),
+}
+_BRAND_ALIAS: Dict[str, str] = {alias: key for key, aliases in _BRAND_SYNONYMS.items() for alias in aliases}
+
+
 def norm_brand(brand: Optional[str]) -> Optional[str]:
     if not brand:
         return None
-    b = str(brand).strip().lower()
-
-    if b in ("tcl", "t.c.l"):
-        return "tcl"
-    if b in ("mi", "小米", "xiaomi", "redmi", "红米"):
-        return "mi"
-    if b in ("hisense", "海信"):
-        return "hisense"
-    if b in ("sony", "索尼"):
-        return "sony"
-    if b in ("vidda", "vidda发现", "发现"):
-        return "vidda"
-    if b in ("雷鸟", "ffalcon", "f-falcon", "falcon", "f falcon"):
-        return "ffalcon"
-    if b in ("创维", "skyworth"):
-        return "skyworth"
-    if b in ("三星", "samsung"):
-        return "samsung"
-    if b in ("lg",):
-        return "lg"
-    if b in ("东芝", "toshiba"):
-        return "toshiba"
-    return b
+    return _norm_brand_str(str(brand))
+
+
+@functools.lru_cache(maxsize=1024)
+def _norm_brand_str(brand: str) -> str:
+    # 实际出现的品牌写法就几十种：按原始字符串缓存，每台候选不再重复 strip/lower
+    b = brand.strip().lower()
+    return _BRAND_ALIAS.get(b, b)
 
 
 def brand_multiplier(brand: Optional[str]) -> float:
@@ -473,17 +498,27 @@ def launch_year_from_date(d: Any) -> int:
     return int(ymd[0])
 
 
+# 价格字符串：一次 translate 去掉货币符号/千分位，再用预编译正则取第一个数
+_PRICE_STRIP = str.maketrans("", "", "￥¥,")
+_PRICE_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
 def parse_price(p: Any) -> Optional[float]:
     if p is None:
         return None
     if isinstance(p, (int, float)):
         return float(p)
-    s = str(p).strip().replace("￥", "").replace("¥", "").replace(",", "")
-    m = re.search(r"(\d+(\.\d+)?)", s)
+    return _parse_price_str(str(p))
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_price_str(s: str) -> Optional[float]:
+    # 同样的价格文本在各次请求里反复出现，按字符串缓存
+    m = _PRICE_RE.search(s.translate(_PRICE_STRIP))
     if not m:
         return None
     try:
-        return float(m.group(1))
+        return float(m.group(0))
     except Exception:
         return None
 
@@ -496,6 +531,20 @@ def date_rank(d: Any) -> int:
     return y * 10000 + m * 100 + dd
 
 
+def _launch_rank(tv: Dict[str, Any]) -> int:
+    # 入库/读 YAML 时已算好 _date_rank 的直接用；其它来源的行退回现解析
+    dr = tv.get("_date_rank")
+    return dr if dr is not None else date_rank(tv.get("launch_date"))
+
+
+def _months_ago_rank(dr: int) -> Optional[int]:
+    # 同 months_ago，但输入是 date_rank（YYYYMMDD，0 = 无法解析）
+    if not dr:
+        return None
+    now = datetime.now()
+    return (now.year - dr // 10000) * 12 + (now.month - dr // 100 % 100)
+
+
 def _safe_int(x: Any) -> Optional[int]:
     try:
         if x is None:
@@ -514,8 +563,14 @@ def _safe_int(x: Any) -> Optional[int]:
 
 
 def load_profile(scene: str):
-    with open(PROFILES, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f) or {}
+    # 按 mtime 缓存：profiles.yaml 没改就不重复读文件/解析；返回值只读共享，调用方不要原地修改
+    return _load_profile_cached(PROFILES, os.path.getmtime(PROFILES), scene)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_profile_cached(path: str, mtime: float, scene: str):
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = yaml.load(f, Loader=_Loader) or {}
     profiles = cfg.get("profiles", {})
     if scene not in profiles:
         raise SystemExit(f"Unknown scene: {scene}. Available: {list(profiles.keys())}")
@@ -534,6 +589,27 @@ def minmax(cands: List[Dict[str, Any]], key: str):
     return float(min(vals)), float(max(vals))
 
 
+def minmax_all(cands: List[Dict[str, Any]], keys) -> Dict[str, Tuple[float, float]]:
+    """一次扫完所有候选，同时算出每个 key 的 (min, max)；结果与逐个 minmax(cands, k) 相同"""
+    keys = list(keys)
+    lo: Dict[str, Any] = {}
+    hi: Dict[str, Any] = {}
+    for tv in cands:
+        for k in keys:
+            v = tv.get(k)
+            if v is None:
+                continue
+            if k not in lo:
+                lo[k] = hi[k] = v
+                continue
+            # 与内置 min/max 的比较方式一致：严格小于/大于才替换
+            if v < lo[k]:
+                lo[k] = v
+            if v > hi[k]:
+                hi[k] = v
+    return {k: (float(lo[k]), float(hi[k])) if k in lo else (0.0, 1.0) for k in keys}
+
+
 def _load_yaml_file(path: str) -> Optional[Dict[str, Any]]:
     try:
         with open(path, "r", encoding="utf-8") as f:
@@ -576,6 +652,7 @@ def load_tcl_excel_variants() -> List[Dict[str, Any]]:
         brand = obj.get("brand") or "TCL"
         base_model = obj.get("model") or ""
         first_release = _normalize_first_release(obj.get("first_release"))
+        first_release_rank = date_rank(first_release)
         spec = obj.get("spec") if isinstance(obj.get("spec"), dict) else {}
         variants = obj.get("variants") if isinstance(obj.get("variants"), list) else []
 
@@ -610,6 +687,7 @@ def load_tcl_excel_variants() -> List[Dict[str, Any]]:
                 "size_inch": int(size_inch),
                 "street_rmb": price_cny,
                 "launch_date": first_release,
+                "_date_rank": first_release_rank,
                 "input_lag_ms_60hz": None,
                 "hdmi_2_1_ports": hdmi_2_1_ports,
                 "allm": allm,
@@ -627,26 +705,73 @@ def load_tcl_excel_variants() -> List[Dict[str, Any]]:
     return out
 
 
-def all_by_size_from_db(target: int) -> List[Dict[str, Any]]:
-    sql = """
+# 进程内常驻一个只读连接（省掉每次查询的 connect/close + 冷页缓存）；Web 多线程共用，用锁串行化
+_DB_CONN: Optional[sqlite3.Connection] = None
+_DB_LOCK = threading.Lock()
+
+
+def _db_conn() -> sqlite3.Connection:
+    # 调用方需持有 _DB_LOCK
+    global _DB_CONN
+    if _DB_CONN is None:
+        conn = sqlite3.connect(DB, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute("PRAGMA mmap_size = 268435456")  # 256MB：库文件直接 mmap 读
+        conn.execute("PRAGMA cache_size = -65536")  # 64MB 页缓存
+        _DB_CONN = conn
+    return _DB_CONN
+
+
+def all_by_size_from_db(target: int, brand: Optional[str] = None, budget: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    品牌/预算尽量在 SQL 里先筛掉（只把可能命中的行取出来转 dict），apply_filters 仍做最终兜底：
+    - 品牌：只取 ALLOWED_BRANDS（或指定品牌）各种写法的行
+    - 预算：数值型价格直接比较；非数值（文本价格等）放行给 parse_price 判断；没价格的行本来就会被过滤
+    """
+    bkey = norm_brand(brand)
+    keys = [bkey] if bkey else sorted(ALLOWED_BRANDS)
+    aliases = sorted({a for k in keys if k in ALLOWED_BRANDS for a in _BRAND_SYNONYMS.get(k, (k,))})
+    if not aliases:
+        return []
+
+    sql = f"""
     SELECT *
     FROM tv
     WHERE launch_date IS NOT NULL
       AND size_inch = ?
+      AND lower(trim(brand, ' \t\r\n')) IN ({", ".join("?" * len(aliases))})
+    """
+    params: List[Any] = [int(target), *aliases]
+    if budget is not None:
+        sql += """
+      AND street_rmb IS NOT NULL
+      AND (typeof(street_rmb) NOT IN ('integer', 'real') OR street_rmb <= ?)
     """
-    conn = sqlite3.connect(DB)
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(sql, (int(target),)).fetchall()
-    conn.close()
+        params.append(float(budget))
+
+    # size_inch 索引由 tools/build_db_indexes.py 在建库后创建；这里只读，不做 DDL
+    with _DB_LOCK:
+        # 不用 sqlite3.Row：原始 tuple 直接 zip 成 dict，每行只分配一次（列名只取一次）
+        cur = _db_conn().execute(sql, params)
+        cols = [c[0] for c in cur.description]
+        rows = cur.fetchall()
+
     out = []
     for r in rows:
-        d = dict(r)
-        d["launch_date"] = _norm_launch_yyyy_mmdd(d.get("launch_date")) or d.get("launch_date")
+        d = dict(zip(cols, r))
+        # 首发日期只在这里解析一次：规范化成 YYYY-MM-DD，同时记下 _date_rank 给排序/年份/月龄用
+        ymd = _parse_ymd_any(d["launch_date"])
+        if ymd:
+            y, m, dd = ymd
+            d["launch_date"] = f"{y:04d}-{m:02d}-{dd:02d}"
+            d["_date_rank"] = y * 10000 + m * 100 + dd
+        else:
+            d["_date_rank"] = 0
         out.append(d)
     return out
 
 
-def all_by_size(target: int, brand: Optional[str] = None) -> List[Dict[str, Any]]:
+def all_by_size(target: int, brand: Optional[str] = None, budget: Optional[int] = None) -> List[Dict[str, Any]]:
     bkey = norm_brand(brand)
     if bkey == "tcl":
         xs = load_tcl_excel_variants()
@@ -654,7 +779,7 @@ def all_by_size(target: int, brand: Optional[str] = None) -> List[Dict[str, Any]
             r for r in xs
             if isinstance(r.get("size_inch"), int) and int(r["size_inch"]) == int(target)
         ]
-    return all_by_size_from_db(target)
+    return all_by_size_from_db(target, brand=brand, budget=budget)
 
 
 def apply_filters(cands: List[Dict[str, Any]], brand: Optional[str] = None, budget: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -683,31 +808,60 @@ def apply_filters(cands: List[Dict[str, Any]], brand: Optional[str] = None, budg
     return out
 
 
-def list_candidates(size: int, brand: Optional[str] = None, budget: Optional[int] = None, limit: int = 10) -> Tuple[int, List[Dict[str, Any]]]:
-    cands = apply_filters(all_by_size(size, brand=brand), brand=brand, budget=budget)
-
-    def year_bucket(tv: Dict[str, Any]) -> int:
-        y = launch_year_from_date(tv.get("launch_date"))
-        if y == 2026:
-            return 0
-        if y == 2025:
-            return 1
-        return 2
-
-    def price_rank(tv: Dict[str, Any]) -> float:
-        p = parse_price(tv.get("street_rmb"))
-        return p if p is not None else 10**18
-
-    cands.sort(
-        key=lambda tv: (
-            year_bucket(tv),
-            -date_rank(tv.get("launch_date")),
-            price_rank(tv),
-        )
+def _candidate_sort_key(tv: Dict[str, Any]) -> Tuple[int, int, float]:
+    # 年份直接由 date_rank（YYYYMMDD）得到
+    dr = _launch_rank(tv)
+    y = dr // 10000
+    p = parse_price(tv.get("street_rmb"))
+    return (
+        0 if y == 2026 else 1 if y == 2025 else 2,
+        -dr,
+        p if p is not None else 10**18,
     )
+
+
+def _candidate_page_key(tv: Dict[str, Any]) -> Tuple[int, int, float, str]:
+    # 分页用：在排序 key 后面补一个唯一标识，保证 key 全序，游标 "> 上一页最后一个" 不重不漏
+    ident = tv.get("product_id") or f"{tv.get('brand')}|{tv.get('model')}|{tv.get('size_inch')}"
+    return (*_candidate_sort_key(tv), str(ident))
+
+
+def list_candidates(size: int, brand: Optional[str] = None, budget: Optional[int] = None, limit: int = 10) -> Tuple[int, List[Dict[str, Any]]]:
+    cands = apply_filters(all_by_size(size, brand=brand, budget=budget), brand=brand, budget=budget)
+    cands.sort(key=_candidate_sort_key)
     return len(cands), cands[:limit]
 
 
+def page_candidates(
+    size: int,
+    brand: Optional[str] = None,
+    budget: Optional[int] = None,
+    limit: int = 20,
+    cursor: Optional[Tuple[Any, ...]] = None,
+    offset: int = 0,
+) -> Tuple[int, List[Dict[str, Any]], Optional[Tuple[Any, ...]]]:
+    """
+    游标分页（keyset）：返回 (总数, 本页, 下一页游标)；没有下一页时游标为 None。
+    - cursor = 上一页最后一台的 _candidate_page_key，只取 key 比它大的
+    - 本页用 heapq.nsmallest 取前 limit 个，不对全部候选排序
+    - offset 只为兼容旧调用：在游标之后再跳过 offset 台
+    """
+    cands = apply_filters(all_by_size(size, brand=brand, budget=budget), brand=brand, budget=budget)
+    total = len(cands)
+
+    keyed = [(_candidate_page_key(tv), i) for i, tv in enumerate(cands)]
+    if cursor is not None:
+        cursor = tuple(cursor)
+        keyed = [x for x in keyed if x[0] > cursor]
+
+    skip = max(0, int(offset))
+    limit = max(0, int(limit))
+    top = heapq.nsmallest(skip + limit + 1, keyed)
+    page = top[skip: skip + limit]
+    next_cursor = page[-1][0] if page and len(top) > skip + limit else None
+    return total, [cands[i] for _, i in page], next_cursor
+
+
 def format_candidates(size: int, total: int, cands: List[Dict[str, Any]], brand: Optional[str] = None, budget: Optional[int] = None) -> str:
     head = f"📌 当前筛选候选：{total} 台"
     cond = []
@@ -721,19 +875,20 @@ def format_candidates(size: int, total: int, cands: List[Dict[str, Any]], brand:
     if total == 0:
         return head + "\n⚠️ 当前条件下没有候选。你可以：放宽品牌/提高预算/换尺寸。"
 
-    lines = [head, "（展示前10）"]
+    buf = io.StringIO()
+    w = buf.write
+    w(head)
+    w("\n（展示前10）")
     for i, tv in enumerate(cands, 1):
         launch_mm = fmt_launch_yyyy_mm(tv.get("launch_date"))
-        lines.append(
-            f"{i}. {tv.get('brand')} {tv.get('model')} {tv.get('size_inch')}寸 | 首发 {launch_mm} | ￥{fmt(tv.get('street_rmb'))}"
-        )
-    return "\n".join(lines)
+        w(f"\n{i}. {tv.get('brand')} {tv.get('model')} {tv.get('size_inch')}寸 | 首发 {launch_mm} | ￥{fmt(tv.get('street_rmb'))}")
+    return buf.getvalue()
 
 
 def get_top3(size: int, scene: str, brand: Optional[str] = None, budget: Optional[int] = None, year_prefer: int = 2026) -> List[Dict[str, Any]]:
     weights, negative_metrics, boolean_metrics, penalties = load_profile(scene)
 
-    cands = apply_filters(all_by_size(size, brand=brand), brand=brand, budget=budget)
+    cands = apply_filters(all_by_size(size, brand=brand, budget=budget), brand=brand, budget=budget)
     if not cands:
         return []
 
@@ -742,75 +897,235 @@ def get_top3(size: int, scene: str, brand: Optional[str] = None, budget: Optiona
             if k in tv:
                 tv[k] = to_bool01(tv.get(k))
 
-    stat = {k: minmax(cands, k) for k in weights.keys()}
-
-    ranked: List[Dict[str, Any]] = []
-    for tv in cands:
-        score = 0.0
-        parts: Dict[str, float] = {}
-
-        for k, w in weights.items():
-            lo, hi = stat.get(k, (0.0, 1.0))
-            raw = tv.get(k)
-            if k in negative_metrics:
-                s = norm_neg(raw, lo, hi)
-            else:
-                s = norm_pos(raw, lo, hi)
-            parts[k] = s * float(w)
-            score += parts[k]
-
-        for pen in penalties:
-            m = pen.get("metric")
-            op = pen.get("op")
-            val = pen.get("value")
-            mul = float(pen.get("multiplier", 1.0))
-            x = tv.get(m)
-
-            if op == "is_null" and x is None:
-                score *= mul
-                continue
-            if op == "not_null" and x is not None:
-                score *= mul
-                continue
-            if x is None:
-                continue
-
-            try:
-                if (
-                    (op == ">" and x > val)
-                    or (op == ">=" and x >= val)
-                    or (op == "<" and x < val)
-                    or (op == "<=" and x <= val)
-                    or (op == "==" and x == val)
-                ):
-                    score *= mul
-            except Exception:
-                pass
-
-        age = months_ago(tv.get("launch_date"))
+    if np is not None:
+        scores, part_cols = _score_columns(cands, weights, negative_metrics, penalties)
+        parts_of = lambda i: {k: float(col[i]) for k, col in part_cols.items()}  # noqa: E731
+    else:
+        scorer = _compiled_profile(scene, os.path.getmtime(PROFILES))
+        score_list, part_list = _score_rows(cands, weights, scorer)
+        scores = score_list
+        parts_of = part_list.__getitem__
+
+    # 年龄/品牌系数 + 排序键；完整的结果 dict（含 _parts）只给最终 Top3 构造
+    rows: List[Tuple[Tuple[Any, ...], int, float, int, int, float]] = []
+    for i, tv in enumerate(cands):
+        score = float(scores[i])
+
+        dr = _launch_rank(tv)
+        age = _months_ago_rank(dr)
         if age is not None and age > 12:
             score *= 0.92
 
         bmul = brand_multiplier(tv.get("brand"))
         score *= bmul
 
-        tv2 = dict(tv)
+        year = dr // 10000
+        brank = brand_rank(tv.get("brand"))
+        key = (
+            0 if year == year_prefer else 1,
+            int(brank or 999),
+            -float(score or 0.0),
+            -dr,
+        )
+        rows.append((key, i, score, year, brank, bmul))
+
+    rows.sort(key=lambda r: r[0])  # sort 稳定：同键时保持候选原顺序（与逐台构造后再排序一致）
+
+    ranked: List[Dict[str, Any]] = []
+    for _key, i, score, year, brank, bmul in rows[:3]:
+        tv2 = dict(cands[i])
         tv2["_score"] = score
-        tv2["_year"] = launch_year_from_date(tv.get("launch_date"))
-        tv2["_parts"] = parts
-        tv2["_brand_rank"] = brand_rank(tv.get("brand"))
+        tv2["_year"] = year
+        tv2["_parts"] = parts_of(i)
+        tv2["_brand_rank"] = brank
         tv2["_brand_mul"] = bmul
         ranked.append(tv2)
+    return ranked
+
+
+def _score_rows(cands: List[Dict[str, Any]], weights: Dict[str, Any], scorer) -> Tuple[List[float], List[Dict[str, float]]]:
+    """逐台打分（没装 numpy 时用）：返回 (分数, 各指标得分)，未含年龄/品牌系数"""
+    stat = minmax_all(cands, weights.keys())
+    score_fn = scorer(stat)
+
+    scores: List[float] = []
+    all_parts: List[Dict[str, float]] = []
+    for tv in cands:
+        score, parts = score_fn(tv)
+        scores.append(score)
+        all_parts.append(parts)
+    return scores, all_parts
+
+
+_COMPARE_OPS = (">", ">=", "<", "<=", "==")
+
+
+def _fold_metric(lo: float, hi: float, w: Any, negative: bool) -> Tuple[float, float, float]:
+    """
+    把 “归一化到 [0,1] → (负向指标取 1-x) → 乘权重” 折叠成一次 x*scale + bias（x 先夹到 [lo,hi]）。
+    返回 (scale, bias, miss)：miss 是缺失/无法解析时的得分（正向 0，负向 w，与 norm_pos/norm_neg 一致）。
+    hi <= lo 时 scale=0、bias=miss，夹紧后的 x 是有限值，结果恒为 miss。
+    """
+    w = float(w)
+    miss = w if negative else 0.0
+    if hi <= lo:
+        return 0.0, miss, miss
+    scale = w / (hi - lo)
+    bias = -lo * scale
+    if negative:
+        scale, bias = -scale, w - bias
+    return scale, bias, miss
+
+
+def _compile_profile(weights: Dict[str, Any], negative_metrics: set, penalties: List[Dict[str, Any]]):
+    """
+    把一个场景的打分规则编译成直线代码：bind(stat) -> score(tv) -> (score, parts)
+    - 指标/权重/惩罚都在编译期展开，运行时不再遍历 weights/penalties、不再按 op 字符串分支
+    - bind 时按本次候选的 (lo, hi) 把归一化和权重折叠成 scale/bias，每台每指标只剩一次乘加
+    - 指标名/阈值等配置值放进命名空间常量（_k0/_v0...），不拼进源码，YAML 里写什么都不会变成代码
+    - 运算顺序与逐条解释时一致（先加权求和，再按配置顺序乘惩罚系数）
+    """
+    ns: Dict[str, Any] = {"_fold": _fold_metric}
+    head = ["def bind(stat):"]
+    body = ["    def score(tv):", "        get = tv.get", "        parts = {}", "        s = 0.0"]
+
+    for i, (k, w) in enumerate(weights.items()):
+        ns[f"_k{i}"] = k
+        ns[f"_w{i}"] = float(w)
+        ns[f"_n{i}"] = k in negative_metrics
+        head += [
+            f"    lo{i}, hi{i} = stat.get(_k{i}, (0.0, 1.0))",
+            f"    sc{i}, b{i}, m{i} = _fold(lo{i}, hi{i}, _w{i}, _n{i})",
+        ]
+        body += [
+            f"        x = get(_k{i})",
+            "        if x is None:",
+            f"            p = m{i}",
+            "        else:",
+            "            try:",
+            f"                p = max(lo{i}, min(hi{i}, float(x))) * sc{i} + b{i}",
+            "            except Exception:",
+            f"                p = m{i}",
+            f"        parts[_k{i}] = p",
+            "        s += p",
+        ]
+
+    for j, pen in enumerate(penalties):
+        op = pen.get("op")
+        ns[f"_m{j}"] = pen.get("metric")
+        ns[f"_v{j}"] = pen.get("value")
+        ns[f"_x{j}"] = float(pen.get("multiplier", 1.0))
+        if op == "is_null":
+            body += [f"        if get(_m{j}) is None:", f"            s *= _x{j}"]
+        elif op == "not_null":
+            body += [f"        if get(_m{j}) is not None:", f"            s *= _x{j}"]
+        elif op in _COMPARE_OPS:
+            body += [
+                f"        x = get(_m{j})",
+                "        if x is not None:",
+                "            try:",
+                f"                hit = x {op} _v{j}",
+                "            except Exception:",
+                "                hit = False",
+                "            if hit:",
+                f"                s *= _x{j}",
+            ]
+        # 其它 op：逐条解释时永不命中，这里直接不生成
+
+    body += ["        return s, parts", "    return score"]
+    exec(compile("\n".join(head + body), "<profile>", "exec"), ns)
+    return ns["bind"]
+
+
+@functools.lru_cache(maxsize=8)
+def _compiled_profile(scene: str, mtime: float):
+    # mtime 进 key：profiles.yaml 改了自动重新编译
+    weights, negative_metrics, _boolean_metrics, penalties = load_profile(scene)
+    return _compile_profile(weights, negative_metrics, penalties)
+
+
+def _float_or_nan(x: Any) -> float:
+    # 与 norm_pos 一致：能 float() 的都算数，其它（含 None）记 NaN
+    if x is None:
+        return float("nan")
+    try:
+        return float(x)
+    except Exception:
+        return float("nan")
+
+
+_PENALTY_OPS = {
+    ">": lambda col, v: col > v,
+    ">=": lambda col, v: col >= v,
+    "<": lambda col, v: col < v,
+    "<=": lambda col, v: col <= v,
+    "==": lambda col, v: col == v,
+}
+
+
+def _score_columns(
+    cands: List[Dict[str, Any]], weights: Dict[str, Any], negative_metrics: set, penalties: List[Dict[str, Any]]
+):
+    """
+    列式（SoA）打分：每个指标一列 float64，归一化/加权/惩罚都是整列运算。
+    结果与 _score_rows 逐位一致（同样先夹到 [lo,hi] 再按 _fold_metric 的 scale/bias 乘加，惩罚按配置顺序逐个相乘）。
+    """
+    n = len(cands)
+    scores = np.zeros(n, dtype=np.float64)
+    part_cols: Dict[str, Any] = {}
+    stat = minmax_all(cands, weights.keys())
+
+    for k, w in weights.items():
+        col = np.fromiter((_float_or_nan(tv.get(k)) for tv in cands), dtype=np.float64, count=n)
+        lo, hi = stat[k]
+        scale, bias, miss = _fold_metric(lo, hi, w, k in negative_metrics)
+        if hi <= lo:
+            part = np.full(n, miss, dtype=np.float64)
+        else:
+            # 缺失值（NaN）记 miss：正向 0，负向 w
+            part = np.nan_to_num(np.clip(col, lo, hi) * scale + bias, nan=miss)
+        part_cols[k] = part
+        scores += part
+
+    for pen in penalties:
+        m = pen.get("metric")
+        op = pen.get("op")
+        val = pen.get("value")
+        mul = float(pen.get("multiplier", 1.0))
+        raw = [tv.get(m) for tv in cands]
+
+        if op == "is_null":
+            mask = np.fromiter((x is None for x in raw), dtype=bool, count=n)
+        elif op == "not_null":
+            mask = np.fromiter((x is not None for x in raw), dtype=bool, count=n)
+        elif op in _PENALTY_OPS and _is_plain_number(val) and all(x is None or _is_plain_number(x) for x in raw):
+            col = np.fromiter((_float_or_nan(x) for x in raw), dtype=np.float64, count=n)
+            mask = _PENALTY_OPS[op](col, float(val))  # NaN（缺失）比较恒为 False，与逐台版跳过 None 一致
+        else:
+            # 非数值比较（字符串等）：退回逐台判断，异常即视为不命中
+            mask = np.fromiter((_penalty_hit(op, x, val) for x in raw), dtype=bool, count=n)
+        scores *= np.where(mask, mul, 1.0)
+
+    return scores, part_cols
+
+
+def _is_plain_number(x: Any) -> bool:
+    return isinstance(x, (int, float))
 
-    ranked.sort(
-        key=lambda x: (
-            0 if x.get("_year") == year_prefer else 1,
-            int(x.get("_brand_rank") or 999),
-            -float(x.get("_score") or 0.0),
-            -date_rank(x.get("launch_date")),
+
+def _penalty_hit(op: Any, x: Any, val: Any) -> bool:
+    if x is None:
+        return False
+    try:
+        return bool(
+            (op == ">" and x > val)
+            or (op == ">=" and x >= val)
+            or (op == "<" and x < val)
+            or (op == "<=" and x <= val)
+            or (op == "==" and x == val)
         )
-    )
-    return ranked[:3]
+    except Exception:
+        return False
 
 
 def reasons(tv: Dict[str, Any], scene: str) -> Tuple[List[str], str]:
@@ -843,7 +1158,55 @@ def reasons(tv: Dict[str, Any], scene: str) -> Tuple[List[str], str]:
     return r, "参数未完整采集，建议以实测/评测为准。"
 
 
+# 场景 -> 理由生成函数（未知场景走 reasons(tv, scene)）
+_REASONS = {
+    "ps5": reasons_ps5_v2,
+    "movie": reasons_movie_v2,
+    "bright": reasons_bright_v2,
+}
+
+# 场景 -> (一句话结论, 结论为空时的兜底)；未知场景直接用 PS5 兜底
+_SUMMARY = {
+    "ps5": (lambda tv: _drop_vrr_text(top1_summary_ps5(tv) or ""), _ps5_strong_summary),
+    "movie": (top1_summary_movie, _movie_strong_summary),
+    "bright": (top1_summary_bright, _bright_strong_summary),
+}
+
+
+def _data_version(brand: Optional[str]) -> Tuple[float, ...]:
+    """推荐结果依赖的数据文件版本（mtime）：TCL 看 Excel YAML 目录，其它看 sqlite；再加 profiles.yaml"""
+    try:
+        if norm_brand(brand) == "tcl":
+            with os.scandir(TCL_EXCEL_DIR) as it:
+                data = max((e.stat().st_mtime for e in it), default=0.0)
+            data = max(data, os.path.getmtime(TCL_EXCEL_DIR))
+        else:
+            data = os.path.getmtime(DB)
+    except OSError:
+        data = 0.0
+    try:
+        prof = os.path.getmtime(PROFILES)
+    except OSError:
+        prof = 0.0
+    return data, prof
+
+
 def recommend_text(size: int, scene: str, brand: Optional[str] = None, budget: Optional[int] = None, year_prefer: int = 2026) -> str:
+    # LLM 增强的输出不固定，只缓存纯规则引擎结果；key 带上数据版本和当前月份（首发超 12 个月会降权）
+    if ENABLE_LLM:
+        return _recommend_text(size, scene, brand, budget, year_prefer)
+    month = datetime.now().strftime("%Y%m")
+    return _recommend_text_cached(size, scene, brand, budget, year_prefer, _data_version(brand), month)
+
+
+@functools.lru_cache(maxsize=512)
+def _recommend_text_cached(
+    size: int, scene: str, brand: Optional[str], budget: Optional[int], year_prefer: int, data_version: Tuple[float, ...], month: str
+) -> str:
+    return _recommend_text(size, scene, brand, budget, year_prefer)
+
+
+def _recommend_text(size: int, scene: str, brand: Optional[str] = None, budget: Optional[int] = None, year_prefer: int = 2026) -> str:
     top3 = get_top3(size=size, scene=scene, brand=brand, budget=budget, year_prefer=year_prefer)
 
     def _p(tv: Dict[str, Any]) -> float:
@@ -869,9 +1232,15 @@ def recommend_text(size: int, scene: str, brand: Optional[str] = None, budget: O
         lines.append("你可以：放宽品牌 / 提高预算 / 换尺寸。")
         return "\n".join(lines)
 
-    lines.append("")
-    lines.append("Top 3 推荐（最终展示：按价格从高到低）")
-    lines.append("-" * 70)
+    # 正文直接写进一个 StringIO，不再逐行拼小字符串再 join
+    buf = io.StringIO()
+    w = buf.write
+    w(head)
+    w("\n")
+    w(SCENE_DESC.get(scene, ""))
+    w("\n\nTop 3 推荐（最终展示：按价格从高到低）\n")
+    w("-" * 70)
+    w("\n")
 
     for i, tv in enumerate(top3_display, 1):
         warn = ""
@@ -879,69 +1248,48 @@ def recommend_text(size: int, scene: str, brand: Optional[str] = None, budget: O
             warn = " ⚠️亮度口径偏激进"
         title = f"{tv.get('brand')} {tv.get('model')} {tv.get('size_inch')}寸"
         launch_mm = fmt_launch_yyyy_mm(tv.get("launch_date"))
-        lines.append(f"{i}. {title} | 首发 {launch_mm} | ￥{fmt(tv.get('street_rmb'))}{warn}")
+        w(f"{i}. {title} | 首发 {launch_mm} | ￥{fmt(tv.get('street_rmb'))}{warn}\n")
 
+        rs_fn = _REASONS.get(scene)
+        rs, note = rs_fn(tv) if rs_fn is not None else reasons(tv, scene)
         if scene == "ps5":
-            rs, note = reasons_ps5_v2(tv)
             rs = _drop_vrr_lines(list(rs or []))
             note = _drop_vrr_text(str(note or ""))
 
             if len([x for x in rs if (x or "").strip()]) < 2:
                 rs = _ps5_fallback_reasons(tv)
 
-            note = _note_clean(note, scene="ps5")
-
-        elif scene == "movie":
-            rs, note = reasons_movie_v2(tv)
-            note = _note_clean(note, scene="movie")
-        elif scene == "bright":
-            rs, note = reasons_bright_v2(tv)
-            note = _note_clean(note, scene="bright")
-        else:
-            rs, note = reasons(tv, scene)
-            note = _note_clean(note, scene=scene)
+        note = _note_clean(note, scene=scene)
 
         for line in rs:
-            lines.append(f"   - {line}")
+            w("   - ")
+            w(str(line))
+            w("\n")
 
-        lines.append(f"   - 备注：{note}")
-        lines.append("")
+        w("   - 备注：")
+        w(str(note))
+        w("\n\n")
 
-    lines.append("一句话结论：")
+    w("一句话结论：\n")
     summary = ""
-    if scene == "ps5":
-        try:
-            summary = _drop_vrr_text(top1_summary_ps5(top3_display[0]) or "")
-        except Exception:
-            summary = ""
-        summary = (summary or "").strip()
-        if not summary:
-            summary = _ps5_strong_summary(top3_display[0], budget)
-
-    elif scene == "movie":
+    summary_fn, strong_fn = _SUMMARY.get(scene, (None, _ps5_strong_summary))
+    if summary_fn is not None:
         try:
-            summary = (top1_summary_movie(top3_display[0]) or "").strip()
+            summary = (summary_fn(top3_display[0]) or "").strip()
         except Exception:
             summary = ""
-        if not summary:
-            summary = _movie_strong_summary(top3_display[0], budget)
+    if not summary:
+        summary = strong_fn(top3_display[0], budget)
 
-    elif scene == "bright":
-        try:
-            summary = (top1_summary_bright(top3_display[0]) or "").strip()
-        except Exception:
-            summary = ""
-        if not summary:
-            summary = _bright_strong_summary(top3_display[0], budget)
-
-    else:
-        summary = _ps5_strong_summary(top3_display[0], budget)
+    w(summary)
 
-    lines.append(summary)
+    base_text = buf.getvalue()
 
-    base_text = "\n".join(lines)
+    if not ENABLE_LLM:
+        return base_text
 
-    if ENABLE_LLM and HAS_LLM and enhance_with_llm is not None:
+    enhance_with_llm = _get_enhance_fn()
+    if HAS_LLM and enhance_with_llm is not None:
         try:
             llm_text = enhance_with_llm(
                 top3=top3_display,
@@ -955,16 +1303,20 @@ def recommend_text(size: int, scene: str, brand: Optional[str] = None, budget: O
         except Exception as e:
             return base_text + f"\n\n⚠️ LLM 增强失败，已回退规则引擎结果：{e}"
 
-    if ENABLE_LLM and (not HAS_LLM):
+    if not HAS_LLM:
         return base_text + "\n\n⚠️ ENABLE_LLM=1，但未设置 ZHIPU_API_KEY，已使用规则引擎结果。"
 
-    if ENABLE_LLM and enhance_with_llm is None:
-        return base_text + "\n\n⚠️ ENABLE_LLM=1，但 tv_buy_1_0.llm.enhance 未正确加载，已使用规则引擎结果。"
-
-    return base_text
+    return base_text + "\n\n⚠️ ENABLE_LLM=1，但 tv_buy_1_0.llm.enhance 未正确加载，已使用规则引擎结果。"
 
 
 def main():
+    # 只在命令行入口切 UTF-8：作为库被 import 时不碰调用方的 stdout/stderr
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.reconfigure(encoding="utf-8", errors="replace")
+        except AttributeError:
+            pass
+
     ap = argparse.ArgumentParser()
     ap.add_argument("--size", type=int, required=True)
     ap.add_argument("--scene", type=str, required=True, choices=["bright", "movie", "ps5"])
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+tv_buy_1_0/tools/_db.py
+
+tools/ 下报表脚本共用的只读 SQLite 连接（latest_by_brand / latest_by_brand_size）
+- 进程内只 connect 一次，几个脚本在同一进程里被 import 调用时共用
+- query_only：报表只读；索引由 build_db_indexes.py 建
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+DB = "tv_buy_1_0/db/tv.sqlite"
+
+_CONN = None
+
+
+def conn() -> sqlite3.Connection:
+    global _CONN
+    if _CONN is None:
+        c = sqlite3.connect(DB)
+        c.row_factory = sqlite3.Row
+        c.execute("PRAGMA query_only = ON")
+        c.execute("PRAGMA temp_store = MEMORY")  # 窗口函数排序的临时表放内存
+        _CONN = c
+    return _CONN
+
+
+def row_get(row: sqlite3.Row, k: str, default=None):
+    # sqlite3.Row 没有 .get：列不存在时返回 default（与 dict.get 一致，值为 None 时照样返回 None）
+    try:
+        return row[k]
+    except IndexError:
+        return default
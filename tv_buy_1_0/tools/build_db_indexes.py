@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+tv_buy_1_0/tools/build_db_indexes.py
+
+给 tv.sqlite 建查询用的索引：导入/更新库之后手动跑一次。
+查询路径（run_reco / 各报表脚本）一律只读，不在运行时建索引（否则每次调用都会改动入库的 tv.sqlite）。
+
+运行：
+  python tv_buy_1_0/tools/build_db_indexes.py [db_path]
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB = os.path.abspath(os.path.join(BASE_DIR, "..", "db", "tv.sqlite"))
+
+INDEXES = [
+    # run_reco.all_by_size_from_db：WHERE size_inch = ?
+    "CREATE INDEX IF NOT EXISTS idx_tv_size ON tv(size_inch)",
+    # latest_by_brand*.py：ROW_NUMBER() OVER (PARTITION BY brand ORDER BY launch_date DESC ...)
+    "CREATE INDEX IF NOT EXISTS idx_tv_brand_launch ON tv(brand, launch_date DESC)",
+]
+
+
+def main() -> None:
+    db = sys.argv[1] if len(sys.argv) > 1 else DB
+    conn = sqlite3.connect(db)
+    try:
+        for sql in INDEXES:
+            conn.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"ok: {len(INDEXES)} indexes on {db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,60 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import functools
+import heapq
+import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Union
 
 import yaml
 from PIL import Image
 
+try:
+    # libyaml 的 C emitter；没编译 libyaml 时退回纯 Python 版
+    from yaml import CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeDumper as _Dumper
+
+try:
+    import orjson  # 可选：C 实现 JSON，内部记录走 JSON 时更快
+except ImportError:
+    orjson = None
+
+from tools import ocr_extract_text as _ocr_backend
 from tools.ocr_extract_text import ocr_image
 
+# tools.ocr_extract_text 可能是根目录的 tesseract 版，也可能是 tv_buy_1_0/tools 的云端 Vision 版（看 cwd / sys.path）
+# 批量 / 单趟接口只有 Vision 版有：没有就退回逐张 ocr_image
+ocr_images = getattr(_ocr_backend, "ocr_images", None)
+ocr_image_with_note = getattr(_ocr_backend, "ocr_image_with_note", None)
+
+# OCR 请求是阻塞的 HTTPS 往返（等网络时释放 GIL），进程内共用一个线程池并发发出
+_OCR_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ocr")
+
+# 单趟识别（可选，默认关）：每张图只请求一次（数字和说明文字一起出），请求数减半
+# 整图识别没有表格裁剪，标题/日期里的数字只靠提示词排除；在真实截图上核对过再用 TVBUY_OCR_SINGLE_PASS=1 打开
+# 当前 OCR 后端没有 ocr_image_with_note（tesseract 版）时忽略该开关
+OCR_SINGLE_PASS = os.getenv("TVBUY_OCR_SINGLE_PASS", "0") == "1" and ocr_image_with_note is not None
+
 # =========================
 # 正则：抓数字（float/int）
 # =========================
 _NUM_RE = re.compile(r"(?<!\d)(\d+\.\d+|\d+)(?!\d)")
+_find_nums = _NUM_RE.findall
+# 快速预筛：一个数字都没有（说明文字常见）就不进正则；含全角数字，OCR 偶尔会吐全角
+_DIGITS = frozenset("0123456789０１２３４５６７８９")
 
 
 def _extract_numbers(text: str) -> List[float]:
-    nums: List[float] = []
-    for m in _NUM_RE.finditer(text or ""):
-        s = m.group(1)
-        try:
-            nums.append(float(s))
-        except Exception:
-            pass
-    return nums
+    if not text or _DIGITS.isdisjoint(text):
+        return []
+    # 单捕获组 findall 直接返回字符串，不建 Match 对象；正则只匹配数字，float() 不会失败
+    return [float(s) for s in _find_nums(text)]
 
 
 def _avg(xs: List[float]) -> Optional[float]:
@@ -44,14 +73,24 @@ def _round_keep(x: Optional[float], nd: int) -> Optional[float]:
     return round(x, nd)
 
 
+# 白场筛选阈值
+_WHITE_MIN = 50.0
+_WHITE_MID_LO = 80.0
+_WHITE_MID_HI = 150.0
+_WHITE_TARGET = 110.0
+
+
+def _white_dist(v: float) -> float:
+    return abs(v - _WHITE_TARGET)
+
+
 def _pick_black(nums: List[float], n: int = 8) -> List[float]:
     """
     黑场：0 < x < 1，取最小的 n 个更像黑
     适配你现在的两张图：黑值都是 0.00xx
     """
-    cand = [x for x in nums if 0 < x < 1.0]
-    cand.sort()
-    return cand[:n]
+    # nsmallest 与 sorted(...)[:n] 结果一致，只维护 n 个元素的堆
+    return heapq.nsmallest(n, [x for x in nums if 0 < x < 1.0])
 
 
 def _pick_white(nums: List[float], n: int = 8) -> List[float]:
@@ -59,33 +98,51 @@ def _pick_white(nums: List[float], n: int = 8) -> List[float]:
     白场：优先 80~150（你示例都是 103~114）
     再按接近 110 排序取 n 个
     """
-    cand_all = [x for x in nums if x > 50.0]
-    cand_mid = [x for x in cand_all if 80.0 <= x <= 150.0]
+    cand_all = [x for x in nums if x > _WHITE_MIN]
+    cand_mid = [x for x in cand_all if _WHITE_MID_LO <= x <= _WHITE_MID_HI]
     use = cand_mid if len(cand_mid) >= n else cand_all
-    use.sort(key=lambda v: abs(v - 110.0))
-    return use[:n]
+    return heapq.nsmallest(n, use, key=_white_dist)
+
+
+# 预编译：DOTALL 让 . 跨行，不用先把换行替换成空格
+_BRIGHTNESS_NOTE_RE = re.compile(r"100\s*nits?.{0,18}?(?:不可满足|无法|达不到|失败)", re.IGNORECASE | re.DOTALL)
+# 兜底：一趟扫描同时找 "100" 和关键词（不要求先后顺序）
+_BRIGHTNESS_NOTE_ANY = re.compile(r"100|不可满足|达不到")
 
 
 def _find_brightness_note(text: str) -> Optional[str]:
-    t = (text or "").replace("\n", " ")
+    t = text or ""
 
-    m = re.search(r"(100\s*nits?.{0,18}?(不可满足|无法|达不到|失败))", t, re.IGNORECASE)
+    m = _BRIGHTNESS_NOTE_RE.search(t)
     if m:
-        return m.group(1).strip()
+        return m.group(0).replace("\n", " ").strip()
 
-    if "100" in t and ("不可满足" in t or "达不到" in t):
+    found = set(_BRIGHTNESS_NOTE_ANY.findall(t))
+    if "100" in found and len(found) > 1:
         return "100nits目标亮度不可满足"
 
     return None
 
 
-def _crop_table_box(image_path: str) -> Tuple[int, int, int, int]:
+def _crop_table_box(image_path: Union[str, Image.Image]) -> Tuple[int, int, int, int]:
     """
     裁剪到表格区域（避免标题/日期混入）
     你这两张图：表格在中间偏上，说明在底部
+    已加载的 PIL.Image 直接用它的尺寸，不再碰文件
     """
-    img = Image.open(image_path)
-    w, h = img.size
+    if isinstance(image_path, Image.Image):
+        return _box_for_size(*image_path.size)
+    return _crop_table_box_cached(image_path, os.path.getmtime(image_path))
+
+
+@functools.lru_cache(maxsize=64)
+def _crop_table_box_cached(image_path: str, mtime: float) -> Tuple[int, int, int, int]:
+    # 同一张图只读一次文件头拿尺寸；mtime 进 key，文件被覆盖后重新算
+    with Image.open(image_path) as img:
+        return _box_for_size(*img.size)
+
+
+def _box_for_size(w: int, h: int) -> Tuple[int, int, int, int]:
     left = int(w * 0.05)
     right = int(w * 0.95)
     top = int(h * 0.20)
@@ -111,14 +168,53 @@ def _detect_white_outliers(white_list: List[float], z_thresh: float = 2.0) -> Li
     return out
 
 
-def contrast_yaml_from_two_images(native_path: str, effective_path: str) -> str:
-    # 1) 数值 OCR（裁剪 + numeric_only）
-    native_num_ocr = ocr_image(native_path, lang="eng", numeric_only=True, crop_box=_crop_table_box(native_path))
-    eff_num_ocr = ocr_image(effective_path, lang="eng", numeric_only=True, crop_box=_crop_table_box(effective_path))
+def _submit_pair_ocr(native_path: str, effective_path: str):
+    if OCR_SINGLE_PASS:
+        # 每张图一次请求：数字 + |NOTE| + 说明文字
+        return [
+            _OCR_EXECUTOR.submit(ocr_image_with_note, native_path, _crop_table_box(native_path)),
+            _OCR_EXECUTOR.submit(ocr_image_with_note, effective_path, _crop_table_box(effective_path)),
+        ]
+
+    # 1) 数值 OCR（裁剪 + numeric_only）：后端有 ocr_images 时两张表放进同一个请求，否则逐张
+    # 2) 全文 OCR（用来抓 brightness_note）：提示词不同，各自单独请求
+    # 请求互相独立，一起发出去，总耗时≈最慢的一次
+    if ocr_images is not None:
+        num_futs = [
+            _OCR_EXECUTOR.submit(
+                ocr_images,
+                [native_path, effective_path],
+                lang="eng",
+                numeric_only=True,
+                crop_boxes=[_crop_table_box(native_path), _crop_table_box(effective_path)],
+            )
+        ]
+    else:
+        num_futs = [
+            _OCR_EXECUTOR.submit(ocr_image, p, lang="eng", numeric_only=True, crop_box=_crop_table_box(p))
+            for p in (native_path, effective_path)
+        ]
+    return num_futs + [
+        _OCR_EXECUTOR.submit(ocr_image, native_path, lang="chi_sim+eng", numeric_only=False),
+        _OCR_EXECUTOR.submit(ocr_image, effective_path, lang="chi_sim+eng", numeric_only=False),
+    ]
+
+
+def _collect_pair_ocr(futs) -> Tuple[str, str, str, str]:
+    # -> (native 数值, effective 数值, native 全文, effective 全文)
+    if len(futs) == 2:
+        (native_num_ocr, native_note), (eff_num_ocr, eff_note) = futs[0].result(), futs[1].result()
+        return native_num_ocr, eff_num_ocr, native_note, eff_note
+    if len(futs) == 4:
+        return tuple(f.result() for f in futs)
+    native_num_ocr, eff_num_ocr = futs[0].result()
+    return native_num_ocr, eff_num_ocr, futs[1].result(), futs[2].result()
+
 
-    # 2) 全文 OCR（用来抓 brightness_note）
-    native_full_ocr = ocr_image(native_path, lang="chi_sim+eng", numeric_only=False)
-    eff_full_ocr = ocr_image(effective_path, lang="chi_sim+eng", numeric_only=False)
+def _contrast_record(native_path: str, effective_path: str) -> Dict[str, Any]:
+    native_num_ocr, eff_num_ocr, native_full_ocr, eff_full_ocr = _collect_pair_ocr(
+        _submit_pair_ocr(native_path, effective_path)
+    )
 
     # 3) 数值提取 + 规则筛选
     native_nums = _extract_numbers(native_num_ocr)
@@ -130,6 +226,21 @@ def contrast_yaml_from_two_images(native_path: str, effective_path: str) -> str:
     eff_black = _pick_black(eff_nums, n=8)
     eff_white = _pick_white(eff_nums, n=8)
 
+    outliers = _detect_white_outliers(eff_white, z_thresh=2.0)
+    return _record_from_picks(
+        native_black, native_white, eff_black, eff_white, outliers, native_full_ocr, eff_full_ocr
+    )
+
+
+def _record_from_picks(
+    native_black: List[float],
+    native_white: List[float],
+    eff_black: List[float],
+    eff_white: List[float],
+    outliers: List[float],
+    native_full_ocr: str,
+    eff_full_ocr: str,
+) -> Dict[str, Any]:
     # 4) 计算
     native_white_avg = _avg(native_white)
     native_black_avg = _avg(native_black)
@@ -149,7 +260,6 @@ def contrast_yaml_from_two_images(native_path: str, effective_path: str) -> str:
     ]
 
     # 如果有效对比度白场有明显异常点，追加说明（你示例提到了 113.76）
-    outliers = _detect_white_outliers(eff_white, z_thresh=2.0)
     if outliers:
         # 取一个代表值写进去（避免太长）
         uncertainties.append(f"有效对比度测试中部分白点亮度（如{outliers[0]:.2f}）偏离均值较大，已如实记录")
@@ -231,22 +341,73 @@ def contrast_yaml_from_two_images(native_path: str, effective_path: str) -> str:
         }
     }
 
-    return yaml.safe_dump(record, allow_unicode=True, sort_keys=False)
+    return record
+
+
+def contrast_yaml_from_two_images(native_path: str, effective_path: str) -> str:
+    record = _contrast_record(native_path, effective_path)
+    return yaml.dump(record, Dumper=_Dumper, allow_unicode=True, sort_keys=False)
+
+
+def contrast_json_from_two_images(native_path: str, effective_path: str) -> str:
+    # 同一份记录的 JSON 版：只给下游程序读时用它，比 YAML 快得多；人工复核仍用 YAML
+    record = _contrast_record(native_path, effective_path)
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(record, ensure_ascii=False, indent=2)
+
+
+def _record_path(out_dir: str, prefix: str, fmt: str) -> Path:
+    if fmt not in ("yaml", "json"):
+        raise ValueError(f"unsupported fmt: {fmt}")
+    outp = Path(out_dir)
+    outp.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return outp / f"{prefix}_{ts}.{fmt}"
 
 
 def save_contrast_yaml_text(
     yaml_text: str,
     out_dir: str = "summaries/contrast_records",
     prefix: str = "contrast",
+    fmt: str = "yaml",
 ) -> str:
-    outp = Path(out_dir)
-    outp.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = outp / f"{prefix}_{ts}.yaml"
+    # fmt："yaml" / "json"，只决定扩展名；保存 contrast_json_from_two_images 的结果时传 fmt="json"
+    # 只是要落盘的话用 save_contrast_record：不先拼出整段字符串
+    path = _record_path(out_dir, prefix, fmt)
     path.write_text(yaml_text, encoding="utf-8")
     return str(path)
 
 
+def dump_contrast_record(record: Dict[str, Any], path: Union[str, Path], fmt: str = "yaml") -> None:
+    """记录直接序列化进文件：YAML 由 Dumper 边生成边写，JSON 用 orjson 的 bytes 直接写"""
+    path = Path(path)
+    if fmt == "json":
+        if orjson is not None:
+            path.write_bytes(orjson.dumps(record, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            return
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        return
+    if fmt != "yaml":
+        raise ValueError(f"unsupported fmt: {fmt}")
+    with path.open("w", encoding="utf-8") as f:
+        yaml.dump(record, f, Dumper=_Dumper, allow_unicode=True, sort_keys=False)
+
+
+def save_contrast_record(
+    native_path: str,
+    effective_path: str,
+    out_dir: str = "summaries/contrast_records",
+    prefix: str = "contrast",
+    fmt: str = "yaml",
+) -> str:
+    # 识别 + 落盘一步完成，返回文件路径；内容与 contrast_*_from_two_images + save_contrast_yaml_text 相同
+    path = _record_path(out_dir, prefix, fmt)
+    dump_contrast_record(_contrast_record(native_path, effective_path), path, fmt=fmt)
+    return str(path)
+
+
 if __name__ == "__main__":
     # 示例（你按实际路径改）
     # native = "native.png"
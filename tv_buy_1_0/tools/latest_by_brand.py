@@ -1,27 +1,26 @@
 # -*- coding: utf-8 -*-
-import sqlite3
-from collections import defaultdict
-
-DB = "tv_buy_1_0/db/tv.sqlite"
+try:
+    from _db import conn, row_get as _g  # 按脚本运行：tools/ 在 sys.path 上
+except ImportError:
+    from tv_buy_1_0.tools._db import conn, row_get as _g
 
+# 每个品牌只取排序第一的一行：交给 SQLite 窗口函数，Python 只拿到 #品牌 行
 SQL = """
 SELECT *
-FROM tv
-WHERE launch_date IS NOT NULL
-ORDER BY brand, launch_date DESC, size_inch DESC, peak_brightness_nits DESC, street_rmb ASC
+FROM (
+  SELECT *,
+         ROW_NUMBER() OVER (
+           PARTITION BY brand
+           ORDER BY launch_date DESC, size_inch DESC, peak_brightness_nits DESC, street_rmb ASC
+         ) AS rn
+  FROM tv
+  WHERE launch_date IS NOT NULL
+)
+WHERE rn = 1
 """
 
 def main():
-    conn = sqlite3.connect(DB)
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(SQL).fetchall()
-    conn.close()
-
-    best = {}
-    for r in rows:
-        b = r["brand"]
-        if b not in best:
-            best[b] = dict(r)
+    best = {r["brand"]: r for r in conn().execute(SQL)}  # 直接留 sqlite3.Row，不再复制成 dict
 
     # 输出
     brands = sorted(best.keys(), key=lambda x: (x or "").lower())
@@ -29,14 +28,14 @@ def main():
     print("-" * 80)
     for b in brands:
         tv = best[b]
-        ld = tv.get("launch_date") or "未知"
-        price = tv.get("street_rmb")
+        ld = _g(tv, "launch_date") or "未知"
+        price = _g(tv, "street_rmb")
         price_s = f"¥{price}" if price is not None else "¥?"
-        pb = tv.get("peak_brightness_nits")
+        pb = _g(tv, "peak_brightness_nits")
         pb_s = f"{pb}nits" if pb is not None else "?"
-        zones = tv.get("local_dimming_zones")
+        zones = _g(tv, "local_dimming_zones")
         zones_s = str(zones) if zones is not None else "?"
-        print(f"{b:10} | {tv.get('model','?'):20} | {tv.get('size_inch','?')}寸 | 首发 {ld} | {price_s} | 亮度 {pb_s} | 分区 {zones_s}")
+        print(f"{b:10} | {_g(tv, 'model','?'):20} | {_g(tv, 'size_inch','?')}寸 | 首发 {ld} | {price_s} | 亮度 {pb_s} | 分区 {zones_s}")
 
 if __name__ == "__main__":
     main()
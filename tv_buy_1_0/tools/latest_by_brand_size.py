@@ -1,49 +1,51 @@
 # -*- coding: utf-8 -*-
-import sys, sqlite3
+import sys
+
+try:
+    from _db import conn, row_get as _g  # 按脚本运行：tools/ 在 sys.path 上
+except ImportError:
+    from tv_buy_1_0.tools._db import conn, row_get as _g
 
-DB = "tv_buy_1_0/db/tv.sqlite"
 
 def main():
     target = int(sys.argv[1]) if len(sys.argv) > 1 else 75
     lo, hi = target - 5, target + 5
 
+    # 每个品牌只取排序第一的一行（窗口函数，在 SQLite 里一次完成）
     sql = """
     SELECT *
-    FROM tv
-    WHERE launch_date IS NOT NULL
-      AND size_inch BETWEEN ? AND ?
-    ORDER BY
-      brand,
-      launch_date DESC,
-      -- 同品牌同月：更偏向“性价比”，而不是一味选最大尺寸
-      street_rmb IS NULL,          -- 有价优先
-      street_rmb ASC,
-      peak_brightness_nits DESC,
-      local_dimming_zones DESC
+    FROM (
+      SELECT *,
+             ROW_NUMBER() OVER (
+               PARTITION BY brand
+               ORDER BY
+                 launch_date DESC,
+                 -- 同品牌同月：更偏向“性价比”，而不是一味选最大尺寸
+                 street_rmb IS NULL,          -- 有价优先
+                 street_rmb ASC,
+                 peak_brightness_nits DESC,
+                 local_dimming_zones DESC
+             ) AS rn
+      FROM tv
+      WHERE launch_date IS NOT NULL
+        AND size_inch BETWEEN ? AND ?
+    )
+    WHERE rn = 1
     """
 
-    conn = sqlite3.connect(DB)
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(sql, (lo, hi)).fetchall()
-    conn.close()
-
-    best = {}
-    for r in rows:
-        b = r["brand"]
-        if b not in best:
-            best[b] = dict(r)
+    best = {r["brand"]: r for r in conn().execute(sql, (lo, hi))}  # 直接留 sqlite3.Row，不再复制成 dict
 
     brands = sorted(best.keys(), key=lambda x: (x or "").lower())
     print(f"target_size≈{target}  brands={len(brands)}")
     print("-" * 90)
     for b in brands:
         tv = best[b]
-        ld = tv.get("launch_date") or "未知"
-        price = tv.get("street_rmb")
+        ld = _g(tv, "launch_date") or "未知"
+        price = _g(tv, "street_rmb")
         price_s = f"¥{price}" if price is not None else "¥?"
-        pb = tv.get("peak_brightness_nits")
+        pb = _g(tv, "peak_brightness_nits")
         pb_s = f"{pb}nits" if pb is not None else "?"
-        zones = tv.get("local_dimming_zones")
+        zones = _g(tv, "local_dimming_zones")
         zones_s = str(zones) if zones is not None else "?"
         warn = []
         if pb is not None and pb > 6000:
@@ -52,7 +54,7 @@ def main():
             warn.append("分区口径⚠️")
         warn_s = (" [" + " ".join(warn) + "]") if warn else ""
 
-        print(f"{b:10} | {tv.get('model','?'):24} | {tv.get('size_inch','?')}寸 | 首发 {ld} | {price_s} | 亮度 {pb_s} | 分区 {zones_s}{warn_s}")
+        print(f"{b:10} | {_g(tv, 'model','?'):24} | {_g(tv, 'size_inch','?')}寸 | 首发 {ld} | {price_s} | 亮度 {pb_s} | 分区 {zones_s}{warn_s}")
 
 
 if __name__ == "__main__":
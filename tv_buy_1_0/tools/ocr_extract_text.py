@@ -4,6 +4,8 @@ tools/ocr_extract_text.py
 
 用“豆包/火山方舟(Ark) Vision Endpoint”代替本地 pytesseract。
 对外保持同名函数：ocr_image(image_path, lang=..., numeric_only=..., crop_box=...)
+批量：ocr_images([path1, path2, ...], numeric_only=..., crop_boxes=[...]) 多张图一次请求
+单趟：ocr_image_with_note(image_path) 一次请求同时拿表格数字和说明文字
 
 依赖：
   pip install openai pillow
@@ -11,18 +13,29 @@ tools/ocr_extract_text.py
   ARK_API_KEY
   ARK_BASE_URL (默认 https://ark.cn-beijing.volces.com/api/v3)
   ARK_VISION_MODEL (你的视觉 EndpointID，例如 ep-xxxx)
+  TVBUY_VISION_MAX_SIDE (可选，上传前长边上限，默认 1024)
+  TVBUY_OCR_CACHE (可选，设 0 关闭识别结果磁盘缓存)
 """
 
 from __future__ import annotations
 
 import os
+import io
 import base64
-import tempfile
-from typing import Optional, Tuple
+import functools
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
 
 from PIL import Image
 from openai import OpenAI
 
+try:
+    import orjson  # 可选：解析批量识别返回的 JSON
+except ImportError:
+    orjson = None
+
 
 ARK_BASE_URL = os.getenv("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
 ARK_API_KEY = os.getenv("ARK_API_KEY") or os.getenv("OPENAI_API_KEY")
@@ -36,35 +49,153 @@ if not ARK_VISION_MODEL:
 _CLIENT = OpenAI(api_key=ARK_API_KEY, base_url=ARK_BASE_URL)
 
 
-def _img_to_data_url(image_path: str) -> str:
+VISION_MAX_SIDE = int(os.getenv("TVBUY_VISION_MAX_SIDE", "1024") or 1024)
+
+# 识别结果磁盘缓存：同一张图（按文件内容哈希）+ 同样的参数 + 同一个视觉模型 => 不再请求云端
+# 和 g2_lab/services/contrast_ocr_service.py 共用 tv_buy_1_0/.cache/ocr/（key 里带来源前缀，互不串）
+OCR_CACHE_ENABLED = os.getenv("TVBUY_OCR_CACHE", "1") != "0"
+OCR_CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache" / "ocr"
+
+
+def _mime_of(image_path: str) -> str:
     ext = os.path.splitext(image_path)[1].lower()
-    mime = "image/png"
     if ext in [".jpg", ".jpeg"]:
-        mime = "image/jpeg"
-    elif ext == ".webp":
-        mime = "image/webp"
+        return "image/jpeg"
+    if ext == ".webp":
+        return "image/webp"
+    return "image/png"
+
+
+def _pil_to_data_url(img: Image.Image, fmt: str = "JPEG", quality: int = 85) -> str:
+    buf = io.BytesIO()
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.save(buf, format=fmt, quality=quality, optimize=True)
+    return f"data:image/{fmt.lower()};base64,{base64.b64encode(buf.getvalue()).decode('ascii')}"
+
+
+def _img_to_data_url(image: Union[str, Image.Image]) -> str:
+    """文件路径：原样 base64；PIL.Image：长边缩到 VISION_MAX_SIDE 内再编码（不落临时文件）"""
+    if isinstance(image, Image.Image):
+        img = image
+        if max(img.size) > VISION_MAX_SIDE:
+            img = img.copy()  # thumbnail 是原地修改，别动调用方的图
+            img.thumbnail((VISION_MAX_SIDE, VISION_MAX_SIDE), Image.LANCZOS)
+        # 颜色少（<=256，典型的表格截图）用 PNG 保住文字边缘；否则 JPEG 体积小得多
+        if img.getcolors(maxcolors=256) is not None:
+            return _pil_to_data_url(img, fmt="PNG")
+        return _pil_to_data_url(img)
 
+    with open(image, "rb") as f:
+        b64 = base64.b64encode(f.read())
+    return f"data:{_mime_of(image)};base64," + b64.decode("ascii")
+
+
+def _image_url(image_path: str, crop_box: Optional[Tuple[int, int, int, int]]) -> str:
+    # 同一张图常被识别两次（数值 + 说明文字）：按 (路径, mtime, 大小, 裁剪框) 缓存编码结果
+    st = os.stat(image_path)
+    box = tuple(crop_box) if crop_box is not None else None
+    return _image_url_cached(image_path, st.st_mtime, st.st_size, box)
+
+
+@functools.lru_cache(maxsize=64)
+def _image_url_cached(
+    image_path: str, mtime: float, size: int, crop_box: Optional[Tuple[int, int, int, int]]
+) -> str:
+    """
+    有 crop_box 就先裁剪出 ROI 再发给模型，提高稳定性；图太大先缩小（省上传带宽和 token）。
+    不裁剪且长边已在 VISION_MAX_SIDE 内的图直接发原文件。
+    """
+    with Image.open(image_path) as img:
+        # 只读文件头拿尺寸，不解码像素
+        if crop_box is None and max(img.size) <= VISION_MAX_SIDE:
+            return _img_to_data_url(image_path)
+    img = _decoded_image(image_path, mtime, size)
+    # 先裁剪再转 RGB：只转换 ROI 那一块像素
+    if crop_box is not None:
+        img = img.crop(crop_box)
+    return _img_to_data_url(img.convert("RGB"))
+
+
+@functools.lru_cache(maxsize=4)
+def _decoded_image(image_path: str, mtime: float, size: int) -> Image.Image:
+    # 同一张大图要裁剪表格区 + 整图缩小各发一次：像素只解码一次，两路共用（只读，不原地修改）
+    with Image.open(image_path) as img:
+        img.load()  # 像素读进内存，出了 with 关掉文件也能用
+    return img
+
+
+@functools.lru_cache(maxsize=64)
+def _file_digest_cached(image_path: str, mtime: float, size: int) -> str:
+    h = hashlib.blake2b(digest_size=16)
     with open(image_path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode("utf-8")
-    return f"data:{mime};base64,{b64}"
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _ocr_cache_key(image_path: str, prompt: str, crop_box) -> str:
+    # 提示词全文进 key：改了 _NUMERIC_PROMPT / _TEXT_PROMPT 等之后不会再命中旧结果
+    st = os.stat(image_path)
+    box = tuple(crop_box) if crop_box is not None else None
+    h = hashlib.blake2b(digest_size=16)
+    parts = (
+        "tools.ocr_extract_text",
+        _file_digest_cached(image_path, st.st_mtime, st.st_size),
+        _SYSTEM_PROMPT, prompt, box, VISION_MAX_SIDE, ARK_VISION_MODEL,
+    )
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _ocr_cache_get(key: str) -> Optional[str]:
+    try:
+        return json.loads((OCR_CACHE_DIR / f"{key}.json").read_text(encoding="utf-8"))["text"]
+    except Exception:
+        return None
+
+
+def _ocr_cache_put(key: str, text: str) -> None:
+    if not (text or "").strip():
+        return  # 空回复不缓存（多半是模型/网络抽风），下次重新识别
+    try:
+        OCR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = OCR_CACHE_DIR / f"{key}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps({"text": text}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, OCR_CACHE_DIR / f"{key}.json")
+    except Exception:
+        pass  # 磁盘缓存只是加速，写失败不影响主流程
+
+
+_SYSTEM_PROMPT = "你是一个严谨的图像文字识别助手，只按要求输出结果，不要解释。"
 
+_NUMERIC_PROMPT = (
+    "请读取图片中的表格数据，只输出所有数字（包含小数），"
+    "按从上到下、从左到右顺序排列，用空格分隔。"
+    "不要输出任何中文、单位、符号、标题或多余文字。"
+)
 
-def _maybe_crop(image_path: str, crop_box: Optional[Tuple[int, int, int, int]]) -> str:
-    """有 crop_box 就先裁剪出 ROI 再发给模型，提高稳定性。返回实际发送的文件路径。"""
-    if crop_box is None:
-        return image_path
+# 用于抓取“说明/备注”这类文字
+_TEXT_PROMPT = (
+    "请识别图片中的文字说明（尤其是表格下方的说明/备注区域）。"
+    "直接输出识别到的文字内容（中文/英文均可），不要解释，不要附加其它内容。"
+)
 
-    img = Image.open(image_path).convert("RGB")
-    img = img.crop(crop_box)
 
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-    tmp.close()
-    img.save(tmp.name)
-    return tmp.name
+# 单趟识别：先数字，再分隔符，再说明文字
+NOTE_SENTINEL = "|NOTE|"
+_NUMERIC_NOTE_PROMPT = (
+    "请先读取图片中表格里的数据，只输出表格内所有数字（包含小数），"
+    "按从上到下、从左到右顺序排列，用空格分隔，不要输出标题、日期等表格外的数字；"
+    f"然后单独输出一个 {NOTE_SENTINEL}；"
+    "最后输出表格下方的说明/备注文字（中文/英文均可）。不要解释，不要附加其它内容。"
+)
 
 
 def ocr_image(
-    image_path: str,
+    image_path: Union[str, Image.Image],
     *,
     lang: str = "eng",
     numeric_only: bool = False,
@@ -75,44 +206,126 @@ def ocr_image(
     - numeric_only=True：只输出数字（空格分隔），用于表格数值
     - numeric_only=False：输出图片中文字说明（中文/英文）
     - crop_box：先裁剪再识别
+    - image_path 也可以直接传已加载的 PIL.Image（不走磁盘缓存，调用方自己已经持有像素）
     """
-    send_path = _maybe_crop(image_path, crop_box)
+    if isinstance(image_path, Image.Image):
+        img = image_path.crop(crop_box) if crop_box is not None else image_path
+        return _chat(_NUMERIC_PROMPT if numeric_only else _TEXT_PROMPT, [_img_to_data_url(img)])
 
-    system_prompt = "你是一个严谨的图像文字识别助手，只按要求输出结果，不要解释。"
+    prompt = _NUMERIC_PROMPT if numeric_only else _TEXT_PROMPT
+    key = _ocr_cache_key(image_path, prompt, crop_box) if OCR_CACHE_ENABLED else None
+    if key is not None:
+        hit = _ocr_cache_get(key)
+        if hit is not None:
+            return hit
 
-    if numeric_only:
-        user_text = (
-            "请读取图片中的表格数据，只输出所有数字（包含小数），"
-            "按从上到下、从左到右顺序排列，用空格分隔。"
-            "不要输出任何中文、单位、符号、标题或多余文字。"
-        )
-    else:
-        # 用于抓取“说明/备注”这类文字
-        user_text = (
-            "请识别图片中的文字说明（尤其是表格下方的说明/备注区域）。"
-            "直接输出识别到的文字内容（中文/英文均可），不要解释，不要附加其它内容。"
-        )
+    text = _ocr_image_remote(image_path, numeric_only=numeric_only, crop_box=crop_box)
+    if key is not None:
+        _ocr_cache_put(key, text)
+    return text
+
+
+def ocr_image_with_note(
+    image_path: str, crop_box: Optional[Tuple[int, int, int, int]] = None
+) -> Tuple[str, str]:
+    """
+    一次请求识别整张图 -> (表格数字文本, 说明文字)，代替「裁剪数值 OCR + 全文 OCR」两次请求。
+    模型没按格式输出分隔符时，整段回复只当说明文字；数字退回裁剪后的数值 OCR（crop_box），
+    避免说明里的 "100nits" 之类混进表格数字。
+    """
+    key = _ocr_cache_key(image_path, _NUMERIC_NOTE_PROMPT, None) if OCR_CACHE_ENABLED else None
+    reply = _ocr_cache_get(key) if key is not None else None
+    if reply is None:
+        reply = _chat(_NUMERIC_NOTE_PROMPT, [_image_url(image_path, None)])
+        # 只缓存带分隔符的回复：格式不对的下次重新请求
+        if key is not None and NOTE_SENTINEL in reply:
+            _ocr_cache_put(key, reply)
+
+    nums, sep, note = reply.partition(NOTE_SENTINEL)
+    if not sep:
+        return ocr_image(image_path, lang="eng", numeric_only=True, crop_box=crop_box), reply
+    return nums.strip(), note.strip()
+
+
+def _ocr_image_remote(
+    image_path: str,
+    *,
+    numeric_only: bool,
+    crop_box: Optional[Tuple[int, int, int, int]],
+) -> str:
+    image_url = _image_url(image_path, crop_box)
+    user_text = _NUMERIC_PROMPT if numeric_only else _TEXT_PROMPT
+    return _chat(user_text, [image_url])
 
+
+def _chat(user_text: str, image_urls: List[str]) -> str:
+    content = [{"type": "text", "text": user_text}]
+    content += [{"type": "image_url", "image_url": {"url": u}} for u in image_urls]
+    resp = _CLIENT.chat.completions.create(
+        model=ARK_VISION_MODEL,
+        messages=[
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": content},
+        ],
+        temperature=0,
+    )
+    return (resp.choices[0].message.content or "").strip()
+
+
+def _parse_batch_reply(reply: str, n: int) -> Optional[List[str]]:
+    # 模型偶尔会包一层 ```json ... ```：只取第一个 { 到最后一个 } 之间
+    i, j = reply.find("{"), reply.rfind("}")
+    if i < 0 or j <= i:
+        return None
     try:
-        resp = _CLIENT.chat.completions.create(
-            model=ARK_VISION_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": user_text},
-                        {"type": "image_url", "image_url": {"url": _img_to_data_url(send_path)}},
-                    ],
-                },
-            ],
-            temperature=0,
+        obj = orjson.loads(reply[i:j + 1]) if orjson is not None else json.loads(reply[i:j + 1])
+        return [str(obj[f"img{k + 1}"]).strip() for k in range(n)]
+    except Exception:
+        return None
+
+
+def ocr_images(
+    image_paths: Sequence[str],
+    *,
+    lang: str = "eng",
+    numeric_only: bool = False,
+    crop_boxes: Optional[Sequence[Optional[Tuple[int, int, int, int]]]] = None,
+) -> List[str]:
+    """
+    批量云端 OCR：多张图放进同一条消息，一次请求拿回 {"img1": "...", "img2": "..."}，
+    省掉一半以上的 HTTP + 提示词预填充开销。返回顺序与 image_paths 一致。
+    - 每张图的结果仍按 ocr_image 的 key 写入磁盘缓存（之后单张调用也能命中）
+    - 返回不是合法 JSON / 缺 key 时退回逐张 ocr_image
+    """
+    boxes = list(crop_boxes) if crop_boxes is not None else [None] * len(image_paths)
+    out: List[Optional[str]] = [None] * len(image_paths)
+    keys: List[Optional[str]] = [None] * len(image_paths)
+
+    if OCR_CACHE_ENABLED:
+        for i, (p, box) in enumerate(zip(image_paths, boxes)):
+            keys[i] = _ocr_cache_key(p, _NUMERIC_PROMPT if numeric_only else _TEXT_PROMPT, box)
+            out[i] = _ocr_cache_get(keys[i])
+
+    todo = [i for i, t in enumerate(out) if t is None]
+    if len(todo) == 1:
+        i = todo[0]
+        out[i] = ocr_image(image_paths[i], lang=lang, numeric_only=numeric_only, crop_box=boxes[i])
+    elif todo:
+        base = _NUMERIC_PROMPT if numeric_only else _TEXT_PROMPT
+        names = ", ".join(f'"img{k + 1}"' for k in range(len(todo)))
+        user_text = (
+            f"下面共有 {len(todo)} 张图片，请对每张图片分别执行：{base}"
+            f"结果以 JSON 对象输出，键依次为 {names}（按图片顺序），值为该图片的识别结果字符串。"
+            "只输出 JSON，不要输出其它内容。"
         )
-        return (resp.choices[0].message.content or "").strip()
-    finally:
-        # 清理裁剪产生的临时文件
-        if crop_box is not None and send_path != image_path:
-            try:
-                os.remove(send_path)
-            except Exception:
-                pass
+        urls = [_image_url(image_paths[i], boxes[i]) for i in todo]
+        texts = _parse_batch_reply(_chat(user_text, urls), len(todo))
+        for k, i in enumerate(todo):
+            if texts is None:
+                out[i] = ocr_image(image_paths[i], lang=lang, numeric_only=numeric_only, crop_box=boxes[i])
+                continue
+            out[i] = texts[k]
+            if keys[i] is not None:
+                _ocr_cache_put(keys[i], texts[k])
+
+    return out  # type: ignore[return-value]
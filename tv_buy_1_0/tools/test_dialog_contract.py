@@ -32,33 +32,91 @@ Dialog 3p2 接口契约测试（增强版）
 from __future__ import annotations
 
 import argparse
+import http.client
+import io
 import json
 import sys
+import threading
 import time
 import urllib.error
-import urllib.request
 from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import orjson  # 可选：装了就用（直接出/吃 bytes）；没装走标准库
+except ImportError:
+    orjson = None
 
 
 # -----------------------------
 # HTTP helper
 # -----------------------------
+# Keep-Alive：同一 (scheme, host, port) 复用一条连接，--loops 多轮时不再每次 TCP/TLS 握手
+# http.client 连接不是线程安全的，按线程各存一份
+_LOCAL = threading.local()
+
+
+def _get_conn(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+    conns = getattr(_LOCAL, "conns", None)
+    if conns is None:
+        conns = _LOCAL.conns = {}
+    key = (scheme, netloc)
+    conn = conns.get(key)
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conns[key] = cls(netloc, timeout=timeout)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _drop_conn(scheme: str, netloc: str) -> None:
+    conn = getattr(_LOCAL, "conns", {}).pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
 def http_post_json(
     url: str,
     payload: Dict[str, Any],
     timeout: float = 15.0,
 ) -> Dict[str, Any]:
-    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    req = urllib.request.Request(
-        url=url,
-        data=data,
-        headers={"Content-Type": "application/json; charset=utf-8"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        raw = resp.read()
+    data = orjson.dumps(payload) if orjson is not None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    headers = {"Content-Type": "application/json; charset=utf-8", "Connection": "keep-alive"}
+
+    for attempt in range(2):
+        conn = _get_conn(parts.scheme, parts.netloc, timeout)
+        try:
+            conn.request("POST", path, body=data, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # 服务端关掉了空闲连接：换新连接重发一次（不算进 --retries）
+            _drop_conn(parts.scheme, parts.netloc)
+            if attempt:
+                raise
+            continue
+        except Exception:
+            _drop_conn(parts.scheme, parts.netloc)
+            raise
+        if resp.will_close:
+            _drop_conn(parts.scheme, parts.netloc)
+        if resp.status >= 400:
+            # 与 urlopen 行为一致：交给上层按 HTTPError 处理（可读出响应体）
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(raw))
+        if orjson is not None:
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass  # 非法 utf-8 等：退回下面的宽松解码
         # 服务端一般是 utf-8；保险起见 replace
         return json.loads(raw.decode("utf-8", errors="replace"))
+    raise RuntimeError("unreachable")
 
 
 def http_post_json_with_retries(
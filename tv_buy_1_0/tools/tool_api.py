@@ -3,18 +3,28 @@
 FastAPI Router: Tools
 - GET  /api/tools/schema
 - POST /api/tools/call
+- POST /api/tools/batch
 """
 
 from __future__ import annotations
-from typing import Any, Dict, Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+try:
+    # 可选：装了 orjson 就用它序列化接口返回（同 web/app.py）
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+except ImportError:
+    _DefaultResponse = JSONResponse
+
 from tv_buy_1_0.tools.tool_schema import get_tools, VERSION as SCHEMA_VERSION
 from tv_buy_1_0.tools.tool_runner import run_tool, VERSION as RUNNER_VERSION
 
-router = APIRouter(prefix="/api/tools", tags=["tools"])
+router = APIRouter(prefix="/api/tools", tags=["tools"], default_response_class=_DefaultResponse)
 
 
 @router.get("/schema")
@@ -32,9 +42,7 @@ class ToolCallReq(BaseModel):
     request_id: Optional[str] = "dev"
 
 
-@router.post("/call")
-def tools_call(req: ToolCallReq):
-    result = run_tool(req.name, req.arguments or {})
+def _envelope(req: ToolCallReq, result: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "ok": True if result.get("ok") else False,
         "version": RUNNER_VERSION,
@@ -42,3 +50,21 @@ def tools_call(req: ToolCallReq):
         "name": req.name,
         **result,
     }
+
+
+@router.post("/call")
+async def tools_call(req: ToolCallReq):
+    # run_tool 是同步阻塞的（可能再起子进程/发请求），和 /batch 一样放线程池里跑，不占事件循环
+    result = await asyncio.to_thread(run_tool, req.name, req.arguments or {})
+    return _envelope(req, result)
+
+
+@router.post("/batch")
+async def tools_batch(reqs: List[ToolCallReq]):
+    """
+    并发执行多个工具调用（每个跑在线程池里），结果顺序与请求一致。
+    """
+    results = await asyncio.gather(
+        *[asyncio.to_thread(run_tool, r.name, r.arguments or {}) for r in reqs]
+    )
+    return [_envelope(r, result) for r, result in zip(reqs, results)]
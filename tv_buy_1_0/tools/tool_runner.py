@@ -7,10 +7,14 @@ Clawdbot Tool Runner
 
 from __future__ import annotations
 from typing import Any, Dict, Optional, List, Tuple
+import base64
+import json
 import re
 import os
 import sys
+import time
 import traceback
+from functools import lru_cache
 
 # 确保 import 路径正确（从 tools/ 回到 tv_buy_1_0/ 的父目录）
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
@@ -18,7 +22,7 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from tv_buy_1_0.run_reco import (
-    list_candidates as _list_candidates_preview,
+    page_candidates as _page_candidates,
     get_top3 as _get_top3,
 )
 
@@ -60,16 +64,38 @@ def _intent_parse(text: str) -> Dict[str, Any]:
 
 # ============ tv_search ============
 
-def _tv_search(size: int, budget_max: int, brand: Optional[str], limit: int, offset: int) -> Dict[str, Any]:
-    # run_reco.list_candidates 只有 preview top10，我们这里先用它做“候选预览”
-    # count 用 total；candidates 用 preview + 伪分页（够你第一阶段用）
-    # 如果你希望严格分页/全量返回，下一步我们把 sqlite 查询抽成 tv_search_core。
-    total, cands = _list_candidates_preview(size=size, brand=brand, budget=budget_max, limit=max(limit, 10))
-    # 伪分页：在 preview 上切片
-    sliced = cands[offset: offset + limit]
+def _encode_cursor(key: Optional[Tuple[Any, ...]]) -> Optional[str]:
+    # 游标对调用方不透明：排序 key 的 JSON 再 base64
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(key), ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, ...]]:
+    if not cursor:
+        return None
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii"))))
+    except Exception:
+        raise ValueError(f"invalid cursor: {cursor!r}") from None
+
+
+def _tv_search(
+    size: int,
+    budget_max: int,
+    brand: Optional[str],
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    # 游标分页：第一页不传 cursor，之后把上一页返回的 paging.next_cursor 原样传回来
+    # offset 仍接受（旧调用方），语义是在游标之后再跳过 offset 台
+    total, cands, next_key = _page_candidates(
+        size=size, brand=brand, budget=budget_max, limit=limit, cursor=_decode_cursor(cursor), offset=offset
+    )
 
     out = []
-    for tv in sliced:
+    for tv in cands:
         out.append({
             "brand": tv.get("brand"),
             "model": tv.get("model"),
@@ -83,14 +109,32 @@ def _tv_search(size: int, budget_max: int, brand: Optional[str], limit: int, off
         "filters": {"size": size, "budget_max": budget_max, "brand": brand, "region": "CN"},
         "count": total,
         "candidates": out,
-        "paging": {"limit": limit, "offset": offset},
+        "paging": {"limit": limit, "offset": offset, "next_cursor": _encode_cursor(next_key)},
     }
 
 
 # ============ tv_rank / tv_compare / tv_pick ============
 
+# 同一轮对话里 rank / compare / pick 常用同一组筛选条件各调一次：打分结果进程内缓存
+# key 里带 60s 时间桶，到点自然失效（库/画像更新后最多 1 分钟生效）
+TOP3_CACHE_TTL_SEC = 60
+
+
+@lru_cache(maxsize=256)
+def _cached_top3(
+    size: int, scene: str, brand: Optional[str], budget: Optional[int], year_prefer: int, bucket: int
+) -> Tuple[Dict[str, Any], ...]:
+    return tuple(_get_top3(size=size, scene=scene, brand=brand, budget=budget, year_prefer=year_prefer))
+
+
+def _top3(size: int, scene: str, brand: Optional[str], budget: Optional[int], year_prefer: int) -> List[Dict[str, Any]]:
+    bucket = int(time.monotonic() // TOP3_CACHE_TTL_SEC)
+    # 缓存里的 dict 是共享的：给调用方浅拷贝一份
+    return [dict(tv) for tv in _cached_top3(size, scene, brand, budget, year_prefer, bucket)]
+
+
 def _tv_rank(size: int, scene: str, brand: Optional[str], budget_max: Optional[int], prefer_year: int, top: int) -> Dict[str, Any]:
-    top3 = _get_top3(size=size, scene=scene, brand=brand, budget=budget_max, year_prefer=prefer_year)
+    top3 = _top3(size, scene, brand, budget_max, prefer_year)
     topn = top3[: max(1, min(top, 10))]
 
     out = []
@@ -143,7 +187,7 @@ def _fmt_bool(x: Any) -> str:
     return str(x)
 
 def _tv_compare(size: int, scene: str, brand: Optional[str], budget_max: Optional[int], prefer_year: int) -> Dict[str, Any]:
-    top3 = _get_top3(size=size, scene=scene, brand=brand, budget=budget_max, year_prefer=prefer_year)
+    top3 = _top3(size, scene, brand, budget_max, prefer_year)
     if len(top3) < 2:
         return {
             "filters": {"size": size, "scene": scene, "brand": brand, "budget_max": budget_max, "prefer_year": prefer_year},
@@ -207,7 +251,7 @@ def _tv_compare(size: int, scene: str, brand: Optional[str], budget_max: Optiona
 
 
 def _tv_pick(size: int, scene: str, brand: Optional[str], budget: Optional[int], prefer_year: int, pick: str) -> Dict[str, Any]:
-    top3 = _get_top3(size=size, scene=scene, brand=brand, budget=budget, year_prefer=prefer_year)
+    top3 = _top3(size, scene, brand, budget, prefer_year)
     if not top3:
         return {"pick": pick, "product": None, "final_advice": {"summary": "无候选", "why_pick": [], "not_for": [], "buy_checklist": []}}
 
@@ -271,7 +315,8 @@ def run_tool(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
             brand = args.get("brand", None)
             limit = int(args.get("limit", 20))
             offset = int(args.get("offset", 0))
-            return {"ok": True, "data": _tv_search(size, budget_max, brand, limit, offset)}
+            cursor = args.get("cursor", None)
+            return {"ok": True, "data": _tv_search(size, budget_max, brand, limit, offset, cursor)}
 
         if name == "tv_rank":
             size = int(args["size"])
@@ -5,11 +5,13 @@ Clawdbot Tool Schema
 """
 
 from __future__ import annotations
+from functools import lru_cache
 from typing import List, Dict, Any
 
 VERSION = "tv-agent-tools/1.0"
 
 
+@lru_cache(maxsize=1)
 def get_tools() -> List[Dict[str, Any]]:
     """
     返回：可被 Clawdbot 注册的 tool schema 列表
@@ -42,7 +44,8 @@ def get_tools() -> List[Dict[str, Any]]:
                         "budget_max": {"type": "integer", "description": "预算上限（人民币），例如 6000"},
                         "brand": {"type": ["string", "null"], "description": "品牌（可选），例如 TCL / hisense"},
                         "limit": {"type": "integer", "description": "返回条数（默认 20）"},
-                        "offset": {"type": "integer", "description": "分页偏移（默认 0）"},
+                        "offset": {"type": "integer", "description": "分页偏移（默认 0，建议改用 cursor）"},
+                        "cursor": {"type": ["string", "null"], "description": "分页游标：上一页返回的 paging.next_cursor（第一页不传）"},
                     },
                     "required": ["size", "budget_max"],
                     "additionalProperties": False,
@@ -4,6 +4,11 @@ import sqlite3
 import yaml
 import os
 
+try:
+    import numpy as np  # 可选：打分按列向量化；没装就逐台循环
+except ImportError:
+    np = None
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB = os.path.abspath(os.path.join(BASE_DIR, "..", "db", "tv.sqlite"))
 PROFILES = os.path.abspath(os.path.join(BASE_DIR, "..", "config", "profiles.yaml"))
@@ -96,29 +101,8 @@ def months_ago(yyyymm):
     return (now.year - y) * 12 + (now.month - m)
 
 
-def main():
-    target = int(sys.argv[1]) if len(sys.argv) > 1 else 75
-    scene = sys.argv[2].lower() if len(sys.argv) > 2 else "bright"
-
-    weights, negative_metrics, boolean_metrics, penalties = load_profile(scene)
-    cands = latest_by_brand_size(target)
-
-    conn = sqlite3.connect(DB)
-
-    conn.close()
-
-
-    stat = {
-        "peak_brightness_nits": minmax(cands, "peak_brightness_nits"),
-        "local_dimming_zones": minmax(cands, "local_dimming_zones"),
-        "street_rmb": minmax(cands, "street_rmb"),
-        "input_lag_ms_60hz": minmax(cands, "input_lag_ms_60hz"),
-        "reflection_specular": minmax(cands, "reflection_specular"),
-        "uniformity_gray50_max_dev": minmax(cands, "uniformity_gray50_max_dev"),
-        "color_gamut_dci_p3": minmax(cands, "color_gamut_dci_p3"),
-        "hdmi_2_1_ports": minmax(cands, "hdmi_2_1_ports"),
-    }
-
+def score_rows(cands, weights, negative_metrics, boolean_metrics, penalties, stat):
+    # 逐台打分（没装 numpy 时用）
     ranked = []
     for tv in cands:
         score = 0.0
@@ -151,48 +135,151 @@ def main():
         if age is not None and age > 12:
             score *= 0.92
 
-        # penalties：异常口径 / 缺失字段惩罚
-        for pen in penalties:
-            m = pen.get("metric")
-            op = pen.get("op")
-            val = pen.get("value")
-            mul = float(pen.get("multiplier", 1.0))
+        score = apply_penalties(score, tv, penalties)
+
+        tv2 = dict(tv)
+        tv2["_score"] = score
+        tv2["_parts"] = parts
+        ranked.append(tv2)
 
-            x = tv.get(m)
+    return ranked
 
-            # 支持 is_null / not_null
-            if op == "is_null":
-                if x is None:
-                    score *= mul
-                continue
-            if op == "not_null":
-                if x is not None:
-                    score *= mul
-                continue
 
-            if x is None:
-                continue
-
-            hit = False
-            if op == ">" and x > val:
-                hit = True
-            elif op == ">=" and x >= val:
-                hit = True
-            elif op == "<" and x < val:
-                hit = True
-            elif op == "<=" and x <= val:
-                hit = True
-            elif op == "==" and x == val:
-                hit = True
-
-            if hit:
-                score *= mul
+def _bool01(x):
+    # boolean 指标：True/1/支持 -> 1.0；False/0/不支持 -> 0.0；None -> None
+    if x is None:
+        return None
+    if isinstance(x, str):
+        return 1.0 if x.strip().lower() in ("true", "yes", "y", "1", "支持") else 0.0
+    return 1.0 if bool(x) else 0.0
 
 
+def score_columns(cands, weights, negative_metrics, boolean_metrics, penalties, stat):
+    """
+    列式打分：每个指标一列 float64（缺失=NaN），归一化/取反/加权都是整列运算。
+    结果与 score_rows 逐位一致：各指标按 weights 顺序逐列累加（不用 S @ w，避免 BLAS 改变求和顺序）。
+    """
+    keys = list(weights.keys())
+    _bools_to_01(cands, keys, boolean_metrics)
+
+    n = len(cands)
+    M = _metric_matrix(cands, keys)
+    parts = np.empty((n, len(keys)), dtype=np.float64)
+    scores = np.zeros(n, dtype=np.float64)
+    for j, k in enumerate(keys):
+        col = M[:, j]
+        lo, hi = stat.get(k, (0.0, 1.0))
+        if hi <= lo:
+            s = np.zeros(n, dtype=np.float64)
+        else:
+            # 缺失 -> 0（与 norm_pos 一致）；取反指标缺失时变成 1.0，和 norm_neg 一样
+            s = np.nan_to_num((np.clip(col, lo, hi) - lo) / (hi - lo), nan=0.0)
+        if k in negative_metrics:
+            s = 1.0 - s
+        parts[:, j] = s * float(weights[k])
+        scores += parts[:, j]
+
+    # ===== 新老代轻惩罚（>12个月打 0.92 折）=====
+    scores = np.where(_ages(cands) > 12, scores * 0.92, scores)
+    return _ranked(cands, keys, scores, parts, penalties)
+
+
+def _bools_to_01(cands, keys, boolean_metrics):
+    for k in keys:
+        if k in boolean_metrics:
+            for tv in cands:
+                tv[k] = _bool01(tv.get(k))  # 写回，供 penalties/打印复用
+
+
+def _metric_matrix(cands, keys):
+    # (N, K) float64，缺失为 NaN
+    return np.array(
+        [[np.nan if tv.get(k) is None else float(tv.get(k)) for k in keys] for tv in cands],
+        dtype=np.float64,
+    ).reshape(len(cands), len(keys))
+
+
+def _ages(cands):
+    return np.array([months_ago(tv.get("launch_date")) or 0 for tv in cands], dtype=np.int64)
+
+
+def _ranked(cands, keys, scores, parts, penalties):
+    ranked = []
+    for i, tv in enumerate(cands):
         tv2 = dict(tv)
-        tv2["_score"] = score
-        tv2["_parts"] = parts
+        tv2["_score"] = apply_penalties(float(scores[i]), tv, penalties)
+        tv2["_parts"] = {k: float(parts[i, j]) for j, k in enumerate(keys)}
         ranked.append(tv2)
+    return ranked
+
+
+def apply_penalties(score, tv, penalties):
+    # penalties：异常口径 / 缺失字段惩罚
+    for pen in penalties:
+        m = pen.get("metric")
+        op = pen.get("op")
+        val = pen.get("value")
+        mul = float(pen.get("multiplier", 1.0))
+
+        x = tv.get(m)
+
+        # 支持 is_null / not_null
+        if op == "is_null":
+            if x is None:
+                score *= mul
+            continue
+        if op == "not_null":
+            if x is not None:
+                score *= mul
+            continue
+
+        if x is None:
+            continue
+
+        hit = False
+        if op == ">" and x > val:
+            hit = True
+        elif op == ">=" and x >= val:
+            hit = True
+        elif op == "<" and x < val:
+            hit = True
+        elif op == "<=" and x <= val:
+            hit = True
+        elif op == "==" and x == val:
+            hit = True
+
+        if hit:
+            score *= mul
+    return score
+
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 75
+    scene = sys.argv[2].lower() if len(sys.argv) > 2 else "bright"
+
+    weights, negative_metrics, boolean_metrics, penalties = load_profile(scene)
+    cands = latest_by_brand_size(target)
+
+    conn = sqlite3.connect(DB)
+
+    conn.close()
+
+
+    stat = {
+        "peak_brightness_nits": minmax(cands, "peak_brightness_nits"),
+        "local_dimming_zones": minmax(cands, "local_dimming_zones"),
+        "street_rmb": minmax(cands, "street_rmb"),
+        "input_lag_ms_60hz": minmax(cands, "input_lag_ms_60hz"),
+        "reflection_specular": minmax(cands, "reflection_specular"),
+        "uniformity_gray50_max_dev": minmax(cands, "uniformity_gray50_max_dev"),
+        "color_gamut_dci_p3": minmax(cands, "color_gamut_dci_p3"),
+        "hdmi_2_1_ports": minmax(cands, "hdmi_2_1_ports"),
+    }
+
+    if np is not None:
+        ranked = score_columns(cands, weights, negative_metrics, boolean_metrics, penalties, stat)
+    else:
+        ranked = score_rows(cands, weights, negative_metrics, boolean_metrics, penalties, stat)
 
     ranked.sort(key=lambda x: x["_score"], reverse=True)
 
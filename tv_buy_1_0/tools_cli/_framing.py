@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+tv_buy_1_0/tools_cli/_framing.py
+
+tools_cli 输出分帧约定（给 agent/tool_runner.py 的子进程模式用）：
+- 父进程设置 TVBUY_TOOL_FRAMED=1 时，结果写成一行：\\x1eRESULT\\x1e<json>
+  父进程按标记切分，不再从 stdout 末尾倒找 '{'（日志/嵌套 JSON 都不会误判）
+- 没设置时保持原样：stdout 直接输出 JSON（命令行 / skills/*.sh 照常用）
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Any, Optional
+
+RESULT_MARKER = "\x1eRESULT\x1e"
+FRAMED_ENV = "TVBUY_TOOL_FRAMED"
+
+
+def emit_result(payload: Any, indent: Optional[int] = None) -> None:
+    if os.environ.get(FRAMED_ENV) == "1":
+        sys.stdout.write(RESULT_MARKER + json.dumps(payload, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+        return
+    print(json.dumps(payload, ensure_ascii=False, indent=indent))
@@ -98,25 +98,43 @@ SKU_PATTERNS = [
 ]
 
 
+# 预编译一次。不合成一个大 alternation：那样变成「最靠前的位置」优先，
+# 而这里要的是「按 SKU_PATTERNS 顺序」优先（item.jd.com 链接比页面里随便一个 sku 字段可靠）
+# IGNORECASE 下 skuId / skuid 两条完全等价，只留一条
+def _compile_sku_patterns(patterns: List[str]) -> Tuple["re.Pattern[str]", ...]:
+    seen = set()
+    out = []
+    for p in patterns:
+        if p.lower() in seen:
+            continue
+        seen.add(p.lower())
+        out.append(re.compile(p, re.IGNORECASE))
+    return tuple(out)
+
+
+_SKU_RES = _compile_sku_patterns(SKU_PATTERNS)
+_PRICE_RE_YEN = re.compile(r"[￥¥]\s*([0-9]{3,6})")
+_PRICE_RE_YUAN = re.compile(r"([0-9]{3,6})\s*元")
+
+
 def extract_jd_sku_from_html(html: str) -> Optional[str]:
-    for pat in SKU_PATTERNS:
-        m = re.search(pat, html or "", flags=re.IGNORECASE)
+    html = html or ""
+    for pat in _SKU_RES:
+        m = pat.search(html)
         if m and m.group(1).isdigit():
             return m.group(1)
     return None
 
 
+def _prices_in_range(regex: "re.Pattern[str]", html: str) -> List[int]:
+    return [v for v in map(int, regex.findall(html)) if 500 <= v <= 200000]
+
+
 def extract_price_cny_from_tvlabs_html(html: str) -> Optional[int]:
-    candidates: List[int] = []
-    for m in re.finditer(r"[￥¥]\s*([0-9]{3,6})", html or ""):
-        v = int(m.group(1))
-        if 500 <= v <= 200000:
-            candidates.append(v)
+    html = html or ""
+    candidates = _prices_in_range(_PRICE_RE_YEN, html)
     if not candidates:
-        for m in re.finditer(r"([0-9]{3,6})\s*元", html or ""):
-            v = int(m.group(1))
-            if 500 <= v <= 200000:
-                candidates.append(v)
+        candidates = _prices_in_range(_PRICE_RE_YUAN, html)
     return min(candidates) if candidates else None
 
 
@@ -12,7 +12,6 @@ tv_compare.py
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
 from typing import Any, Dict, List, Optional, Tuple
@@ -29,6 +28,7 @@ if PROJECT_ROOT not in sys.path:
 # Core engine
 # =========================================================
 from tv_buy_1_0.run_reco import get_top3
+from tv_buy_1_0.tools_cli._framing import emit_result
 from tv_buy_1_0.reasons_v2 import (
     reasons_ps5_v2,
     reasons_movie_v2,
@@ -229,37 +229,38 @@ def pick_recommendation(a: Dict[str, Any], b: Dict[str, Any], scene: str) -> Dic
 # =========================================================
 # main
 # =========================================================
-def main():
-    ap = argparse.ArgumentParser(description="TV Compare CLI (Top1 vs Top2)")
-    ap.add_argument("--size", type=int, required=True, help="电视尺寸（英寸）")
-    ap.add_argument("--scene", type=str, required=True, choices=["ps5", "movie", "bright"], help="使用场景")
-    ap.add_argument("--brand", type=str, default=None, help="品牌限制（如 TCL）")
-    ap.add_argument("--budget", type=int, default=None, help="预算上限（人民币）")
-    ap.add_argument("--prefer_year", type=int, default=2026, help="优先年份")
-    ap.add_argument("--request_id", type=str, default="dev", help="请求 ID（给 Agent 用）")
-    args = ap.parse_args()
-
+def run(
+    size: int,
+    scene: str,
+    brand: Optional[str] = None,
+    budget_max: Optional[int] = None,
+    prefer_year: int = 2026,
+    request_id: str = "dev",
+) -> Dict[str, Any]:
+    """
+    进程内入口（tool_runner 直接调用）：参数名同 tool schema，返回与 CLI stdout 相同的 dict。
+    """
     ranked = get_top3(
-        size=args.size,
-        scene=args.scene,
-        brand=args.brand,
-        budget=args.budget,
-        year_prefer=args.prefer_year,
+        size=size,
+        scene=scene,
+        brand=brand,
+        budget=budget_max,
+        year_prefer=prefer_year,
     )
 
     # 至少要 2 个
     if len(ranked) < 2:
         out = {
-            "request_id": args.request_id,
+            "request_id": request_id,
             "version": "tv-agent-cli/1.0",
             "ok": True,
             "data": {
                 "filters": {
-                    "size": args.size,
-                    "scene": args.scene,
-                    "brand": args.brand,
-                    "budget_max": args.budget,
-                    "prefer_year": args.prefer_year,
+                    "size": size,
+                    "scene": scene,
+                    "brand": brand,
+                    "budget_max": budget_max,
+                    "prefer_year": prefer_year,
                 },
                 "count": len(ranked),
                 "error": "当前条件下不足 2 台可对比（可能预算/品牌过滤过严或价格缺失导致硬过滤）。",
@@ -277,29 +278,28 @@ def main():
                 ] if ranked else [],
             },
         }
-        print(json.dumps(out, ensure_ascii=False, indent=2))
-        return
+        return out
 
     a = ranked[0]
     b = ranked[1]
 
-    a_reasons, a_notfit = extract_reasons(a, args.scene)
-    b_reasons, b_notfit = extract_reasons(b, args.scene)
+    a_reasons, a_notfit = extract_reasons(a, scene)
+    b_reasons, b_notfit = extract_reasons(b, scene)
 
-    diffs = compare_two(a, b, args.scene)
-    reco = pick_recommendation(a, b, args.scene)
+    diffs = compare_two(a, b, scene)
+    reco = pick_recommendation(a, b, scene)
 
     out = {
-        "request_id": args.request_id,
+        "request_id": request_id,
         "version": "tv-agent-cli/1.0",
         "ok": True,
         "data": {
             "filters": {
-                "size": args.size,
-                "scene": args.scene,
-                "brand": args.brand,
-                "budget_max": args.budget,
-                "prefer_year": args.prefer_year,
+                "size": size,
+                "scene": scene,
+                "brand": brand,
+                "budget_max": budget_max,
+                "prefer_year": prefer_year,
             },
             "A": {
                 "rank": 1,
@@ -330,7 +330,29 @@ def main():
         },
     }
 
-    print(json.dumps(out, ensure_ascii=False, indent=2))
+    return out
+
+
+
+def main():
+    ap = argparse.ArgumentParser(description="TV Compare CLI (Top1 vs Top2)")
+    ap.add_argument("--size", type=int, required=True, help="电视尺寸（英寸）")
+    ap.add_argument("--scene", type=str, required=True, choices=["ps5", "movie", "bright"], help="使用场景")
+    ap.add_argument("--brand", type=str, default=None, help="品牌限制（如 TCL）")
+    ap.add_argument("--budget", type=int, default=None, help="预算上限（人民币）")
+    ap.add_argument("--prefer_year", type=int, default=2026, help="优先年份")
+    ap.add_argument("--request_id", type=str, default="dev", help="请求 ID（给 Agent 用）")
+    args = ap.parse_args()
+
+    out = run(
+        size=args.size,
+        scene=args.scene,
+        brand=args.brand,
+        budget_max=args.budget,
+        prefer_year=args.prefer_year,
+        request_id=args.request_id,
+    )
+    emit_result(out, indent=2)
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ import json
 import os
 import re
 import sys
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 
@@ -38,9 +39,6 @@ def _safe_reconfigure_stdio() -> None:
         pass
 
 
-_safe_reconfigure_stdio()
-
-
 # =========================================================
 # 确保能 import tv_buy_1_0
 # =========================================================
@@ -49,6 +47,7 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from tv_buy_1_0.run_reco import get_top3  # noqa: E402
+from tv_buy_1_0.tools_cli._framing import emit_result  # noqa: E402
 
 VERSION = "tv-agent-cli/1.1"
 
@@ -74,11 +73,17 @@ def _to_bool01(x: Any) -> Optional[int]:
     if isinstance(x, (int, float)):
         return 1 if float(x) != 0 else 0
     if isinstance(x, str):
-        s = x.strip().lower()
-        if s in ("true", "yes", "y", "1", "支持", "有", "是"):
-            return 1
-        if s in ("false", "no", "n", "0", "不支持", "无", "否"):
-            return 0
+        return _bool01_str(x)
+    return None
+
+
+@lru_cache(maxsize=256)
+def _bool01_str(x: str) -> Optional[int]:
+    s = x.strip().lower()
+    if s in ("true", "yes", "y", "1", "支持", "有", "是"):
+        return 1
+    if s in ("false", "no", "n", "0", "不支持", "无", "否"):
+        return 0
     return None
 
 
@@ -276,63 +281,52 @@ def print_help_json() -> None:
 
 
 # =========================================================
-# CLI 主入口
+# 进程内入口（tool_runner 直接调用）
 # =========================================================
-def main():
-    ap = argparse.ArgumentParser(description="TV Buy Final Pick CLI")
-    ap.add_argument("--size", type=int, required=False)
-    ap.add_argument("--scene", type=str, required=False, choices=["ps5", "movie", "bright"])
-    ap.add_argument("--brand", type=str, default=None)
-    ap.add_argument("--budget", type=int, default=None)
-    ap.add_argument("--prefer_year", type=int, default=2026)
-    ap.add_argument("--pick", type=str, default="A", choices=["A", "B", "C"])
-    ap.add_argument("--request_id", type=str, default="dev")
-    ap.add_argument("--help_json", action="store_true")
-
-    args, unknown = ap.parse_known_args()
-
-    if args.help_json:
-        print_help_json()
-        return
-
-    # 保持 argparse 的 -h/--help 行为
-    if args.size is None or args.scene is None:
-        ap.print_help()
-        return
-
+def run(
+    size: int,
+    scene: str,
+    brand: Optional[str] = None,
+    budget: Optional[int] = None,
+    prefer_year: int = 2026,
+    pick: str = "A",
+    request_id: str = "dev",
+) -> Dict[str, Any]:
+    """
+    参数名同 tool schema，返回与 CLI stdout 相同的 dict。
+    """
     top3 = get_top3(
-        size=args.size,
-        scene=args.scene,
-        brand=args.brand,
-        budget=args.budget,
-        year_prefer=args.prefer_year,
+        size=size,
+        scene=scene,
+        brand=brand,
+        budget=budget,
+        year_prefer=prefer_year,
     )
 
     if not top3:
         out = {
-            "request_id": args.request_id,
+            "request_id": request_id,
             "version": VERSION,
             "ok": False,
             "error": "NO_CANDIDATES",
             "message": "当前条件下没有可推荐机型",
             "filters": {
-                "size": args.size,
-                "scene": args.scene,
-                "brand": args.brand,
-                "budget": args.budget,
-                "prefer_year": args.prefer_year,
-                "pick": args.pick,
+                "size": size,
+                "scene": scene,
+                "brand": brand,
+                "budget": budget,
+                "prefer_year": prefer_year,
+                "pick": pick,
             },
         }
-        print(json.dumps(out, ensure_ascii=False, indent=2))
-        return
+        return out
 
-    pick_index = {"A": 0, "B": 1, "C": 2}.get(args.pick, 0)
+    pick_index = {"A": 0, "B": 1, "C": 2}.get(pick, 0)
     if pick_index >= len(top3):
         pick_index = 0
 
     tv = top3[pick_index]
-    advice = build_final_advice(tv, args.scene)
+    advice = build_final_advice(tv, scene)
 
     try:
         score = round(float(tv.get("_score", 0.0)), 4)
@@ -340,11 +334,11 @@ def main():
         score = 0.0
 
     out = {
-        "request_id": args.request_id,
+        "request_id": request_id,
         "version": VERSION,
         "ok": True,
         "data": {
-            "pick": args.pick,
+            "pick": pick,
             "product": {
                 "brand": tv.get("brand"),
                 "model": tv.get("model"),
@@ -358,7 +352,46 @@ def main():
         },
     }
 
-    print(json.dumps(out, ensure_ascii=False, indent=2))
+    return out
+
+
+# =========================================================
+# CLI 主入口
+# =========================================================
+def main():
+    _safe_reconfigure_stdio()
+
+    ap = argparse.ArgumentParser(description="TV Buy Final Pick CLI")
+    ap.add_argument("--size", type=int, required=False)
+    ap.add_argument("--scene", type=str, required=False, choices=["ps5", "movie", "bright"])
+    ap.add_argument("--brand", type=str, default=None)
+    ap.add_argument("--budget", type=int, default=None)
+    ap.add_argument("--prefer_year", type=int, default=2026)
+    ap.add_argument("--pick", type=str, default="A", choices=["A", "B", "C"])
+    ap.add_argument("--request_id", type=str, default="dev")
+    ap.add_argument("--help_json", action="store_true")
+
+    args, unknown = ap.parse_known_args()
+
+    if args.help_json:
+        print_help_json()
+        return
+
+    # 保持 argparse 的 -h/--help 行为
+    if args.size is None or args.scene is None:
+        ap.print_help()
+        return
+
+    out = run(
+        size=args.size,
+        scene=args.scene,
+        brand=args.brand,
+        budget=args.budget,
+        prefer_year=args.prefer_year,
+        pick=args.pick,
+        request_id=args.request_id,
+    )
+    emit_result(out, indent=2)
 
 
 if __name__ == "__main__":
@@ -17,7 +17,6 @@ tv_rank tool (CLI / Tool Runner)
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
 from typing import Any, Dict, List, Optional, Tuple
@@ -29,6 +28,7 @@ if PROJ_DIR not in sys.path:
     sys.path.insert(0, PROJ_DIR)
 
 from tv_buy_1_0.run_reco import list_candidates  # 你已有（从 sqlite 读）
+from tv_buy_1_0.tools_cli._framing import emit_result
 
 
 VERSION = "tv-agent-cli/3.2.newest-first"
@@ -68,6 +68,14 @@ def _norm_scene(scene: Any) -> str:
     return "movie"
 
 
+_BRAND_DB_CASE: Dict[str, str] = {
+    "tcl": "TCL",
+    "hisense": "Hisense",
+    "sony": "SONY",
+    "samsung": "SAMSUNG",
+}
+
+
 def _norm_brand(brand: Optional[str]) -> Optional[str]:
     if brand is None:
         return None
@@ -75,18 +83,8 @@ def _norm_brand(brand: Optional[str]) -> Optional[str]:
     if not b:
         return None
     # 你 DB 里品牌一般是 TCL / Hisense / SONY 这种
-    # 这里对常见输入做一下规范化
-    low = b.lower()
-    if low == "tcl":
-        return "TCL"
-    if low == "hisense":
-        return "Hisense"
-    if low == "sony":
-        return "SONY"
-    if low == "samsung":
-        return "SAMSUNG"
-    # 其它：原样返回（尽量不乱改）
-    return b
+    # 这里对常见输入做一下规范化；其它：原样返回（尽量不乱改）
+    return _BRAND_DB_CASE.get(b.lower(), b)
 
 
 def _launch_key(launch_date: Any) -> int:
@@ -254,6 +252,13 @@ def tool_call(arguments: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def run(**arguments: Any) -> Dict[str, Any]:
+    """
+    进程内入口（tool_runner 直接调用）：参数名同 tool schema，返回与 CLI stdout 相同的 dict。
+    """
+    return tool_call(arguments)
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--size", type=int, required=True)
@@ -274,7 +279,7 @@ def main():
             "top": args.top,
         }
     )
-    print(json.dumps(data, ensure_ascii=False, indent=2))
+    emit_result(data, indent=2)
 
 
 if __name__ == "__main__":
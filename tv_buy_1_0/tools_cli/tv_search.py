@@ -2,8 +2,8 @@
 from __future__ import annotations
 
 import argparse
-import json
 import re
+import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -19,6 +19,12 @@ except Exception:
 TVBUY_ROOT = Path(__file__).resolve().parents[1]  # => tv_buy_1_0/
 REPO_ROOT = TVBUY_ROOT.parents[0]  # => TV_Grab/
 
+# 让脚本直跑也能 import tv_buy_1_0
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tv_buy_1_0.tools_cli._framing import emit_result  # noqa: E402
+
 EXCEL_TCL_DIR = TVBUY_ROOT / "data_raw" / "excel_import_tcl_v2"
 
 DEFAULT_DATA_DIRS = [
@@ -372,17 +378,45 @@ def search(size: int, budget_max: int, brand: Optional[str] = None, region: str
     }
 
 
+def run(
+    size: int,
+    budget_max: int,
+    brand: Optional[str] = None,
+    region: str = "CN",
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """
+    进程内入口（tool_runner 直接调用）：返回与 CLI stdout 相同的 dict。
+    limit/offset 对应 tool schema 的分页参数；不传 limit 则返回全部候选。
+    """
+    data = search(size=int(size), budget_max=int(budget_max), brand=brand, region=region)
+    if limit is not None:
+        off = max(0, int(offset or 0))
+        data["candidates"] = data["candidates"][off: off + int(limit)]
+        data["paging"] = {"limit": int(limit), "offset": off}
+    return {"ok": True, "data": data}
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--size", type=int, required=True)
     ap.add_argument("--budget_max", type=int, required=True)
     ap.add_argument("--brand", type=str, default=None)
     ap.add_argument("--region", type=str, default="CN")
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--offset", type=int, default=0)
     args = ap.parse_args()
 
-    data = search(size=args.size, budget_max=args.budget_max, brand=args.brand, region=args.region)
-    out = {"ok": True, "data": data}
-    print(json.dumps(out, ensure_ascii=False))
+    out = run(
+        size=args.size,
+        budget_max=args.budget_max,
+        brand=args.brand,
+        region=args.region,
+        limit=args.limit,
+        offset=args.offset,
+    )
+    emit_result(out)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+tv_buy_1_0/tools_cli/worker.py
+
+常驻工具 worker（给 agent/tool_worker_pool.py 用）：
+- 启动时 import 一次 tv_buy_1_0，之后循环处理请求，省掉每次起 python + import 的开销
+- 协议：stdin/stdout 每行一个 JSON
+    请求：{"name": "tv_rank", "args": {...}}
+    响应：{"ok": true, "result": {...}} 或 {"ok": false, "error": "..."}
+
+运行：
+  python -m tv_buy_1_0.tools_cli.worker
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import sys
+import traceback
+from typing import Any, Callable, Dict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# 工具表只在 agent/tool_runner.py 维护一份
+from tv_buy_1_0.agent.tool_runner import TOOL_MODULES, call_run
+
+DISPATCH: Dict[str, Callable[..., Dict[str, Any]]] = {
+    name: importlib.import_module(mod).run for name, mod in TOOL_MODULES.items()
+}
+
+
+def _handle(line: str) -> Dict[str, Any]:
+    try:
+        req = json.loads(line)
+        fn = DISPATCH.get(req.get("name"))
+        if fn is None:
+            return {"ok": False, "error": f"unknown tool: {req.get('name')}"}
+        return {"ok": True, "result": call_run(fn, req.get("args") or {})}
+    except Exception as e:
+        return {"ok": False, "error": f"{e}\n{traceback.format_exc()}"}
+
+
+def main() -> None:
+    # 协议通道只留给响应：工具里任何 print 都转到 stderr，避免污染 stdout
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        resp = _handle(line)
+        out.write(json.dumps(resp) + "\n")  # ASCII 转义：不依赖管道编码
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
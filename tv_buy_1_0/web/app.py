@@ -46,6 +46,13 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
+try:
+    # 可选：装了 orjson 就用它序列化接口返回（C 实现，比 stdlib json 快数倍）
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+except ImportError:
+    _DefaultResponse = JSONResponse
+
 
 # =========================================================
 # ✅ 安全处理 stdout/stderr：避免 uvicorn 启动时 stderr 被关闭导致 lost sys.stderr
@@ -342,7 +349,7 @@ def _yaml_safe_load(text: str) -> Any:
 # =========================================================
 # App
 # =========================================================
-app = FastAPI()
+app = FastAPI(default_response_class=_DefaultResponse)
 app.include_router(tools_router)
 templates = Jinja2Templates(directory=str(TVBUY_ROOT / "web" / "templates"))
 